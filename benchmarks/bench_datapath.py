@@ -0,0 +1,295 @@
+"""
+Benchmark: data-path hot spots (parsers, viewers, listing, target extraction).
+
+    python benchmarks/bench_datapath.py                          # 10k and 100k lines
+    python benchmarks/bench_datapath.py --sizes 10000,1000000,10000000 --json results.json
+    python benchmarks/common.py compare old.json new.json
+
+Corpora are generated once per size and seed under --corpus-dir:
+httpx-, dnsx- and nuclei-like JSONL, nmap XML and URL lists. Each case runs
+in a fresh interpreter and reports its time, throughput (lines/s, MB/s),
+the RSS before the operation and the peak RSS of the process.
+
+Cases: OutputParser.parse_to_json, JsonLogViewer.advanced_search, cmd_ls,
+cmd_bcat, _handle_json_target (cold and cached), tools/xml_parser.xml_to_dict
+and Topostman.generate_openapi_spec. cmd_ls lists one output file per 1000
+corpus lines (its throughput is in files/s). The cli.commands cases need
+the CLI dependencies installed; they report an error otherwise.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import timed, peak_rss_kb, current_rss_kb, isolate_db, run_isolated, write_results
+
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), "reconflow-bench-corpus")
+
+CASES = [
+    'parse_to_json:httpx', 'parse_to_json:dnsx', 'parse_to_json:urls',
+    'advanced_search:httpx', 'advanced_search:nuclei',
+    'cmd_ls', 'cmd_bcat:count', 'cmd_bcat:page',
+    'handle_json_target:cold', 'handle_json_target:cached',
+    'xml_to_dict:nmap', 'generate_openapi_spec:urls',
+]
+
+SEARCH_QUERIES = {
+    'httpx': "status_code==200 && (url==*admin* || tech[*]~=nginx)",
+    'nuclei': "info.severity==critical || (info.severity==high && template-id~=cve)",
+}
+
+# Projects listed by cmd_ls: one output file per this many corpus lines
+LINES_PER_LS_FILE = 1000
+
+
+# --- Corpora -------------------------------------------------------------------
+
+def _httpx(rng, i):
+    host = f"app{i}.{rng.choice(['example.com', 'corp.example.com', 'internal'])}"
+    path = rng.choice(['/', '/admin', '/login', '/api/v1/users', '/static/app.js'])
+    return json.dumps({
+        'timestamp': '2026-01-30T10:00:00Z', 'url': f"https://{host}{path}", 'host': host,
+        'input': host, 'port': rng.choice(['80', '443', '8443']), 'scheme': 'https',
+        'status_code': rng.choice([200, 200, 301, 302, 403, 404, 500]),
+        'title': rng.choice(['Login', 'Dashboard', 'Not Found', '']),
+        'content_length': rng.randint(0, 50000), 'webserver': rng.choice(['nginx', 'Apache', 'cloudflare']),
+        'tech': rng.choice([['nginx:1.18'], ['Apache', 'PHP:7.4'], ['IIS:10.0'], []]),
+        'a': [f"10.{i % 256}.{i // 256 % 256}.{rng.randint(1, 254)}"],
+    })
+
+
+def _dnsx(rng, i):
+    host = f"sub{i}.example.com"
+    return json.dumps({'host': host, 'resolver': ['1.1.1.1:53'], 'a': [f"10.0.{i % 256}.{rng.randint(1, 254)}"],
+                       'cname': [f"edge{i % 50}.cdn.example.net"] if i % 5 == 0 else [], 'status_code': 'NOERROR'})
+
+
+def _nuclei(rng, i):
+    severity = rng.choice(['info', 'info', 'low', 'medium', 'high', 'critical'])
+    template = rng.choice(['cve-2021-44228', 'exposed-panels', 'tech-detect', 'cve-2023-4966', 'missing-headers'])
+    return json.dumps({
+        'template-id': template, 'info': {'name': template.replace('-', ' '), 'severity': severity,
+                                          'tags': ['cve'] if template.startswith('cve') else ['misc']},
+        'type': 'http', 'host': f"https://app{i}.example.com", 'matched-at': f"https://app{i}.example.com/",
+        'timestamp': '2026-01-30T10:00:00Z',
+    })
+
+
+def _url(rng, i):
+    path = rng.choice(['/api/v1/users', '/api/v1/orders', '/search', '/login', '/assets/app.js', '/docs'])
+    query = rng.choice(['', '?id=1', '?q=test&page=2', '?id=3&sort=asc&limit=10'])
+    return f"https://app{i % 2000}.example.com{path}{i % 97 if path.startswith('/api') else ''}{query}"
+
+
+GENERATORS = {'httpx': _httpx, 'dnsx': _dnsx, 'nuclei': _nuclei, 'urls': _url}
+
+
+def corpus_path(corpus_dir: str, kind: str, lines: int, seed: int) -> str:
+    """Generate a corpus file once (streamed to disk) and return its path"""
+    ext = 'xml' if kind == 'nmap' else 'txt' if kind == 'urls' else 'jsonl'
+    path = os.path.join(corpus_dir, f"{kind}-{lines}-s{seed}.{ext}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(corpus_dir, exist_ok=True)
+    rng = random.Random(seed)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        if kind == 'nmap':
+            _write_nmap(f, rng, lines)
+        else:
+            generate = GENERATORS[kind]
+            batch = []
+            for i in range(lines):
+                batch.append(generate(rng, i))
+                if len(batch) >= 10000:
+                    f.write("\n".join(batch) + "\n")
+                    batch = []
+            if batch:
+                f.write("\n".join(batch) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _write_nmap(f, rng, lines):
+    """nmap -oX like document of about `lines` lines (about 10 lines per host)"""
+    f.write('<?xml version="1.0"?>\n<nmaprun scanner="nmap" args="nmap -sV" version="7.94">\n')
+    for i in range(max(1, lines // 10)):
+        f.write(f'<host starttime="1706608800"><status state="up" reason="syn-ack"/>\n'
+                f'<address addr="10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" addrtype="ipv4"/>\n'
+                f'<hostnames><hostname name="host{i}.example.com" type="PTR"/></hostnames>\n<ports>\n')
+        for port in rng.sample([22, 80, 443, 3306, 8080, 8443], 2):
+            f.write(f'<port protocol="tcp" portid="{port}"><state state="open" reason="syn-ack"/>'
+                    f'<service name="{"ssh" if port == 22 else "http"}" product="nginx" version="1.18"/></port>\n')
+        f.write('</ports>\n</host>\n')
+    f.write('</nmaprun>\n')
+
+
+# --- Cases (child process) -------------------------------------------------------
+
+def _measure(fn, lines: int, size: int) -> dict:
+    rss_before = current_rss_kb()
+    result, elapsed = timed(fn)
+    return {
+        'seconds': round(elapsed, 4),
+        'lines_per_s': round(lines / elapsed, 1) if elapsed else 0.0,
+        'mb_per_s': round(size / 1e6 / elapsed, 3) if elapsed else 0.0,
+        'rss_before_kb': rss_before,
+        'peak_rss_kb': peak_rss_kb(),
+        'result': result,
+    }
+
+
+def _cli_context(project_path: str):
+    """Minimal Context stand-in for the cli.commands functions"""
+    return types.SimpleNamespace(
+        current_project=types.SimpleNamespace(path=project_path, name='bench', id=None),
+        settings_manager=types.SimpleNamespace(get_variable=lambda name, project_id=None: None),
+    )
+
+
+def _quiet_cli():
+    """Import cli.commands with its console rendering into a null device"""
+    import cli.commands as commands
+    commands.console.file = open(os.devnull, 'w')
+    return commands
+
+
+def _project_with(files, lines_per_file: int = 0) -> str:
+    """Project directory with one module holding the given files (symlinks or generated)"""
+    project_path = tempfile.mkdtemp(prefix="reconflow-bench-project-")
+    module_dir = os.path.join(project_path, "bench")
+    os.makedirs(module_dir)
+    for name, source in files:
+        target = os.path.join(module_dir, name)
+        if source:
+            os.symlink(source, target)
+        else:
+            with open(target, 'w') as f:
+                f.write("".join(f"line{i}.example.com\n" for i in range(lines_per_file)))
+    return project_path
+
+
+def run_case(name: str, lines: int, corpus_dir: str, seed: int) -> dict:
+    isolate_db()
+    op, _, kind = name.partition(':')
+    corpus_kind = {'parse_to_json': kind, 'advanced_search': kind, 'cmd_bcat': 'httpx',
+                   'handle_json_target': 'httpx', 'xml_to_dict': 'nmap',
+                   'generate_openapi_spec': 'urls'}.get(op)
+    path = corpus_path(corpus_dir, corpus_kind, lines, seed) if corpus_kind else None
+    size = os.path.getsize(path) if path else 0
+
+    if op == 'parse_to_json':
+        from core.parser import OutputParser
+        with open(path) as f:
+            stdout = f.read()
+        tool = {'urls': 'waybackurls'}.get(kind, kind)
+        stats = _measure(lambda: len(OutputParser().parse_to_json(stdout, tool) or []), lines, size)
+
+    elif op == 'advanced_search':
+        from utils.json_viewer import JsonLogViewer
+        with open(path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        viewer = JsonLogViewer(records)
+        stats = _measure(lambda: len(viewer.advanced_search(SEARCH_QUERIES[kind])), lines, size)
+
+    elif op == 'cmd_ls':
+        commands = _quiet_cli()
+        count = max(1, lines // LINES_PER_LS_FILE)
+        project_path = _project_with([(f"step{i}", None) for i in range(count)], lines_per_file=10)
+        ctx = _cli_context(project_path)
+        # First listing builds the manifest, the second one reads it
+        cold = _measure(lambda: commands.cmd_ls(ctx, ""), count, 0)
+        stats = _measure(lambda: commands.cmd_ls(ctx, ""), count, 0)
+        stats['cold_seconds'] = cold['seconds']
+        stats['result'] = count
+
+    elif op == 'cmd_bcat':
+        commands = _quiet_cli()
+        project_path = _project_with([("httpx", path)])
+        ctx = _cli_context(project_path)
+        query = "'status_code==200 && tech[*]~=nginx'"
+        if kind == 'count':
+            arg = f"{query} httpx --count"
+        else:
+            arg = f"{query} httpx --offset {lines // 2} --limit 100"
+        stats = _measure(lambda: commands.cmd_bcat(ctx, arg), lines, size)
+        stats['result'] = None
+
+    elif op == 'handle_json_target':
+        commands = _quiet_cli()
+        project_path = _project_with([("httpx", path)])
+        ctx = _cli_context(project_path)
+        source = os.path.join(project_path, "bench", "httpx")
+        if kind == 'cached':
+            commands._handle_json_target(ctx, source)
+        stats = _measure(lambda: commands._handle_json_target(ctx, source), lines, size)
+        stats['result'] = os.path.basename(stats['result'])
+
+    elif op == 'xml_to_dict':
+        import xml.etree.ElementTree as ET
+        from tools.xml_parser import xml_to_dict
+
+        def parse():
+            root = ET.parse(path).getroot()
+            return len(xml_to_dict(root).get('host', []))
+        stats = _measure(parse, lines, size)
+
+    elif op == 'generate_openapi_spec':
+        from tools.Topostman import generate_openapi_spec
+        with open(path) as f:
+            urls = f.readlines()
+        stats = _measure(lambda: len(generate_openapi_spec(urls).get('paths', {})), lines, size)
+
+    else:
+        raise ValueError(f"Unknown case '{name}'")
+
+    result = stats.pop('result')
+    return {'name': f"{name}@{lines}", 'lines': lines, 'input_mb': round(size / 1e6, 3),
+            'items': result if isinstance(result, int) else None, **stats}
+
+
+# --- Suite (parent process) ------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000', help='comma-separated corpus sizes in lines')
+    parser.add_argument('--only', help='run the cases whose name contains this text')
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    parser.add_argument('--run-case', nargs=2, metavar=('CASE', 'LINES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        case, lines = args.run_case
+        print(json.dumps(run_case(case, int(lines), args.corpus_dir, args.seed)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    cases = [case for case in CASES if not args.only or args.only in case]
+    print(f"{'case':<40} {'time':>9} {'lines/s':>12} {'MB/s':>8} {'rss before':>11} {'peak rss':>9}")
+    results = []
+    for lines in sizes:
+        for case in cases:
+            result = run_isolated(os.path.abspath(__file__), [
+                '--run-case', case, str(lines), '--corpus-dir', args.corpus_dir, '--seed', str(args.seed)])
+            if 'error' in result:
+                result = {'name': f"{case}@{lines}", **result}
+                print(f"{result['name']:<40} error: {result['error']}")
+            else:
+                print(f"{result['name']:<40} {result['seconds']:>8.3f}s {result['lines_per_s']:>12,.0f} "
+                      f"{result['mb_per_s']:>8.1f} {result['rss_before_kb'] / 1024:>9.0f}MB "
+                      f"{result['peak_rss_kb'] / 1024:>7.0f}MB")
+            results.append(result)
+
+    if args.json:
+        write_results(args.json, 'datapath', results, {'sizes': sizes, 'seed': args.seed})
+
+
+if __name__ == '__main__':
+    main()
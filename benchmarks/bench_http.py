@@ -0,0 +1,241 @@
+"""
+Benchmark: HTTP throughput of the Python tools (tools/http_engine.py).
+
+    python benchmarks/bench_http.py                  # quick suite
+    python benchmarks/bench_http.py --suite full --json results.json
+    python benchmarks/common.py compare old.json new.json
+
+A local keep-alive HTTP/1.1 server (separate process, one listener per
+simulated host, optional per-response latency) answers HEAD/GET requests
+shaped like a Backup_enum scan: most paths 404, a few 200. Each case sends
+the same URLs with:
+- engine: HttpEngine + bounded_map (pooled keep-alive connections, lazy URLs),
+- legacy: one request per URL on a fresh connection from a thread pool, the
+  way the tools worked before (requests.head when 'requests' is installed,
+  urllib otherwise),
+and reports requests/s, connections opened and peak RSS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import timed, peak_rss_kb, run_isolated, write_results
+
+SUITES = {
+    'quick': [
+        {'client': 'engine', 'requests': 2000, 'hosts': 4, 'concurrency': 20},
+        {'client': 'legacy', 'requests': 2000, 'hosts': 4, 'concurrency': 20},
+        {'client': 'engine', 'requests': 1000, 'hosts': 4, 'concurrency': 20, 'latency_ms': 5},
+        {'client': 'legacy', 'requests': 1000, 'hosts': 4, 'concurrency': 20, 'latency_ms': 5},
+    ],
+    'full': [
+        {'client': 'engine', 'requests': 20000, 'hosts': 8, 'concurrency': 50},
+        {'client': 'legacy', 'requests': 20000, 'hosts': 8, 'concurrency': 50},
+        {'client': 'engine', 'requests': 5000, 'hosts': 8, 'concurrency': 50, 'latency_ms': 20},
+        {'client': 'legacy', 'requests': 5000, 'hosts': 8, 'concurrency': 50, 'latency_ms': 20},
+        {'client': 'engine', 'requests': 200000, 'hosts': 32, 'concurrency': 200},
+    ],
+}
+
+
+def case_name(case: dict) -> str:
+    name = f"{case['client']}-{case['requests']}req-{case['hosts']}h-c{case['concurrency']}"
+    if case.get('latency_ms'):
+        name += f"-{case['latency_ms']}ms"
+    return name
+
+
+# --- Local server (child process) --------------------------------------------
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        Handler.connections += 1
+
+    def _answer(self, body: bool):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.path == '/stats':
+            payload = json.dumps({'connections': Handler.connections}).encode()
+        elif self.path.endswith('.zip'):
+            payload = b"PK" + b"\0" * 2046
+        else:
+            payload = b"<html><body>Not Found</body></html>"
+        status = 200 if self.path.endswith('.zip') or self.path == '/stats' else 404
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if body:
+            self.wfile.write(payload)
+
+    def do_HEAD(self):
+        self._answer(body=False)
+
+    def do_GET(self):
+        self._answer(body=True)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(hosts: int, latency_ms: float):
+    """Listen on `hosts` ports and print them as one JSON line"""
+    Handler.latency = latency_ms / 1000
+    ThreadingHTTPServer.request_queue_size = 1024
+    servers = [ThreadingHTTPServer(('127.0.0.1', 0), Handler) for _ in range(hosts)]
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(json.dumps([server.server_address[1] for server in servers]), flush=True)
+    sys.stdin.read()  # Runs until the parent closes stdin
+
+
+def start_server(case: dict):
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve',
+                             json.dumps({'hosts': case['hosts'], 'latency_ms': case.get('latency_ms', 0)})],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    ports = json.loads(proc.stdout.readline())
+    return proc, ports
+
+
+def server_connections(ports: list) -> int:
+    """Connections accepted by all listeners of the server (stats request excluded)"""
+    with urllib.request.urlopen(f"http://127.0.0.1:{ports[0]}/stats") as resp:
+        return json.loads(resp.read())['connections'] - 1
+
+
+def iter_urls(ports: list, count: int):
+    """Backup_enum-shaped URLs, host after host in turn (1 in 50 exists)"""
+    for i in range(count):
+        ext = '.zip' if i % 50 == 0 else '.bak'
+        yield f"http://127.0.0.1:{ports[i % len(ports)]}/backup{i}{ext}"
+
+
+# --- Clients -----------------------------------------------------------------
+
+def run_engine(urls, concurrency: int) -> dict:
+    from tools.http_engine import HttpEngine, bounded_map
+
+    async def scan():
+        counts = {'ok': 0, 'errors': 0}
+        async with HttpEngine(concurrency=concurrency, per_host=6, timeout=10, verify=False) as engine:
+            async for _, result in bounded_map(lambda url: engine.request('HEAD', url), urls, concurrency):
+                counts['errors' if isinstance(result, Exception) else 'ok'] += 1
+        return counts
+
+    return asyncio.run(scan())
+
+
+def legacy_head(url: str) -> int:
+    try:
+        import requests
+        return requests.head(url, timeout=10, allow_redirects=True).status_code
+    except ImportError:
+        pass
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method='HEAD'), timeout=10) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_legacy(urls, concurrency: int) -> dict:
+    counts = {'ok': 0, 'errors': 0}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Like the old tools: the whole task list is submitted up front
+        futures = [executor.submit(legacy_head, url) for url in urls]
+        for future in as_completed(futures):
+            counts['errors' if future.exception() else 'ok'] += 1
+    return counts
+
+
+def run_case(case: dict) -> dict:
+    proc, ports = start_server(case)
+    try:
+        urls = iter_urls(ports, case['requests'])
+        client = run_engine if case['client'] == 'engine' else run_legacy
+        counts, wall = timed(lambda: client(urls, case['concurrency']))
+        connections = server_connections(ports)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    try:
+        import requests  # noqa: F401
+        legacy = 'requests'
+    except ImportError:
+        legacy = 'urllib'
+    return {
+        'name': case_name(case),
+        'client': case['client'] if case['client'] == 'engine' else f"legacy ({legacy})",
+        'requests': case['requests'],
+        'errors': counts['errors'],
+        'wall_s': round(wall, 4),
+        'req_per_s': round(case['requests'] / wall, 1) if wall else 0.0,
+        'connections': connections,
+        'req_per_connection': round(case['requests'] / connections, 1) if connections else 0.0,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+# --- Suite (parent process) --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suite', choices=sorted(SUITES), default='quick')
+    parser.add_argument('--only', help='run the cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case (best wall time is kept)')
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        options = json.loads(args.serve)
+        serve(options['hosts'], options['latency_ms'])
+        return
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+
+    cases = [case for case in SUITES[args.suite] if not args.only or args.only in case_name(case)]
+    print(f"{'case':<36} {'client':<18} {'wall':>8} {'req/s':>10} {'conns':>7} {'req/conn':>9} {'errors':>7} {'rss':>7}")
+    results = []
+    for case in cases:
+        best = None
+        for _ in range(max(1, args.repeat)):
+            result = run_isolated(os.path.abspath(__file__), ['--run-case', json.dumps(case)])
+            if 'error' in result:
+                best = {'name': case_name(case), **result}
+                break
+            if best is None or result['wall_s'] < best['wall_s']:
+                best = result
+        results.append(best)
+        if 'error' in best:
+            print(f"{best['name']:<36} error: {best['error']}")
+            continue
+        print(f"{best['name']:<36} {best['client']:<18} {best['wall_s']:>7.2f}s {best['req_per_s']:>10,.0f} "
+              f"{best['connections']:>7} {best['req_per_connection']:>9.1f} {best['errors']:>7} "
+              f"{best['peak_rss_kb'] / 1024:>5.0f}MB")
+
+    if args.json:
+        write_results(args.json, 'http', results, {'suite': args.suite, 'repeat': args.repeat})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark: compiled bcat queries (utils.query) vs the legacy per-record parser.
+
+    python benchmarks/bench_query.py --records 2000000
+
+Both implementations are run over the same synthetic httpx-like records and
+must return the same matches for the legacy-compatible queries.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.query import compile_query
+
+
+QUERIES = [
+    "status_code==200",
+    "status_code==200 && url==*admin*",
+    "status_code>=400 || title~=login",
+    "content_length>1000 && tech~=nginx && host!=*.internal",
+]
+
+# New syntax only (no legacy equivalent)
+NESTED_QUERIES = [
+    "(status_code==200 || status_code==302) && tech[*]~=nginx",
+    "meta.tls.version==tls13 && !(port==443)",
+]
+
+
+def legacy_match_value(actual, operator, expected_str):
+    """Copy of the pre-compilation JsonLogViewer._match_value"""
+    if actual is None:
+        return False
+    actual_str = str(actual)
+    if operator in ('==', '!='):
+        if '*' in expected_str:
+            pattern = re.escape(expected_str).replace(r'\*', '.*')
+            match = re.fullmatch(pattern, actual_str, re.IGNORECASE)
+            return bool(match) if operator == '==' else not bool(match)
+    try:
+        if operator in ('>', '<', '>=', '<='):
+            val_num = float(actual)
+            exp_num = float(expected_str)
+            if operator == '>': return val_num > exp_num
+            if operator == '<': return val_num < exp_num
+            if operator == '>=': return val_num >= exp_num
+            if operator == '<=': return val_num <= exp_num
+        if operator == '==':
+            try:
+                return float(actual) == float(expected_str)
+            except:
+                return actual_str.lower() == expected_str.lower()
+        if operator == '!=':
+            try:
+                return float(actual) != float(expected_str)
+            except:
+                return actual_str.lower() != expected_str.lower()
+        if operator == '~=':
+            if isinstance(actual, list):
+                return any(expected_str.lower() in str(i).lower() for i in actual)
+            return expected_str.lower() in actual_str.lower()
+    except Exception:
+        pass
+    return False
+
+
+def legacy_search(data, query):
+    """Copy of the pre-compilation JsonLogViewer.advanced_search"""
+    results = []
+    or_groups = query.split('||')
+    for record in data:
+        if not isinstance(record, dict):
+            continue
+        record_match = False
+        for group in or_groups:
+            group_match = True
+            for condition in group.split('&&'):
+                condition = condition.strip()
+                if not condition: continue
+                operator = None
+                for op in ['==', '!=', '>=', '<=', '>', '<', '~=']:
+                    if op in condition:
+                        operator = op
+                        field, value = condition.split(op, 1)
+                        field = field.strip()
+                        value = value.strip().strip('"').strip("'")
+                        break
+                if not operator or not legacy_match_value(record.get(field), operator, value):
+                    group_match = False
+                    break
+            if group_match:
+                record_match = True
+                break
+        if record_match:
+            results.append(record)
+    return results
+
+
+def make_records(count, seed=1):
+    rng = random.Random(seed)
+    paths = ['/', '/admin', '/login', '/api/v1/users', '/static/app.js', '/admin/panel']
+    techs = [['nginx:1.18'], ['Apache'], ['nginx', 'PHP:7.4'], ['IIS:10.0'], []]
+    records = []
+    for i in range(count):
+        host = f"app{i % 5000}.{'internal' if i % 7 == 0 else 'example.com'}"
+        records.append({
+            'url': f"https://{host}{rng.choice(paths)}",
+            'host': host,
+            'port': rng.choice([80, 443, 8080]),
+            'status_code': rng.choice([200, 200, 200, 301, 302, 403, 404, 500]),
+            'title': rng.choice(['Login', 'Dashboard', 'Not Found', '']),
+            'content_length': rng.randint(0, 50000),
+            'tech': rng.choice(techs),
+            'meta': {'tls': {'version': rng.choice(['tls12', 'tls13'])}},
+        })
+    return records
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=1_000_000, help='number of synthetic records')
+    args = parser.parse_args()
+
+    print(f"Generating {args.records:,} records...")
+    data = make_records(args.records)
+
+    print(f"\n{'query':<62} {'legacy':>9} {'compiled':>9} {'speedup':>8} {'matches':>9}")
+    for query in QUERIES:
+        legacy, legacy_time = timed(lambda: legacy_search(data, query))
+        predicate = compile_query(query)
+        compiled, compiled_time = timed(lambda: [r for r in data if predicate(r)])
+        if len(legacy) != len(compiled):
+            print(f"[!] Result mismatch for '{query}': legacy={len(legacy)} compiled={len(compiled)}")
+        print(f"{query:<62} {legacy_time:>8.2f}s {compiled_time:>8.2f}s "
+              f"{legacy_time / compiled_time:>7.1f}x {len(compiled):>9,}")
+
+    for query in NESTED_QUERIES:
+        predicate = compile_query(query)
+        compiled, compiled_time = timed(lambda: [r for r in data if predicate(r)])
+        print(f"{query:<62} {'-':>9} {compiled_time:>8.2f}s {'-':>8} {len(compiled):>9,}")
+
+
+if __name__ == '__main__':
+    main()
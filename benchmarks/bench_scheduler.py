@@ -0,0 +1,236 @@
+"""
+Benchmark: GenericYamlModule scheduling and pipeline throughput.
+
+    python benchmarks/bench_scheduler.py                  # quick suite
+    python benchmarks/bench_scheduler.py --suite full --json results.json
+    python benchmarks/common.py compare old.json new.json
+
+Synthetic modules (wide fan-out, deep chains, diamonds, stdin chains) run
+benchmarks/fake_tool.py, which emits a configurable volume of text or JSONL
+lines at a controlled rate. Each case runs in a fresh interpreter and
+reports:
+- wall time, summed step time and achieved parallelism,
+- scheduling overhead: wall time beyond the DAG's critical path (or the
+  summed step time spread over the workers, if larger), from the run trace,
+  in total and per step, and the p95 wait of ready steps,
+- throughput of saved output (lines/s, MB/s),
+- time spent saving outputs (_save_step_output),
+- peak RSS of the ReconFlow process and of the largest tool process (as
+  reported by fake_tool.py itself: the RSS a child inherits from ReconFlow
+  before exec would hide it in RUSAGE_CHILDREN).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import ROOT, timed, peak_rss_kb, isolate_db, run_isolated, write_results
+
+FAKE_TOOL = os.path.join(ROOT, "benchmarks", "fake_tool.py")
+
+SUITES = {
+    'quick': [
+        {'shape': 'fanout', 'size': 64, 'lines': 0},
+        {'shape': 'chain', 'size': 32, 'lines': 0},
+        {'shape': 'fanout', 'size': 16, 'lines': 20000},
+        {'shape': 'chain', 'size': 8, 'lines': 20000},
+        {'shape': 'diamond', 'size': 8, 'lines': 20000, 'format': 'jsonl'},
+        {'shape': 'stdin_chain', 'size': 6, 'lines': 20000},
+        {'shape': 'fanout', 'size': 8, 'lines': 5000, 'rate': 20000},
+    ],
+    'full': [
+        {'shape': 'fanout', 'size': 256, 'lines': 0},
+        {'shape': 'chain', 'size': 128, 'lines': 0},
+        {'shape': 'fanout', 'size': 32, 'lines': 200000},
+        {'shape': 'chain', 'size': 16, 'lines': 200000},
+        {'shape': 'diamond', 'size': 16, 'lines': 200000, 'format': 'jsonl'},
+        {'shape': 'stdin_chain', 'size': 8, 'lines': 200000, 'format': 'jsonl'},
+        {'shape': 'fanout', 'size': 16, 'lines': 50000, 'rate': 50000},
+        {'shape': 'fanout', 'size': 4, 'lines': 1000000, 'width': 200},
+    ],
+}
+
+
+def case_name(case: dict) -> str:
+    name = f"{case['shape']}-{case['size']}x{case.get('lines', 0)}"
+    if case.get('format', 'text') != 'text':
+        name += f"-{case['format']}"
+    if case.get('rate'):
+        name += f"@{case['rate']}/s"
+    if case.get('width'):
+        name += f"-w{case['width']}"
+    return name
+
+
+# --- Synthetic modules -------------------------------------------------------
+
+def fake_step(name: str, case: dict, depends_on=(), stdin: bool = False) -> dict:
+    args = f"{FAKE_TOOL} --lines {case.get('lines', 0)} --format {case.get('format', 'text')}"
+    if case.get('rate'):
+        args += f" --rate {case['rate']}"
+    if case.get('width'):
+        args += f" --width {case['width']}"
+    if stdin:
+        args += " --stdin"
+    return {'name': name, 'tool': sys.executable, 'args': args, 'depends_on': list(depends_on), 'stdin': stdin}
+
+
+def build_module(case: dict) -> dict:
+    shape, size = case['shape'], case['size']
+    steps = []
+    if shape == 'fanout':
+        steps.append(fake_step('root', case))
+        steps += [fake_step(f"leaf{i}", case, ['root']) for i in range(size)]
+    elif shape == 'chain':
+        steps += [fake_step(f"s{i}", case, [f"s{i - 1}"] if i else []) for i in range(size)]
+    elif shape == 'diamond':
+        steps.append(fake_step('root', case))
+        steps += [fake_step(f"mid{i}", case, ['root']) for i in range(size)]
+        steps.append(fake_step('sink', case, [f"mid{i}" for i in range(size)]))
+    elif shape == 'stdin_chain':
+        # Every step reads the previous output: volumes grow along the chain
+        steps.append(fake_step('s0', case))
+        steps += [fake_step(f"s{i}", {**case, 'lines': 0}, [f"s{i - 1}"], stdin=True) for i in range(1, size)]
+    else:
+        raise ValueError(f"Unknown shape '{shape}'")
+    return {
+        'type': 'module',
+        'info': {'id': f"bench-{shape}", 'name': f"Benchmark {shape}"},
+        'vars': {'threads': {'default': str(case.get('workers', 10))}},
+        'steps': steps,
+    }
+
+
+def critical_path(steps: list, durations: dict) -> float:
+    """Longest dependency path, in the unit of durations"""
+    finish = {}
+    for step in steps:  # Steps are generated in topological order
+        start = max((finish[dep] for dep in step['depends_on']), default=0.0)
+        finish[step['name']] = start + durations.get(step['name'], 0.0)
+    return max(finish.values(), default=0.0)
+
+
+# --- One case (child process) ------------------------------------------------
+
+def run_case(case: dict) -> dict:
+    isolate_db()
+    from core.schema import validate_yaml
+    from core.yaml_module import GenericYamlModule
+    from utils.trace import Tracer, summarize
+
+    class TimedModule(GenericYamlModule):
+        """Accumulates the time spent saving step outputs"""
+        save_seconds = 0.0
+        _save_lock = threading.Lock()
+
+        def _save_step_output(self, *args, **kwargs):
+            _, elapsed = timed(lambda: super(TimedModule, self)._save_step_output(*args, **kwargs))
+            with self._save_lock:
+                TimedModule.save_seconds += elapsed
+
+    project_dir = tempfile.mkdtemp(prefix="reconflow-bench-project-")
+    rss_log = os.path.join(tempfile.mkdtemp(prefix="reconflow-bench-rss-"), "tools.log")
+    os.environ['FAKE_TOOL_RSS_LOG'] = rss_log
+    context = types.SimpleNamespace(current_project=types.SimpleNamespace(path=project_dir, id=None, name='bench'))
+
+    definition = build_module(case)
+    module = TimedModule()
+    module.load_from_schema(validate_yaml(definition))
+    module.tracer = Tracer()
+
+    results, wall = timed(lambda: module.run(context, background=True))
+
+    run = summarize(module.tracer.to_dict())[0]
+    durations = {step['name']: step['dur'] / 1e6 for step in run['steps']}
+    waits = sorted(step['wait'] / 1e6 for step in run['steps'])
+    failed = [step['name'] for step in run['steps'] if step['status'] == 'failed']
+
+    tool_rss = 0
+    if os.path.exists(rss_log):
+        with open(rss_log) as f:
+            tool_rss = max((int(line) for line in f if line.strip()), default=0)
+
+    lines = size = 0
+    module_dir = os.path.join(project_dir, definition['info']['id'])
+    for name in os.listdir(module_dir):
+        if name.endswith('.meta.json'):
+            with open(os.path.join(module_dir, name)) as f:
+                meta = json.load(f)
+            lines += meta.get('line_count', 0)
+            size += meta.get('file_size', 0)
+
+    steps = len(definition['steps'])
+    # Lower bound of the run time: the critical path, or the work spread over all workers
+    workers = case.get('workers', 10)
+    bound = max(critical_path(definition['steps'], durations), sum(durations.values()) / workers)
+    overhead = max(wall - bound, 0.0)
+    p95_wait = waits[int(round(0.95 * (len(waits) - 1)))] if waits else 0.0
+    return {
+        'name': case_name(case),
+        'steps': steps,
+        'failed_steps': len(failed),
+        'wall_s': round(wall, 4),
+        'step_busy_s': round(run['busy_us'] / 1e6, 4),
+        'parallelism': round(run['parallelism'], 3),
+        'sched_overhead_s': round(overhead, 4),
+        'sched_overhead_ms_per_step': round(overhead / steps * 1000, 3),
+        'ready_wait_p95_ms': round(p95_wait * 1000, 3),
+        'output_lines': lines,
+        'output_mb': round(size / 1e6, 3),
+        'lines_per_s': round(lines / wall, 1) if wall else 0.0,
+        'mb_per_s': round(size / 1e6 / wall, 3) if wall else 0.0,
+        'save_s': round(TimedModule.save_seconds, 4),
+        'save_pct_of_busy': round(TimedModule.save_seconds / (run['busy_us'] / 1e6) * 100, 2) if run['busy_us'] else 0.0,
+        'peak_rss_kb': peak_rss_kb(),
+        'tool_peak_rss_kb': tool_rss,
+    }
+
+
+# --- Suite (parent process) --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suite', choices=sorted(SUITES), default='quick')
+    parser.add_argument('--only', help='run the cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case (best wall time is kept)')
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+
+    cases = [case for case in SUITES[args.suite] if not args.only or args.only in case_name(case)]
+    print(f"{'case':<30} {'wall':>8} {'par':>5} {'ovh/step':>9} {'p95 wait':>9} "
+          f"{'lines/s':>11} {'save':>7} {'rss':>8} {'tool rss':>9}")
+    results = []
+    for case in cases:
+        best = None
+        for _ in range(max(1, args.repeat)):
+            result = run_isolated(os.path.abspath(__file__), ['--run-case', json.dumps(case)])
+            if 'error' in result:
+                best = {'name': case_name(case), **result}
+                break
+            if best is None or result['wall_s'] < best['wall_s']:
+                best = result
+        results.append(best)
+        if 'error' in best:
+            print(f"{best['name']:<30} error: {best['error']}")
+            continue
+        print(f"{best['name']:<30} {best['wall_s']:>7.2f}s {best['parallelism']:>5.1f} "
+              f"{best['sched_overhead_ms_per_step']:>7.1f}ms {best['ready_wait_p95_ms']:>7.1f}ms "
+              f"{best['lines_per_s']:>11,.0f} {best['save_s']:>6.2f}s "
+              f"{best['peak_rss_kb'] / 1024:>6.0f}MB {best['tool_peak_rss_kb'] / 1024:>7.0f}MB")
+
+    if args.json:
+        write_results(args.json, 'scheduler', results, {'suite': args.suite, 'repeat': args.repeat})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Shared helpers of the benchmark scripts: timing, memory and JSON results.
+
+Every suite writes the same result document with --json, so runs of two
+commits can be compared with:
+
+    python benchmarks/common.py compare old.json new.json
+"""
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KB"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+
+
+def current_rss_kb() -> int:
+    """Current resident set size of this process in KB (peak RSS if /proc is unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return peak_rss_kb()
+
+
+def isolate_db():
+    """Point ReconFlow at a throw-away SQLite database (keeps reconflow.db untouched)"""
+    import db.session
+    path = os.path.join(tempfile.mkdtemp(prefix="reconflow-bench-"), "bench.db")
+    db.session.get_db_url = lambda: f"sqlite:///{path}"
+    return path
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_isolated(script: str, args: list, timeout: float = None) -> dict:
+    """
+    Run one benchmark case in a fresh interpreter (so peak RSS is per case)
+    and return the JSON object it prints on its last output line.
+    """
+    proc = subprocess.run([sys.executable, script, *args], capture_output=True, text=True,
+                          timeout=timeout, cwd=ROOT)
+    if proc.returncode != 0:
+        return {'error': (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ['failed']}
+    lines = [line for line in proc.stdout.splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else {'error': ['no output']}
+
+
+def write_results(path: str, suite: str, cases: list, params: dict = None):
+    """Write the machine-readable result document of a suite"""
+    document = {
+        'suite': suite,
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'params': params or {},
+        'cases': cases,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults written to {path}")
+
+
+def compare(old_path: str, new_path: str):
+    """Print the relative change of every numeric metric between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    old_cases = {case['name']: case for case in old['cases']}
+    print(f"{old.get('suite')}: {old.get('commit')} -> {new.get('commit')}")
+    print(f"\n{'case':<34} {'metric':<22} {'old':>12} {'new':>12} {'change':>8}")
+    for case in new['cases']:
+        before = old_cases.get(case['name'])
+        if not before:
+            continue
+        for metric, value in case.items():
+            previous = before.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)) or isinstance(value, bool):
+                continue
+            change = f"{(value - previous) / previous * 100:+.1f}%" if previous else "-"
+            print(f"{case['name']:<34} {metric:<22} {previous:>12.4g} {value:>12.4g} {change:>8}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == 'compare':
+        compare(sys.argv[2], sys.argv[3])
+    else:
+        print("Usage: python benchmarks/common.py compare <old.json> <new.json>")
@@ -0,0 +1,102 @@
+"""
+Fake recon tool for benchmarks: emits a configurable volume of lines.
+
+    python benchmarks/fake_tool.py --lines 10000 --format jsonl --rate 5000 --stdin
+
+--format text   one hostname-like line per record
+--format jsonl  one httpx-like JSON object per record
+--rate          records per second (0: as fast as possible)
+--stdin         read stdin first and emit one record per input line
+                (in addition to --lines generated ones)
+--width         pad records to about this many bytes
+
+If $FAKE_TOOL_RSS_LOG is set, the tool appends its peak RSS (VmHWM, KB) to
+that file when it exits.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def make_record(i: int, fmt: str, width: int, source: str = None) -> str:
+    host = source or f"host{i}.bench.example.com"
+    if fmt == 'jsonl':
+        record = {'url': f"https://{host}/", 'host': host, 'status_code': 200 if i % 4 else 404,
+                  'content_length': i * 7 % 50000, 'tech': ['nginx'] if i % 3 else []}
+        line = json.dumps(record)
+        if width and len(line) < width:
+            record['pad'] = 'x' * (width - len(line) - 10)
+            line = json.dumps(record)
+        return line
+    line = host
+    if width and len(line) < width:
+        line += ' ' + 'x' * (width - len(line) - 1)
+    return line
+
+
+def report_peak_rss():
+    path = os.environ.get('FAKE_TOOL_RSS_LOG')
+    if not path:
+        return
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    with open(path, 'a') as log:
+                        log.write(line.split()[1] + "\n")
+                    return
+    except OSError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=1000)
+    parser.add_argument('--format', choices=('text', 'jsonl'), default='text')
+    parser.add_argument('--rate', type=float, default=0)
+    parser.add_argument('--stdin', action='store_true')
+    parser.add_argument('--width', type=int, default=0)
+    args = parser.parse_args()
+
+    sources = []
+    if args.stdin:
+        for line in sys.stdin:
+            line = line.strip()
+            if line:
+                # JSON inputs: keep the host, other inputs are used as-is
+                if line.startswith('{'):
+                    try:
+                        line = json.loads(line).get('host', line)
+                    except ValueError:
+                        pass
+                sources.append(line)
+
+    out = sys.stdout
+    total = len(sources) + args.lines
+    interval = 1.0 / args.rate if args.rate > 0 else 0
+    start = time.perf_counter()
+    batch = []
+    for i in range(total):
+        batch.append(make_record(i, args.format, args.width, sources[i] if i < len(sources) else None))
+        if interval:
+            # Emit in small batches to stay close to the requested rate
+            if len(batch) >= 100 or i == total - 1:
+                out.write("\n".join(batch) + "\n")
+                out.flush()
+                batch = []
+                delay = start + (i + 1) * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        elif len(batch) >= 10000:
+            out.write("\n".join(batch) + "\n")
+            batch = []
+    if batch:
+        out.write("\n".join(batch) + "\n")
+    out.flush()
+    report_peak_rss()
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,12 @@ from rich import box
 import shutil
 import yaml
 import json
+import sys
+from itertools import islice
 from utils.paths import get_project_root
+from core.storage import open_output, output_exists, logical_name, materialize, CHUNK_SIZE
+from core.record_index import indexed_lines
+from core.target_extract import extract_targets, looks_like_json, parse_target_fields
 
 console = Console()
 file_reader = FileReader()
@@ -109,56 +114,27 @@ def expand_variables(value: str, ctx: Context) -> str:
     return expanded
 
 
-def _handle_json_target(file_path: str) -> str:
+def _handle_json_target(ctx: Context, file_path: str) -> str:
     """
-    Parses a JSON/JSONL file to extract URLs/targets.
+    Extracts targets from a JSON/JSONL output (first of $target_fields, default url,host,ip).
     Returns the path to the extracted text file, or the original path if parsing failed/not applicable.
     """
-    if not (file_path.endswith('.json') or file_path.endswith('.jsonl')):
+    if not looks_like_json(file_path):
         return file_path
-        
+
     try:
-        targets = set()
-        
-        # Determine format and read
-        with open(file_path, 'r') as f:
-            if file_path.endswith('.jsonl'):
-                for line in f:
-                    if not line.strip(): continue
-                    try:
-                        obj = json.loads(line)
-                        if isinstance(obj, dict):
-                            # Prioritize 'url', then 'host', then 'ip'
-                            if 'url' in obj: targets.add(obj['url'])
-                            elif 'host' in obj: targets.add(obj['host'])
-                            elif 'ip' in obj: targets.add(obj['ip'])
-                    except: pass
-            else:
-                # JSON Array or Object
-                try:
-                    data = json.load(f)
-                    items = data if isinstance(data, list) else [data]
-                    for obj in items:
-                        if isinstance(obj, dict):
-                            if 'url' in obj: targets.add(obj['url'])
-                            elif 'host' in obj: targets.add(obj['host'])
-                            elif 'ip' in obj: targets.add(obj['ip'])
-                except: pass
-                        
-        if not targets:
+        project_id = ctx.current_project.id if ctx.current_project else None
+        fields = parse_target_fields(ctx.settings_manager.get_variable('$target_fields', project_id))
+        new_path, count, cached = extract_targets(file_path, fields)
+        if not new_path:
             return file_path
-            
-        # Write to new file
-        base, _ = os.path.splitext(file_path)
-        new_path = f"{base}_targets.txt"
-        
-        with open(new_path, 'w') as f:
-            for t in sorted(targets):
-                f.write(f"{t}\n")
-                
-        console.print(f"[green]ℹ️  Parsed JSON: Extracted {len(targets)} targets to {os.path.basename(new_path)}[/green]")
+
+        if cached:
+            console.print(f"[green]ℹ️  Using {count} cached targets from {os.path.basename(new_path)}[/green]")
+        else:
+            console.print(f"[green]ℹ️  Parsed JSON: Extracted {count} targets to {os.path.basename(new_path)}[/green]")
         return new_path
-        
+
     except Exception as e:
         console.print(f"[yellow]Warning: Failed to parse JSON target: {e}[/yellow]")
         return file_path
@@ -232,13 +208,14 @@ def cmd_set(ctx: Context, arg: str):
     if ctx.current_project and not val.startswith('/') and not val.startswith('$') and var_type != "boolean":
          project_root = ctx.current_project.path
          potential_path = os.path.join(project_root, val)
-         if os.path.exists(potential_path):
-             val = str(os.path.abspath(potential_path))
+         if output_exists(potential_path):
+             # Compressed outputs are decompressed to a cache file for external tools
+             val = str(os.path.abspath(materialize(potential_path)))
              console.print(f"[dim]Resolved project file: {val}[/dim]")
              
              # Attempt JSON parsing for targets
              if opt in ('target', 'url', 'domain', 'hosts', 'input_file'):
-                  val = _handle_json_target(val)
+                  val = _handle_json_target(ctx, val)
 
     if ctx.active_module.update_option(opt, val):
         print(f"✅ {opt} => {val}")
@@ -323,6 +300,27 @@ def cmd_run(ctx: Context, arg: str):
     if "-j" in args or "-d" in args:
         run_in_background = True
     
+    # Timeline trace (--trace or --trace=<file>), saved when the run finishes
+    trace_path = None
+    for a in args:
+        if a == "--trace" or a.startswith("--trace="):
+            from utils.trace import Tracer, new_trace_path
+            project_path = ctx.current_project.path if ctx.current_project else None
+            trace_path = a.partition("=")[2] or new_trace_path(ctx.active_module.meta.get('id', 'module'), project_path)
+            Tracer().attach(ctx.active_module, trace_path)
+    
+    # Profiling (--profile[=cpu|mem]), foreground runs only
+    profile_mode = None
+    for a in args:
+        if a == "--profile" or a.startswith("--profile="):
+            profile_mode = a.partition("=")[2] or "cpu"
+            if profile_mode not in ('cpu', 'mem'):
+                console.print(f"[red]Unknown profile mode '{profile_mode}' (use cpu or mem)[/red]")
+                return
+    if profile_mode and run_in_background:
+        console.print("[yellow]⚠️  --profile only applies to foreground runs; ignored[/yellow]")
+        profile_mode = None
+    
     if run_in_background:
         # Determine target for logging (heuristic)
         target = ctx.active_module.options.get('target', None)
@@ -332,11 +330,64 @@ def cmd_run(ctx: Context, arg: str):
         if session:
             console.print(f"[green]✓ Module '{ctx.active_module.meta['name']}' started in background (Session {session.id})[/green]")
             console.print(f"[dim]Type 'sessions' to view status.[/dim]")
+            if trace_path:
+                console.print(f"[dim]Trace will be saved to {trace_path}[/dim]")
     else:
+        profiler = None
         try:
-            ctx.active_module.run(ctx)
+            if profile_mode:
+                from utils.profiling import RunProfiler
+                with RunProfiler(profile_mode) as profiler:
+                    ctx.active_module.run(ctx)
+            else:
+                ctx.active_module.run(ctx)
         except Exception as e:
             print(f" Error running module: {e}")
+        if profiler:
+            _print_run_profile(ctx, profiler)
+        if trace_path:
+            console.print(f"[dim]Trace saved to {trace_path} (view: trace show, or load it in ui.perfetto.dev)[/dim]")
+        ctx.schedule_storage_compaction()
+
+def _print_run_profile(ctx: Context, profiler, top: int = 15):
+    """Summary of a profiled run: ReconFlow vs tools, per-thread waits, top functions"""
+    project_path = ctx.current_project.path if ctx.current_project else None
+    path = profiler.save(ctx.active_module.meta.get('id', 'module'), project_path)
+    
+    console.print(f"\n[bold]Profile ({profiler.mode})[/bold]  wall {profiler.wall:.2f}s, "
+                  f"ReconFlow CPU {profiler.cpu:.2f}s, tools CPU {profiler.child_cpu:.2f}s")
+    
+    if profiler.mode == 'mem':
+        console.print(f"Peak traced memory: {_format_size(profiler.peak_bytes)}")
+        table = Table(title=f"Top {top} allocation sites (alive at the end)", box=box.SIMPLE, header_style="bold blue")
+        table.add_column("Site", style="cyan")
+        table.add_column("Size", justify="right", style="yellow")
+        table.add_column("Blocks", justify="right", style="dim")
+        for site, size, count in profiler.top_allocations(top):
+            table.add_row(site, _format_size(size), str(count))
+        console.print(table)
+    else:
+        table = Table(title="Time by thread (profiled)", box=box.SIMPLE, header_style="bold blue")
+        table.add_column("Threads", style="cyan")
+        table.add_column("Count", justify="right", style="dim")
+        table.add_column("ReconFlow work", justify="right", style="yellow")
+        table.add_column("Waiting (tools, locks, I/O)", justify="right", style="green")
+        for role, entry in profiler.breakdown().items():
+            table.add_row(role, str(entry['threads']), f"{entry['work']:.3f}s", f"{entry['wait']:.3f}s")
+        console.print(table)
+        
+        table = Table(title=f"Top {top} functions by own time (blocking calls excluded)",
+                      box=box.SIMPLE, header_style="bold blue")
+        table.add_column("Function", style="cyan")
+        table.add_column("Calls", justify="right", style="dim")
+        table.add_column("Own", justify="right", style="yellow")
+        table.add_column("Cumulative", justify="right")
+        for function, calls, tottime, cumtime in profiler.top(top):
+            table.add_row(function, str(calls), f"{tottime:.3f}s", f"{cumtime:.3f}s")
+        console.print(table)
+    
+    if path:
+        console.print(f"[dim]Profile saved to {path}[/dim]")
 
 def cmd_show(ctx: Context, arg: str):
     if not arg:
@@ -502,7 +553,7 @@ def cmd_help(ctx: Context, arg: str):
         ("use", "Select a module by name"),
         ("back", "Move back from the current context"),
         ("set", "Set a context-specific variable to a value"),
-        ("run", "Execute the module (-j/-d for background)"),
+        ("run", "Execute the module (-j/-d background, --trace timeline, --profile[=cpu|mem])"),
         ("show", "Displays options, modules, projects, etc."),
         ("options", "Displays options for the active module"),
         ("search", "Search modules (regex)"),
@@ -512,6 +563,10 @@ def cmd_help(ctx: Context, arg: str):
         ("ls", "List files for current project"),
         ("cat","view file contents in current project "),
         ("bcat","view file as formatted table (JSON) or text"),
+        ("bstats","count/uniq/top/group/hist over a JSON output"),
+        ("stats","Show internal metrics (runs, steps, subprocesses, DB)"),
+        ("trace","List, summarize or export run timeline traces"),
+        ("storage","Show/configure output compression and retention"),
         ("import","Import a module from a YAML file"),
         ("help", "Help menu"),
         ("settings", "Open settings menu"),
@@ -535,6 +590,7 @@ def cmd_create_project(ctx: Context, arg: str):
     Usage:
       project           -> List projects
       project -c <name> -> Create project
+      project -i [name] -> Import existing files of a project directory into the catalog
       project <name|id> -> Select project
     """
     if not arg:
@@ -614,6 +670,25 @@ def cmd_create_project(ctx: Context, arg: str):
             print("Deletion cancelled.")
         return
 
+    if args[0] == '-i':
+        p_repo = ctx.project_repo
+        project = ctx.current_project
+        if len(args) >= 2:
+            project = p_repo.get_by_name(args[1])
+            if not project and args[1].isdigit():
+                project = p_repo.get(int(args[1]))
+
+        if not project:
+            print("Usage: project -i <name> (or load a project first)")
+            return
+
+        try:
+            count = ctx.file_manager.import_directory(project)
+            console.print(f"[green]✓ Imported {count} file(s) from {project.path} into the catalog.[/green]")
+        except Exception as e:
+            console.print(f"[red]Error importing project files: {e}[/red]")
+        return
+
     # Select project by name or ID
     target = args[0]
     p_repo = ctx.project_repo
@@ -631,11 +706,23 @@ def cmd_create_project(ctx: Context, arg: str):
     if selected:
         ctx.current_project = selected
         print(f"[+] Switched to project '{selected.name}'")
+        ctx.schedule_storage_compaction()
     else:
         print(f"[-] Project '{target}' not found.")
 
+def _format_size(file_size: int) -> str:
+    """Format size (human readable)"""
+    if file_size < 1024:
+        return f"{file_size} B"
+    elif file_size < 1024 * 1024:
+        return f"{file_size // 1024} KB"
+    return f"{file_size // (1024 * 1024)} MB"
+
 def cmd_ls(ctx: Context, arg: str):
     """List files from current project organized by module"""
+    from datetime import datetime
+    from core.manifest import ProjectManifest
+    
     if not ctx.current_project:
         console.print("[red][-] No active project. Use 'project <name>' first.[/red]")
         return
@@ -646,100 +733,23 @@ def cmd_ls(ctx: Context, arg: str):
         console.print("[yellow]Project directory not found.[/yellow]")
         return
     
-    # Scan filesystem for module directories
+    # Read the project manifest; files changed outside reconflow are re-counted
     files_data = []
     
-    for item in os.listdir(project_path):
-        item_path = os.path.join(project_path, item)
-        
-        # Handle Root Files
-        if os.path.isfile(item_path) and not item.endswith('.meta.json'):
-             module_name = "[bold](Project Root)[/bold]"
-             file = item
-             file_path = item_path
-             step_name = file # Show full filename with extension
-             
-             # Get file stats
-             try:
-                 stat = os.stat(file_path)
-                 file_size = stat.st_size
-                 mtime = stat.st_mtime
-                 
-                 # Calculate line count
-                 try:
-                     with open(file_path, 'r') as f:
-                         line_count = sum(1 for _ in f)
-                 except:
-                     line_count = 0
-                 
-                 # Format time
-                 from datetime import datetime
-                 scan_time = datetime.fromtimestamp(mtime).strftime("%H:%M")
-                 
-                 # Format size
-                 if file_size < 1024:
-                     size_str = f"{file_size} B"
-                 elif file_size < 1024 * 1024:
-                     size_str = f"{file_size // 1024} KB"
-                 else:
-                     size_str = f"{file_size // (1024 * 1024)} MB"
-                     
-                 files_data.append({
-                     'module': module_name,
-                     'step': step_name,
-                     'size': size_str,
-                     'lines': line_count,
-                     'time': scan_time
-                 })
-             except:
-                 pass
-             continue
-        
-        # Skip hidden directories and non-directories
-        if item.startswith('.') or not os.path.isdir(item_path):
-            continue
+    for entry in ProjectManifest(project_path).reconcile():
+        module_name = entry['module'] or "[bold](Project Root)[/bold]"
+        step_name = entry['step']
+        if entry.get('codec'):
+            # Compressed outputs are shown under their logical name
+            step_name = f"{step_name} [dim]({entry['codec']})[/dim]"
         
-        module_name = item
-        
-        # Scan for .txt files in module directory
-        for file in os.listdir(item_path):
-            if file.endswith('.meta.json') or file.startswith('.'):
-                continue
-            
-            file_path = os.path.join(item_path, file)
-            step_name = file # Show full filename with extension
-            
-            # Get file stats
-            stat = os.stat(file_path)
-            file_size = stat.st_size
-            mtime = stat.st_mtime
-            
-            # Calculate line count
-            try:
-                with open(file_path, 'r') as f:
-                    line_count = sum(1 for _ in f)
-            except:
-                line_count = 0
-            
-            # Format time (HH:MM)
-            from datetime import datetime
-            scan_time = datetime.fromtimestamp(mtime).strftime("%H:%M")
-            
-            # Format size (human readable)
-            if file_size < 1024:
-                size_str = f"{file_size} B"
-            elif file_size < 1024 * 1024:
-                size_str = f"{file_size // 1024} KB"
-            else:
-                size_str = f"{file_size // (1024 * 1024)} MB"
-            
-            files_data.append({
-                'module': module_name,
-                'step': step_name,
-                'size': size_str,
-                'lines': line_count,
-                'time': scan_time
-            })
+        files_data.append({
+            'module': module_name,
+            'step': step_name,
+            'size': _format_size(entry['size']),
+            'lines': entry.get('lines', 0),
+            'time': datetime.fromtimestamp(entry['mtime']).strftime("%H:%M")
+        })
     
     if not files_data:
         console.print("[yellow]No output files found in this project.[/yellow]")
@@ -774,13 +784,41 @@ def cmd_ls(ctx: Context, arg: str):
     console.print()
 
 def cmd_cat(ctx: Context, arg: str):
-    """Display raw file content (no formatting)"""
+    """
+    Display raw file content (no formatting)
+    Usage: cat <module>/<file> [--offset=N] [--limit=N]   (paging by line)
+    """
     if not ctx.current_project:
         console.print("[red]No active project. Use 'project <name>' first.[/red]")
         return
     
     if not arg:
-        print("Usage: cat <module>/<file> or cat <file>")
+        print("Usage: cat <module>/<file> or cat <file> [--offset=N] [--limit=N]")
+        return
+    
+    # Paging flags
+    offset = 0
+    limit = None
+    parts = []
+    for part in arg.split():
+        flag, _, val = part.partition('=')
+        if flag in ('--offset', '--limit'):
+            try:
+                number = int(val)
+                if number < 0:
+                    raise ValueError
+            except ValueError:
+                console.print(f"[red]{flag} expects a non-negative integer[/red]")
+                return
+            if flag == '--offset':
+                offset = number
+            else:
+                limit = number
+        else:
+            parts.append(part)
+    arg = " ".join(parts)
+    if not arg:
+        print("Usage: cat <module>/<file> or cat <file> [--offset=N] [--limit=N]")
         return
 
     project_path = ctx.current_project.path
@@ -797,41 +835,116 @@ def cmd_cat(ctx: Context, arg: str):
         if module_name in ["Root", "(Project Root)", "[Project Root]"]:
              file_path = os.path.join(project_path, filename)
         else:
-             if not filename.endswith('.txt'):
-                 filename += '.txt'
-             file_path = os.path.join(project_path, module_name, filename)
+             # Auto-saved step outputs have no extension; legacy outputs end in .txt
+             candidates = [filename] if filename.endswith('.txt') else [filename, f"{filename}.txt"]
+             for name in candidates:
+                 potential_path = os.path.join(project_path, module_name, name)
+                 if output_exists(potential_path):
+                     file_path = potential_path
+                     break
     else:
         # Search all modules for the file
-        search_name = arg if arg.endswith('.txt') else f"{arg}.txt"
+        candidates = [arg] if arg.endswith('.txt') else [arg, f"{arg}.txt"]
         
         for item in os.listdir(project_path):
             item_path = os.path.join(project_path, item)
             if os.path.isdir(item_path) and not item.startswith('.'):
-                potential_path = os.path.join(item_path, search_name)
-                if os.path.exists(potential_path):
-                    file_path = potential_path
+                for name in candidates:
+                    potential_path = os.path.join(item_path, name)
+                    if output_exists(potential_path):
+                        file_path = potential_path
+                        break
+                if file_path:
                     break
     
-    if not file_path or not os.path.exists(file_path):
+    if not file_path or not output_exists(file_path):
         console.print(f"[red]File not found: {arg}[/red]")
         console.print("[dim]Usage: cat <module>/<file> or cat <filename>[/dim]")
         return
     
-    # Read and display raw content
+    if offset or limit is not None:
+        try:
+            # Large plain outputs seek straight to the page via their line index
+            lines = indexed_lines(file_path, offset, limit)
+            if lines is not None:
+                for line in lines:
+                    sys.stdout.write(line)
+            else:
+                stop = offset + limit if limit is not None else None
+                with open_output(file_path, 'rt') as f:
+                    for line in islice(f, offset, stop):
+                        sys.stdout.write(line)
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+        except Exception as e:
+            console.print(f"[red]Error reading file: {e}[/red]")
+        return
+    
+    # Stream raw content (compressed outputs are decompressed on the fly)
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        # Print raw content without any formatting
-        print(content)
+        with open_output(file_path, 'rt') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                # Print raw content without any formatting
+                sys.stdout.write(chunk)
+        sys.stdout.write("\n")
+        sys.stdout.flush()
     except Exception as e:
         console.print(f"[red]Error reading file: {e}[/red]")
 
 
+def _find_json_output(project_path: str, filename: str):
+    """
+    Resolve a JSON output given as 'module/step', 'Root/name' or a bare name
+    (searched in every module). Returns the logical path or None.
+    """
+    file_path = None
+    
+    # Candidate names: as given (auto-saved outputs have no extension), then known extensions
+    if filename.endswith('.json') or filename.endswith('.jsonl') or filename.endswith('.txt'):
+        candidates = [filename]
+    else:
+        candidates = [filename, f"{filename}.json", f"{filename}.txt", f"{filename}.jsonl"]
+    
+    # Try direct path first
+    if '/' in filename:
+        mod = filename.split('/', 1)[0]
+        
+        for candidate in candidates:
+            name = candidate.split('/', 1)[1]
+            # Handle Project Root prefixes
+            if mod in ["Root", "(Project Root)", "[Project Root]"]:
+                 p = os.path.join(project_path, name)
+            else:
+                 p = os.path.join(project_path, mod, name)
+
+            if output_exists(p):
+                file_path = p
+                break
+    else:
+        # Search recursively (compressed outputs match on their logical name)
+        for root, dirs, files in os.walk(project_path):
+             # Skip hidden
+             if '/.' in root: continue
+             
+             logical_files = {logical_name(f) for f in files}
+             for candidate in candidates:
+                 if candidate in logical_files:
+                     file_path = os.path.join(root, candidate)
+                     break
+             if file_path:
+                 break
+    
+    return file_path
+
+
 def cmd_bcat(ctx: Context, arg: str):
     """
     Display generic JSON output as text with optional search.
     Usage: bcat <query> <file> OR bcat <file>
+    Flags: --include=a,b --exclude=a,b --limit=N --offset=N --first --count
     """
     if not ctx.current_project:
         console.print("[red]No active project. Use 'project <name>' first.[/red]")
@@ -856,17 +969,43 @@ def cmd_bcat(ctx: Context, arg: str):
     # Extract flags first
     include_fields = None
     exclude_fields = None
+    limit = None
+    offset = 0
+    count_only = False
     clean_parts = []
     
-    for part in parts:
+    i = 0
+    while i < len(parts):
+        part = parts[i]
         if part.startswith('--include='):
             val = part.split('=', 1)[1]
             include_fields = [f.strip() for f in val.split(',')]
         elif part.startswith('--exclude='):
             val = part.split('=', 1)[1]
             exclude_fields = [f.strip() for f in val.split(',')]
+        elif part.split('=', 1)[0] in ('--limit', '--offset'):
+            flag, _, val = part.partition('=')
+            if not val and i + 1 < len(parts):
+                i += 1
+                val = parts[i]
+            try:
+                number = int(val)
+                if number < 0:
+                    raise ValueError
+            except ValueError:
+                console.print(f"[red]{flag} expects a non-negative integer[/red]")
+                return
+            if flag == '--limit':
+                limit = number
+            else:
+                offset = number
+        elif part == '--first':
+            limit = 1
+        elif part == '--count':
+            count_only = True
         else:
             clean_parts.append(part)
+        i += 1
     
     parts = clean_parts
     
@@ -883,117 +1022,74 @@ def cmd_bcat(ctx: Context, arg: str):
         filename = parts[0]
         query = None
     else:
-        print("Usage: bcat <query string> <filename> [--include=field1,field2] [--exclude=field1]")
+        print("Usage: bcat <query string> <filename> [--include=field1,field2] [--exclude=field1] "
+              "[--limit=N] [--offset=N] [--first] [--count]")
         return
         
     # Resolve file path
-    project_path = ctx.current_project.path
-    file_path = None
-    
-    # Check if filename has extension (heuristic)
-    if filename.endswith('.json') or filename.endswith('.jsonl') or filename.endswith('.txt'):
-        search_name = filename
-    else:
-        search_name = f"{filename}.json"
+    file_path = _find_json_output(ctx.current_project.path, filename)
     
-    # Try direct path first
-    if '/' in filename:
-        mod, name = filename.split('/', 1)
-        
-        # Handle Project Root prefixes
-        if mod in ["Root", "(Project Root)", "[Project Root]"]:
-             # Treat as root file
-             p = os.path.join(project_path, name)
-        else:
-             if not name.endswith('.json') and not name.endswith('.txt') and not name.endswith('.jsonl'):
-                  name += '.json'
-             p = os.path.join(project_path, mod, name)
-
-        # Check if that exists
-        if os.path.exists(p):
-            file_path = p
-        else:
-             # Try txt extension
-             p_txt = p.replace('.json', '.txt')
-             if os.path.exists(p_txt):
-                 file_path = p_txt
-             else:
-                 # Try jsonl extension
-                 p_jsonl = p.replace('.json', '.jsonl')
-                 if os.path.exists(p_jsonl):
-                     file_path = p_jsonl
-    else:
-        # Search recursively
-        for root, dirs, files in os.walk(project_path):
-             # Skip hidden
-             if '/.' in root: continue
-             
-             if search_name in files:
-                 file_path = os.path.join(root, search_name)
-                 break
-             # Try .txt version if .json not found
-             elif search_name.replace('.json', '.txt') in files:
-                  file_path = os.path.join(root, search_name.replace('.json', '.txt'))
-                  break
-             # Try .jsonl version if .json not found
-             elif search_name.replace('.json', '.jsonl') in files:
-                  file_path = os.path.join(root, search_name.replace('.json', '.jsonl'))
-                  break
-    
-    if not file_path or not os.path.exists(file_path):
+    if not file_path or not output_exists(file_path):
         console.print(f"[red]File '{filename}' not found.[/red]")
         return
         
-    # Read file
+    # Stream: read -> parse -> filter -> project -> render.
+    # Records are never all held in memory, and --limit/--first stop reading early.
+    from utils.json_viewer import JsonLogViewer
+    from utils.record_stream import iter_records, query_records, render_batched
+    from core.record_index import indexed_query
+    
+    viewer = JsonLogViewer()
+    try:
+        predicate = viewer.compile_query(query) if query and query.strip() else None
+    except ValueError as e:
+        console.print(f"[red]Invalid query: {e}[/red]")
+        return
+    
     try:
-        data = []
-        is_json = False
+        parsed = 0
+        def counted(records):
+            nonlocal parsed
+            for record in records:
+                parsed += 1
+                yield record
         
-        # First, try to parse as JSON array
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = json.load(f)
-                if isinstance(content, list):
-                    data = content
-                    is_json = True
-                elif isinstance(content, dict):
-                    data = [content]
-                    is_json = True
-        except (json.JSONDecodeError, ValueError):
-            # Not a JSON array, will try JSONL below
-            pass
+        # Large JSONL outputs are served from their record index (seek instead of scan)
+        results = indexed_query(file_path, query, offset=offset, limit=limit)
+        if results is not None:
+            parsed = 1  # Only JSONL files get an index
+        else:
+            results = query_records(counted(iter_records(file_path)), predicate, offset=offset, limit=limit)
         
-        # If JSON array parsing didn't work, try JSONL
-        if not is_json:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line: continue
-                    try:
-                        js = json.loads(line)
-                        data.append(js)
-                        is_json = True
-                    except:
-                        pass
+        if count_only:
+            total = sum(1 for _ in results)
+            if not parsed:
+                console.print(f"[yellow]File '{os.path.basename(file_path)}' does not contain valid JSON lines.[/yellow]")
+                return
+            label = f"query: {query}" if query else "all records"
+            console.print(f"[green][+] {total} matching record(s) for {label}[/green]")
+            return
+        
+        if query:
+            console.print(f"\n[green][+] Results for query: {query}[/green]\n")
+        else:
+            console.print(f"\n[green][+] Showing records[/green]\n")
         
-        if not is_json:
+        shown = render_batched(
+            results,
+            lambda entry: viewer.format_entry(entry, include_fields=include_fields, exclude_fields=exclude_fields),
+            console.print
+        )
+        
+        if not parsed:
             console.print(f"[yellow]File '{os.path.basename(file_path)}' does not contain valid JSON lines.[/yellow]")
             console.print("[dim]Use 'cat' command to view raw text files.[/dim]")
             return
-            
-        # Use Generic Viewer
-        from utils.json_viewer import JsonLogViewer
-        viewer = JsonLogViewer(data)
         
-        if query:
-            results = viewer.advanced_search(query)
-            console.print(f"\n[green][+] Results for query: {query} ({len(results)} records)[/green]\n")
-            for entry in results:
-                viewer.print_entry(entry, include_fields=include_fields, exclude_fields=exclude_fields)
+        if limit is not None and shown == limit:
+            console.print(f"[dim]{shown} record(s) shown (limit reached, rest of the file not read)[/dim]")
         else:
-            console.print(f"\n[green][+] Showing all {len(data)} records[/green]\n")
-            for entry in data:
-                viewer.print_entry(entry, include_fields=include_fields, exclude_fields=exclude_fields)
+            console.print(f"[dim]{shown} record(s) shown[/dim]")
                 
     except Exception as e:
         console.print(f"[red]Error processing file: {e}[/red]")
@@ -1001,6 +1097,336 @@ def cmd_bcat(ctx: Context, arg: str):
 
 
 
+def cmd_bstats(ctx: Context, arg: str):
+    """
+    Aggregate a JSON output without printing its records.
+    Usage:
+      bstats count <file>                              -> Number of records
+      bstats uniq <file> <field>                       -> Distinct values with counts
+      bstats top <file> <field> [N]                    -> N most frequent values (default 10)
+      bstats group <file> <field> [count] [sum|min|max|avg:<field>]...
+      bstats hist <file> <field> [bins]                -> Histogram of a numeric field
+    Flags: --where=<query> filters records first (bcat query syntax)
+    Fields may be nested paths: tech[*], a.b.c
+    """
+    from utils.aggregate import run_stats
+    from utils.query import compile_query
+    from utils.record_stream import iter_records, query_records
+    from core.record_index import indexed_query
+    import shlex
+    
+    if not ctx.current_project:
+        console.print("[red]No active project. Use 'project <name>' first.[/red]")
+        return
+    
+    usage = "Usage: bstats <count|uniq|top|group|hist> <file> [field] [args] [--where=<query>]"
+    try:
+        parts = shlex.split(arg or "")
+    except ValueError:
+        parts = (arg or "").split()
+    
+    where = None
+    clean_parts = []
+    for part in parts:
+        if part.startswith('--where='):
+            where = part.split('=', 1)[1]
+        else:
+            clean_parts.append(part)
+    parts = clean_parts
+    
+    if len(parts) < 2:
+        print(usage)
+        print("Example: bstats top httpx tech 20 --where='status_code==200'")
+        return
+    
+    op, filename, extra = parts[0].lower(), parts[1], parts[2:]
+    field = extra[0] if extra else None
+    n = 10
+    bins = 10
+    aggregates = []
+    try:
+        if op == 'top' and len(extra) > 1:
+            n = int(extra[1])
+        elif op == 'hist' and len(extra) > 1:
+            bins = int(extra[1])
+        elif op == 'group':
+            aggregates = extra[1:] or ['count']
+    except ValueError:
+        console.print(f"[red]{usage}[/red]")
+        return
+    
+    file_path = _find_json_output(ctx.current_project.path, filename)
+    if not file_path or not output_exists(file_path):
+        console.print(f"[red]File '{filename}' not found.[/red]")
+        return
+    
+    try:
+        predicate = compile_query(where) if where and where.strip() else None
+        records = indexed_query(file_path, where)
+        if records is None:
+            records = query_records(iter_records(file_path), predicate)
+        result = run_stats(records, op, field, n=n, aggregates=aggregates, bins=bins)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        return
+    except Exception as e:
+        console.print(f"[red]Error processing file: {e}[/red]")
+        return
+    
+    title = f"{op} {field or ''}".strip() + (f" where {where}" if where else "")
+    
+    if op == 'count':
+        console.print(f"[green][+] {result['count']} record(s)[/green]" + (f" [dim]({where})[/dim]" if where else ""))
+        return
+    
+    table = Table(title=title, box=box.SIMPLE, header_style="bold blue")
+    if op in ('uniq', 'top'):
+        table.add_column(field, style="cyan")
+        table.add_column("Count", justify="right", style="yellow")
+        for item in result['values']:
+            table.add_row(item['value'], str(item['count']))
+    elif op == 'group':
+        columns = [k for k in (result['groups'][0] if result['groups'] else {field: None, 'count': 0})]
+        for col in columns:
+            table.add_column(col, style="cyan" if col == field else "yellow", justify="left" if col == field else "right")
+        for group in result['groups']:
+            table.add_row(*[
+                ("-" if group[c] is None else f"{group[c]:g}" if isinstance(group[c], float) else str(group[c]))
+                for c in columns
+            ])
+    else:
+        peak = max((b['count'] for b in result['bins']), default=0)
+        table.add_column("Range", style="cyan")
+        table.add_column("Count", justify="right", style="yellow")
+        table.add_column("")
+        for b in result['bins']:
+            bar = "#" * (int(30 * b['count'] / peak) if peak else 0)
+            table.add_row(f"{b['low']:g} - {b['high']:g}", str(b['count']), f"[green]{bar}[/green]")
+    
+    console.print(table)
+    console.print(f"[dim]{result['records']} record(s) aggregated[/dim]")
+
+
+def cmd_stats(ctx: Context, arg: str):
+    """
+    Show internal metrics of this session (runs, steps, subprocesses, DB).
+    Usage:
+      stats              -> All metrics with a value
+      stats <filter>     -> Metrics whose name contains <filter> (e.g. stats step)
+      stats --prom       -> Prometheus text format (as served on /metrics)
+    """
+    from utils.metrics import registry
+    
+    arg = (arg or "").strip()
+    if arg == '--prom':
+        console.print(registry.render_prometheus(), markup=False, highlight=False)
+        return
+    
+    rows = [row for row in registry.summary() if not arg or arg in row[0]]
+    rows = [row for row in rows if row[2] not in ("0", "")]
+    if not rows:
+        console.print("[yellow]No metrics recorded yet.[/yellow]")
+        return
+    
+    table = Table(title="ReconFlow metrics", box=box.SIMPLE, header_style="bold blue")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Labels", style="dim")
+    table.add_column("Value", justify="right", style="yellow")
+    for name, labels, value in rows:
+        label_text = ", ".join(f"{k}={v}" for k, v in labels.items())
+        table.add_row(name.replace("reconflow_", ""), label_text, value)
+    console.print(table)
+
+def _resolve_trace(ctx: Context, name: str):
+    from utils.trace import list_traces
+    project_path = ctx.current_project.path if ctx.current_project else None
+    traces = list_traces(project_path)
+    if not name or name == 'latest':
+        return traces[0] if traces else None
+    if os.path.exists(name):
+        return name
+    matches = [path for path in traces if os.path.basename(path).startswith(name)]
+    return matches[0] if matches else None
+
+def cmd_trace(ctx: Context, arg: str):
+    """
+    Run timeline traces (recorded with 'run --trace').
+    Usage:
+      trace                          -> List traces of the current project
+      trace show [name|latest]       -> Parallelism summary and per-step waits
+      trace export [name|latest] <destination>
+                                     -> Copy a trace (open it in ui.perfetto.dev or chrome://tracing)
+    """
+    from utils.trace import list_traces, load_trace, summarize
+    from datetime import datetime
+    import shutil
+    
+    parts = (arg or "").split()
+    action = parts[0] if parts else 'list'
+    
+    if action == 'list':
+        project_path = ctx.current_project.path if ctx.current_project else None
+        traces = list_traces(project_path)
+        if not traces:
+            console.print("[yellow]No traces yet. Record one with 'run --trace'.[/yellow]")
+            return
+        table = Table(title="Run traces", box=box.SIMPLE, header_style="bold blue")
+        table.add_column("Name", style="cyan")
+        table.add_column("Recorded", style="dim")
+        table.add_column("Size", justify="right", style="yellow")
+        for path in traces:
+            recorded = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M:%S")
+            table.add_row(os.path.basename(path), recorded, _format_size(os.path.getsize(path)))
+        console.print(table)
+        return
+    
+    if action == 'export':
+        if len(parts) < 2:
+            print("Usage: trace export [name|latest] <destination>")
+            return
+        source = _resolve_trace(ctx, parts[1] if len(parts) > 2 else 'latest')
+        if not source:
+            console.print("[red]Trace not found.[/red]")
+            return
+        destination = parts[-1]
+        if os.path.isdir(destination):
+            destination = os.path.join(destination, os.path.basename(source))
+        shutil.copyfile(source, destination)
+        console.print(f"[green]✓ Trace exported to {destination}[/green]")
+        console.print("[dim]Open it in https://ui.perfetto.dev or chrome://tracing[/dim]")
+        return
+    
+    if action != 'show':
+        print("Usage: trace [list|show [name|latest]|export [name|latest] <destination>]")
+        return
+    
+    path = _resolve_trace(ctx, parts[1] if len(parts) > 1 else 'latest')
+    if not path:
+        console.print("[red]Trace not found.[/red]")
+        return
+    try:
+        runs = summarize(load_trace(path))
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Could not read trace: {e}[/red]")
+        return
+    
+    console.print(f"[bold]Trace:[/bold] {path}")
+    for run in runs:
+        workers = run['max_workers'] or '?'
+        console.print(
+            f"\n[bold cyan]{run['name']}[/bold cyan] [dim]({run['status'] or 'unfinished'})[/dim]  "
+            f"wall {run['wall_us'] / 1e6:.2f}s, busy {run['busy_us'] / 1e6:.2f}s, "
+            f"parallelism {run['parallelism']:.2f}, peak {run['peak_running']} running, "
+            f"{run['workers_used']}/{workers} workers used, idle worker time {run['idle_us'] / 1e6:.2f}s, "
+            f"queued {run['queued_us'] / 1e6:.2f}s"
+        )
+        table = Table(box=box.SIMPLE, header_style="bold blue")
+        table.add_column("Step", style="cyan")
+        table.add_column("Start", justify="right", style="dim")
+        table.add_column("Queued", justify="right", style="yellow")
+        table.add_column("Run", justify="right", style="green")
+        table.add_column("Lane", justify="right", style="dim")
+        table.add_column("Status")
+        table.add_column("Held back by", style="magenta")
+        for step in run['steps']:
+            table.add_row(step['name'], f"{step['offset'] / 1e6:.2f}s", f"{step['wait'] / 1e6:.2f}s",
+                          f"{step['dur'] / 1e6:.2f}s", str(step['lane']), step['status'] or "",
+                          step['blocked_by'] or "")
+        console.print(table)
+        if run['serialized']:
+            console.print(f"[yellow]Serialized by 'parallel: false': {', '.join(run['serialized'])}[/yellow]")
+
+def cmd_storage(ctx: Context, arg: str):
+    """
+    Show or configure the storage policy of the current project.
+    Usage:
+      storage                                   -> Show policy
+      storage set [codec=gzip|zstd] [compress_after=<days>] [retention=<days>]
+      storage compact                           -> Apply the policy now (foreground)
+    Use 'off' as a value to disable compression or retention.
+    """
+    from core.storage import compact_project, available_codecs
+    
+    if not ctx.current_project:
+        console.print("[red]No active project. Use 'project <name>' first.[/red]")
+        return
+    
+    project = ctx.current_project
+    args = arg.split() if arg else []
+    
+    if args and args[0] == 'set':
+        fields = {}
+        keys = {'codec': 'codec', 'compress_after': 'compress_after_days', 'retention': 'retention_days'}
+        for pair in args[1:]:
+            if '=' not in pair:
+                print("Usage: storage set [codec=gzip|zstd] [compress_after=<days>] [retention=<days>]")
+                return
+            key, val = pair.split('=', 1)
+            if key not in keys:
+                console.print(f"[red]Unknown storage setting '{key}'. Use: {', '.join(keys)}[/red]")
+                return
+            if key == 'codec':
+                if val not in available_codecs():
+                    console.print(f"[red]Codec '{val}' is not available. Use: {', '.join(available_codecs())}[/red]")
+                    return
+                fields['codec'] = val
+            elif val.lower() in ('off', 'none', 'never'):
+                fields[keys[key]] = None
+            elif val.isdigit():
+                fields[keys[key]] = int(val)
+            else:
+                console.print(f"[red]'{val}' is not a number of days.[/red]")
+                return
+        
+        ctx.project_repo.set_storage_policy(project.id, **fields)
+        console.print("[green]✓ Storage policy updated.[/green]")
+        args = []
+    
+    policy = ctx.project_repo.get_storage_policy(project.id)
+    
+    if args and args[0] == 'compact':
+        if not policy or (policy.compress_after_days is None and policy.retention_days is None):
+            console.print("[yellow]No storage policy set. Use 'storage set ...' first.[/yellow]")
+            return
+        if ctx.storage_manager.is_running(project.id):
+            console.print("[yellow]A background compaction is already running for this project.[/yellow]")
+            return
+        stats = compact_project(
+            project.path,
+            codec=policy.codec or 'gzip',
+            compress_after_days=policy.compress_after_days,
+            retention_days=policy.retention_days
+        )
+        console.print(f"[green]✓ Compressed {stats['compressed']} output(s), evicted {stats['evicted']}, "
+                      f"saved {_format_size(stats['bytes_saved'])}.[/green]")
+        return
+    
+    if args:
+        print("Usage: storage [set ...|compact]")
+        return
+    
+    def fmt_days(days):
+        return f"{days} day(s)" if days is not None else "never"
+    
+    table = Table(title=f"Storage Policy: {project.name}", show_header=False, box=box.ROUNDED)
+    table.add_column("Setting", style="bold cyan")
+    table.add_column("Value", style="white")
+    table.add_row("Codec", (policy.codec if policy else None) or "gzip")
+    table.add_row("Compress after", fmt_days(policy.compress_after_days if policy else None))
+    table.add_row("Retention", fmt_days(policy.retention_days if policy else None))
+    
+    last = ctx.storage_manager.last_stats.get(project.id)
+    if ctx.storage_manager.is_running(project.id):
+        table.add_row("Background", "[yellow]compacting...[/yellow]")
+    elif last:
+        table.add_row("Last compaction", f"{last['compressed']} compressed, {last['evicted']} evicted, "
+                                         f"{_format_size(last['bytes_saved'])} saved")
+    
+    console.print()
+    console.print(table)
+    console.print()
+
+
 def cmd_list_modules(ctx: Context, mode: str):
     """
     mode: 'modules' | 'all'
@@ -1283,6 +1709,9 @@ COMMANDS = {
     'ls': cmd_ls,
     'cat': cmd_cat,
     'bcat': cmd_bcat,
+    'bstats': cmd_bstats,
+    'stats': cmd_stats,
+    'trace': cmd_trace,
     'help': cmd_help,
     'search': cmd_search,
     'options': cmd_options,
@@ -1291,4 +1720,5 @@ COMMANDS = {
     'import': cmd_import,
     'list': cmd_list,
     'info': cmd_info,
+    'storage': cmd_storage,
 }
@@ -7,8 +7,9 @@ from rich.console import Console
 from core.context import Context
 from cli.commands import (
     cmd_use, cmd_back, cmd_set, cmd_setg, cmd_run, cmd_show,
-    cmd_import, cmd_search, cmd_cat, cmd_bcat, cmd_ls,
-    cmd_settings, cmd_create_project, cmd_info, cmd_list_modules
+    cmd_import, cmd_search, cmd_cat, cmd_bcat, cmd_bstats, cmd_ls,
+    cmd_settings, cmd_create_project, cmd_info, cmd_list_modules,
+    cmd_storage, cmd_stats, cmd_trace
 )
 from cli.session_cmd import cmd_sessions
 
@@ -140,8 +141,10 @@ class ReconFlowShell(cmd2.Cmd):
     def do_run(self, arg):
         """
         Execute the module.
-        Usage: run [-j] [-d]
+        Usage: run [-j] [-d] [--trace[=<file>]] [--profile[=cpu|mem]]
         -j, -d: Run in background (detached)
+        --trace: Record a timeline trace of the run (see 'trace')
+        --profile: Profile ReconFlow itself during the run (foreground only)
         """
         cmd_run(self.context, arg)
 
@@ -184,12 +187,13 @@ class ReconFlowShell(cmd2.Cmd):
             project <name|id>
             project -c <name>
             project -d <name>
+            project -i [name]
         """
         cmd_create_project(self.context, arg)
 
     def complete_project(self, text, line, begidx, endidx):
         """Autocomplete for 'project' command."""
-        flags = ['-c', '-d']
+        flags = ['-c', '-d', '-i']
         try:
             projects = [p.name for p in self.context.project_repo.get_all()]
         except:
@@ -227,6 +231,8 @@ class ReconFlowShell(cmd2.Cmd):
             return []
             
         for root_dir, dirs, files in os.walk(root):
+            # Skip internal directories (.reconflow manifest, .cache, ...)
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
             for f in files:
                 rel_path = os.path.relpath(os.path.join(root_dir, f), root)
                 if rel_path.startswith(text):
@@ -240,6 +246,40 @@ class ReconFlowShell(cmd2.Cmd):
     def complete_bcat(self, text, line, begidx, endidx):
         return self._complete_project_files(text)
 
+    def do_bstats(self, arg):
+        """
+        Aggregate a JSON output: count, uniq, top, group by, histogram.
+        Usage: bstats <count|uniq|top|group|hist> <file> [field] [args] [--where=<query>]
+        """
+        cmd_bstats(self.context, arg)
+
+    def complete_bstats(self, text, line, begidx, endidx):
+        return self._complete_project_files(text)
+
+    def do_stats(self, arg):
+        """
+        Show internal metrics of this session (runs, steps, subprocesses, DB).
+        Usage: stats [filter] | stats --prom
+        """
+        cmd_stats(self.context, arg)
+
+    def do_trace(self, arg):
+        """
+        List, summarize or export run timeline traces (recorded with 'run --trace').
+        Usage: trace | trace show [name|latest] | trace export [name|latest] <destination>
+        """
+        cmd_trace(self.context, arg)
+
+    def do_storage(self, arg):
+        """
+        Show or configure output compression and retention for the current project.
+        Usage:
+            storage
+            storage set [codec=gzip|zstd] [compress_after=<days>] [retention=<days>]
+            storage compact
+        """
+        cmd_storage(self.context, arg)
+
     def do_import(self, arg):
         """Import a module from a YAML file."""
         cmd_import(self.context, arg)
@@ -306,9 +346,15 @@ class ReconFlowShell(cmd2.Cmd):
                 ("ls", "List files in current project (alias for list_files)"),
                 ("cat", "View file content in project"),
                 ("bcat", "View JSON/Text files with filtering"),
+                ("bstats", "Aggregate JSON outputs (count/top/group/hist)"),
+            ]),
+            ("Storage Commands", [
+                ("storage", "Output compression and retention policy"),
             ]),
              ("Job Commands", [
                 ("sessions", "Manage background sessions"),
+                ("stats", "Internal metrics (runs, steps, subprocesses, DB)"),
+                ("trace", "Run timelines recorded with 'run --trace'"),
                 # run -d is a flag, not a separate command, but listed here as context
             ]),
             ("Project Commands", [
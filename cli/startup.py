@@ -116,6 +116,7 @@ def run_projects_menu(ctx: Context):
                 show_loading("Loading project")
                 proj = ctx.project_repo.get_by_name(p_name)
                 ctx.current_project = proj
+                ctx.schedule_storage_compaction()
                 show_success(f"Loaded project: {proj.name}")
                 return True  # Project loaded, return to CLI
             
@@ -5,9 +5,15 @@ class AppConfig(BaseModel):
     name: str = "ReconFlow"
     version: str = "0.1.0"
 
+class ServerConfig(BaseModel):
+    max_concurrent_runs: int = 4       # Executions running at once (API server)
+    max_runs_per_project: int = 2      # Executions running at once per project
+    shutdown_timeout: float = 30.0     # Seconds to wait for running executions on shutdown
+
 class Config(BaseModel):
     """
     Main configuration schema.
     """
     app: AppConfig = AppConfig()
+    server: ServerConfig = ServerConfig()
     # Add other sections as needed (e.g. tools_path, db_url)
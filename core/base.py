@@ -24,6 +24,8 @@ class BaseModule:
     def __init__(self):
         # Deep copy options to avoid shared state issues between instances if any
         self.options = {k: v.model_copy() for k, v in self.options.items()}
+        # Same for metadata: load_from_yaml() updates it in place
+        self.meta = dict(self.meta)
 
     def update_option(self, key: str, value: str):
         if key in self.options:
@@ -4,9 +4,10 @@ from projects.manager import ProjectManager
 from tools.manager import ToolManager
 from core.session_manager import SessionManager
 from utils.logger import setup_logger
-from db.session import get_session
+from db.session import get_session, create_new_session
 from db.repositories.project_repo import ProjectRepository
 from core.file_manager import FileManager
+from core.storage import StorageManager
 
 class Context:
     """
@@ -40,6 +41,7 @@ class Context:
 
         # self.workflow_manager = WorkflowManager() - Removed
         self.session_manager = SessionManager()
+        self.storage_manager = StorageManager()
         
         # State
         self.current_project = None
@@ -49,6 +51,42 @@ class Context:
         self.last_shown_map = []  # List of paths corresponding to IDs displayed
         self.last_shown_type = None # 'module' or 'workflow'
 
+    def fork(self) -> 'Context':
+        """
+        Lightweight per-run view of a long-lived context (API server).
+        Shares the configuration, module registry and managers; owns its
+        DB session and run state so concurrent runs do not interfere.
+        Call close() when the run is over.
+        """
+        view = Context.__new__(Context)
+        view.logger = self.logger
+        view.config = self.config
+
+        view.session_db = create_new_session()
+        view.project_repo = ProjectRepository(view.session_db)
+        view.file_manager = FileManager(view.project_repo)
+
+        from core.settings_manager import SettingsManager
+        view.settings_manager = SettingsManager(view.session_db)
+
+        view.project_manager = self.project_manager
+        view.tool_manager = self.tool_manager
+        view.session_manager = self.session_manager
+        view.storage_manager = self.storage_manager
+
+        view.current_project = None
+        view.active_module = None
+        view.last_shown_map = []
+        view.last_shown_type = None
+        return view
+
+    def close(self):
+        """Release the DB session of a forked view"""
+        try:
+            self.session_db.close()
+        except Exception:
+            pass
+
     def get_global_context(self) -> dict:
         """
         Returns a dictionary of global variables, secrets, and system info.
@@ -82,3 +120,16 @@ class Context:
         ctx.update(vars_dict)
         
         return ctx
+
+    def schedule_storage_compaction(self) -> bool:
+        """
+        Apply the active project's storage policy (compression/retention) in the background.
+        Returns True if a compaction was started.
+        """
+        if not self.current_project:
+            return False
+        try:
+            policy = self.project_repo.get_storage_policy(self.current_project.id)
+        except Exception:
+            return False
+        return self.storage_manager.schedule(self.current_project, policy)
@@ -0,0 +1,180 @@
+"""
+Built-in 'dedupe' step: merge several line outputs and keep only new lines
+(replaces 'anew' + 'rm' pipelines).
+
+Lines are deduplicated in memory while they fit in the memory budget and
+written out immediately, in first-seen order. Past the budget, the seen lines
+are spilled to sorted runs on disk, and the remaining new lines are found with
+a k-way merge (they come out sorted).
+
+An optional persistent seen set (<project>/.reconflow/seen/<name>) makes
+a step only emit lines never produced by earlier runs.
+"""
+import os
+import re
+import heapq
+import tempfile
+from itertools import chain, groupby
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from core.storage import open_output
+from core.manifest import MANIFEST_DIR
+
+# Rough per-line cost of a Python str in a set (object header + hash slot)
+LINE_OVERHEAD = 90
+
+DEFAULT_MEMORY_MB = 256
+
+SEEN_DIR = os.path.join(MANIFEST_DIR, "seen")
+
+# Merge tags: for equal lines the suppressing tag sorts first
+_SUPPRESS = 0
+_CANDIDATE = 1
+
+
+def iter_input_lines(paths: Iterable[str]) -> Iterator[str]:
+    """Yield non-empty lines (without line endings) of (possibly compressed) files"""
+    for path in paths:
+        with open_output(path, 'rt') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if line:
+                    yield line
+
+
+def seen_set_path(project_path: str, name: str) -> str:
+    """Location of a persistent seen set (name is sanitized)"""
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+    return os.path.join(project_path, SEEN_DIR, safe_name)
+
+
+class ExternalDeduper:
+    """
+    Streaming dedupe of lines with a memory budget.
+
+    Usage:
+        deduper = ExternalDeduper(memory_mb=256, seen_path=...)
+        stats = deduper.run(lines, out_file)
+    """
+
+    def __init__(self, memory_mb: int = DEFAULT_MEMORY_MB, seen_path: Optional[str] = None,
+                 tmp_dir: Optional[str] = None):
+        self.memory_limit = memory_mb * 1024 * 1024
+        self.seen_path = seen_path
+        self.tmp_dir = tmp_dir
+        self.stats = {'input': 0, 'new': 0, 'runs': 0}
+
+    def _spill(self, lines: Iterable[str], work_dir: str) -> str:
+        fd, path = tempfile.mkstemp(prefix="run-", dir=work_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for line in sorted(lines):
+                f.write(line)
+                f.write('\n')
+        self.stats['runs'] += 1
+        return path
+
+    @staticmethod
+    def _read_run(path: str, tag: int) -> Iterator[Tuple[str, int]]:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                yield line.rstrip('\n'), tag
+
+    def run(self, lines: Iterable[str], out: IO[str]) -> Dict[str, int]:
+        """Write the new lines to out; update the seen set (if any) once complete"""
+        if self.tmp_dir:
+            os.makedirs(self.tmp_dir, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix="reconflow-dedupe-", dir=self.tmp_dir) as work_dir:
+            suppress_runs: List[str] = []
+            seen = set()
+            used = 0
+
+            if self.seen_path and os.path.exists(self.seen_path):
+                if os.path.getsize(self.seen_path) < self.memory_limit // 4:
+                    with open(self.seen_path, 'r', encoding='utf-8', errors='replace') as f:
+                        seen.update(line.rstrip('\n') for line in f)
+                    used = sum(len(line) + LINE_OVERHEAD for line in seen)
+                else:
+                    # Too big to load: it takes part in the merge as a sorted run
+                    suppress_runs.append(self.seen_path)
+
+            lines = iter(lines)
+
+            if not suppress_runs:
+                # In-memory phase: emit new lines as soon as they are read
+                for line in lines:
+                    self.stats['input'] += 1
+                    if line in seen:
+                        continue
+                    seen.add(line)
+                    out.write(line)
+                    out.write('\n')
+                    self.stats['new'] += 1
+                    used += len(line) + LINE_OVERHEAD
+                    if used > self.memory_limit:
+                        break
+                else:
+                    if self.seen_path:
+                        self._save_seen_set(sorted(seen))
+                    return self.stats
+
+                # Budget exceeded: everything seen so far only suppresses from now on
+                suppress_runs.append(self._spill(seen, work_dir))
+
+            # External phase: spill sorted runs of candidates, then k-way merge
+            candidate_runs: List[str] = []
+            seen = set()
+            used = 0
+            for line in lines:
+                self.stats['input'] += 1
+                if line in seen:
+                    continue
+                seen.add(line)
+                used += len(line) + LINE_OVERHEAD
+                if used > self.memory_limit:
+                    candidate_runs.append(self._spill(seen, work_dir))
+                    seen = set()
+                    used = 0
+            if seen:
+                candidate_runs.append(self._spill(seen, work_dir))
+                seen = set()
+
+            merged = heapq.merge(
+                *[self._read_run(p, _SUPPRESS) for p in suppress_runs],
+                *[self._read_run(p, _CANDIDATE) for p in candidate_runs],
+            )
+
+            def unique_lines():
+                for line, group in groupby(merged, key=lambda item: item[0]):
+                    first_tag = next(group)[1]
+                    if first_tag == _CANDIDATE:
+                        out.write(line)
+                        out.write('\n')
+                        self.stats['new'] += 1
+                    yield line
+
+            if self.seen_path:
+                self._save_seen_set(unique_lines())
+            else:
+                # Consume the merge (it writes the output)
+                for _ in unique_lines():
+                    pass
+
+        return self.stats
+
+    def _save_seen_set(self, sorted_lines: Iterable[str]):
+        """Atomically replace the seen set with the given sorted unique lines"""
+        os.makedirs(os.path.dirname(self.seen_path), exist_ok=True)
+        tmp_path = f"{self.seen_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for line in sorted_lines:
+                f.write(line)
+                f.write('\n')
+        os.replace(tmp_path, self.seen_path)
+
+
+def dedupe_files(paths: Iterable[str], out: IO[str], extra_lines: Iterable[str] = (),
+                 seen_path: Optional[str] = None, memory_mb: int = DEFAULT_MEMORY_MB,
+                 tmp_dir: Optional[str] = None) -> Dict[str, int]:
+    """Dedupe the lines of several files (plus extra in-memory lines) into out"""
+    deduper = ExternalDeduper(memory_mb=memory_mb, seen_path=seen_path, tmp_dir=tmp_dir)
+    return deduper.run(chain(iter_input_lines(paths), extra_lines), out)
@@ -3,6 +3,7 @@ import shutil
 from pathlib import Path
 from db.repositories.project_repo import ProjectRepository
 from db.models.project import Project
+from core.storage import open_output, output_exists
 
 class FileManager:
     def __init__(self, project_repo: ProjectRepository):
@@ -29,14 +30,11 @@ class FileManager:
 
         # Get stats
         size = original_file_path.stat().st_size
-        
-        # Add to DB
-        self.project_repo.add_file_record(
-            project_id=project.id,
-            tool_name=tool_name,
-            file_path=str(original_file_path.absolute()),
-            file_size_bytes=size
-        )
+        records = [{
+            'tool_name': tool_name,
+            'file_path': str(original_file_path.absolute()),
+            'file_size_bytes': size
+        }]
         print(f"Saved {original_file_path} (Size: {size})")
 
         # "Always TXT" Rule
@@ -55,15 +53,48 @@ class FileManager:
              with open(txt_file_path, 'w') as f:
                  f.write(txt_content)
             
-             size_txt = txt_file_path.stat().st_size
-             self.project_repo.add_file_record(
-                project_id=project.id,
-                tool_name=tool_name,
-                file_path=str(txt_file_path.absolute()),
-                file_size_bytes=size_txt
-             )
+             records.append({
+                'tool_name': tool_name,
+                'file_path': str(txt_file_path.absolute()),
+                'file_size_bytes': txt_file_path.stat().st_size
+             })
              print(f"Saved .txt copy {txt_file_path}")
 
+        # Add to DB (original + .txt copy in one transaction)
+        self.project_repo.add_file_records(project.id, records)
+
+    def import_directory(self, project: Project, directory: str = None, tool_name: str = "import") -> int:
+        """
+        Registers every file under the project directory (or a sub-directory of it)
+        that is not yet in the catalog. Hidden entries and .meta.json sidecars are skipped.
+        Returns the number of newly registered files.
+        """
+        root = directory or project.path
+        if not os.path.isdir(root):
+            return 0
+
+        known = self.project_repo.get_file_paths(project.id)
+
+        def walk(path):
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from walk(entry.path)
+                    elif entry.is_file() and not entry.name.endswith('.meta.json'):
+                        abs_path = os.path.abspath(entry.path)
+                        if abs_path in known:
+                            continue
+                        yield {
+                            'tool_name': tool_name,
+                            'file_path': abs_path,
+                            'file_size_bytes': entry.stat().st_size
+                        }
+
+        ids = self.project_repo.add_file_records(project.id, walk(root))
+        return len(ids)
+
     def get_file_content(self, project_id: int, filename: str) -> str | None:
         """
         Retrieves file content for a given filename in a project.
@@ -101,9 +132,9 @@ class FileManager:
              target_record = self.project_repo.get_file_by_name(project_id, filename)
 
         if target_record:
-            if os.path.exists(target_record.file_path):
+            if output_exists(target_record.file_path):
                 try:
-                    with open(target_record.file_path, 'r') as f:
+                    with open_output(target_record.file_path, 'rt', errors='strict') as f:
                         return f.read()
                 except UnicodeDecodeError:
                     return "[Error: Binary file, cannot display in terminal]"
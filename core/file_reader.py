@@ -4,18 +4,74 @@ Can be used by CLI, API, or UI
 """
 import os
 import json
-from typing import Dict, Any, Optional
+import mmap
+from collections import deque
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from core.storage import (
+    open_output, output_exists, logical_name, resolve_output_path, codec_for, CHUNK_SIZE
+)
+from core.record_index import indexed_lines, indexed_query
+
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Default cap on the raw text returned by read_output_file (use read_range/iter_chunks for more)
+MAX_INLINE_BYTES = 1024 * 1024
+
+
+def sidecar_paths(filepath: str) -> Dict[str, Optional[str]]:
+    """
+    Locate the sidecars of an output.
+    Auto-saved step outputs have no extension: '<path>.meta.json'.
+    Legacy outputs are '<name>.txt' with '<name>.json' / '<name>.meta.json'.
+    """
+    path = logical_name(filepath)
+    meta_candidates = [f"{path}.meta.json"]
+    json_path = None
+    if path.endswith('.txt'):
+        base = path[:-len('.txt')]
+        meta_candidates.append(f"{base}.meta.json")
+        json_path = f"{base}.json"
+    
+    meta_path = next((p for p in meta_candidates if os.path.exists(p)), None)
+    return {
+        'meta': meta_path,
+        'json': json_path if json_path and os.path.exists(json_path) else None,
+    }
+
+
+def parse_byte_range(spec: str, size: int) -> Tuple[int, int]:
+    """
+    Parse a single HTTP byte range ('bytes=0-99', 'bytes=100-', 'bytes=-500')
+    into an inclusive (start, end). Raises ValueError if unsatisfiable.
+    """
+    unit, _, ranges = spec.partition('=')
+    if unit.strip() != 'bytes' or ',' in ranges:
+        raise ValueError("Only single byte ranges are supported")
+    first, _, last = ranges.strip().partition('-')
+    if not first:
+        length = int(last)
+        if length <= 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
 
 
 class FileReader:
     """Server-side file reader for output files"""
     
-    def read_output_file(self, filepath: str) -> Dict[str, Any]:
+    def read_output_file(self, filepath: str, max_bytes: int = MAX_INLINE_BYTES) -> Dict[str, Any]:
         """
         Read output file and return structured data
         
         Args:
-            filepath: Path to the output file (.txt)
+            filepath: Path to the output file (step output or legacy .txt)
+            max_bytes: Maximum raw text returned (None for everything)
             
         Returns:
             {
@@ -23,57 +79,196 @@ class FileReader:
                 'has_json': bool,
                 'json_data': List[Dict] or None,
                 'raw_text': str,
+                'truncated': bool,
                 'metadata': Dict or None
             }
         """
-        # Check if file exists
-        if not os.path.exists(filepath):
+        # Check if file exists (plain or compressed)
+        if not output_exists(filepath):
             return {
                 'exists': False,
                 'has_json': False,
                 'json_data': None,
                 'raw_text': '',
+                'truncated': False,
                 'metadata': None
             }
         
-        result = {'exists': True}
+        result = {'exists': True, 'truncated': False}
         
-        # Read raw text
+        # Read raw text (bounded)
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                result['raw_text'] = f.read()
+            with open_output(filepath, 'rb') as f:
+                if max_bytes is None:
+                    data = f.read()
+                else:
+                    data = f.read(max_bytes + 1)
+                    if len(data) > max_bytes:
+                        data = data[:max_bytes]
+                        result['truncated'] = True
+            result['raw_text'] = data.decode('utf-8', errors='replace')
         except Exception as e:
             result['raw_text'] = f"Error reading file: {e}"
         
-        # Try to read JSON file
-        json_path = filepath.replace('.txt', '.json')
-        if os.path.exists(json_path):
+        sidecars = sidecar_paths(filepath)
+        
+        # Try to read JSON sidecar (legacy .txt outputs)
+        result['has_json'] = False
+        result['json_data'] = None
+        if sidecars['json']:
             try:
-                with open(json_path, 'r', encoding='utf-8') as f:
+                with open(sidecars['json'], 'r', encoding='utf-8') as f:
                     result['json_data'] = json.load(f)
                     result['has_json'] = True
             except Exception as e:
-                result['has_json'] = False
-                result['json_data'] = None
                 print(f"[!] Failed to read JSON file: {e}")
-        else:
-            result['has_json'] = False
-            result['json_data'] = None
         
         # Read metadata
-        meta_path = filepath.replace('.txt', '.meta.json')
-        if os.path.exists(meta_path):
-            try:
-                with open(meta_path, 'r', encoding='utf-8') as f:
-                    result['metadata'] = json.load(f)
-            except Exception as e:
-                result['metadata'] = None
-                print(f"[!] Failed to read metadata: {e}")
-        else:
-            result['metadata'] = None
+        result['metadata'] = self.read_metadata(filepath)
         
         return result
     
+    def read_metadata(self, filepath: str) -> Optional[Dict[str, Any]]:
+        """Metadata sidecar of an output, or None"""
+        meta_path = sidecar_paths(filepath)['meta']
+        if not meta_path:
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[!] Failed to read metadata: {e}")
+            return None
+    
+    def size(self, filepath: str) -> Optional[int]:
+        """
+        Byte size of the readable content, or None if unknown without
+        decompressing (compressed outputs).
+        """
+        real_path = resolve_output_path(filepath)
+        if real_path is None or codec_for(real_path):
+            return None
+        return os.path.getsize(real_path)
+    
+    def iter_chunks(self, filepath: str, start: int = 0, end: Optional[int] = None,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Yield bytes [start, end) of an output in chunks.
+        Plain files are mmap'd (the OS pages data in on demand);
+        compressed outputs are decompressed as a stream and skipped up to start.
+        """
+        real_path = resolve_output_path(filepath)
+        if real_path is None:
+            raise FileNotFoundError(filepath)
+        
+        if codec_for(real_path) is None:
+            size = os.path.getsize(real_path)
+            end = size if end is None else min(end, size)
+            if start >= end:
+                return
+            with open(real_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(start, end, chunk_size):
+                    yield mm[offset:min(offset + chunk_size, end)]
+            return
+        
+        with open_output(real_path, 'rb') as f:
+            position = 0
+            while position < start:
+                skipped = len(f.read(min(chunk_size, start - position)))
+                if not skipped:
+                    return
+                position += skipped
+            while end is None or position < end:
+                want = chunk_size if end is None else min(chunk_size, end - position)
+                data = f.read(want)
+                if not data:
+                    return
+                position += len(data)
+                yield data
+    
+    def read_range(self, filepath: str, start: int, end: Optional[int] = None) -> bytes:
+        """Bytes [start, end) of an output"""
+        return b"".join(self.iter_chunks(filepath, start, end))
+    
+    def head(self, filepath: str, n: int = 10) -> List[str]:
+        """First n lines"""
+        if n <= 0:
+            return []
+        with open_output(filepath, 'rt') as f:
+            return [line.rstrip('\n') for line in islice(f, n)]
+    
+    def tail(self, filepath: str, n: int = 10) -> List[str]:
+        """
+        Last n lines. Plain files are read backwards from the end in blocks;
+        compressed outputs have to be streamed.
+        """
+        if n <= 0:
+            return []
+        real_path = resolve_output_path(filepath)
+        if real_path is None:
+            raise FileNotFoundError(filepath)
+        
+        if codec_for(real_path):
+            with open_output(real_path, 'rt') as f:
+                return [line.rstrip('\n') for line in deque(f, maxlen=n)]
+        
+        with open(real_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            # n lines need n newlines before them (plus a possible trailing one)
+            while position > 0 and data.count(b'\n') <= n:
+                step = min(TAIL_BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        
+        lines = data.split(b'\n')
+        if lines and lines[-1] == b"":
+            lines.pop()
+        return [line.decode('utf-8', errors='replace') for line in lines[-n:]]
+    
+    def read_lines(self, filepath: str, start: int = 0, count: int = 100) -> Dict[str, Any]:
+        """
+        Read a page of lines (seek-based for large plain files)
+        
+        Returns:
+            {'exists': bool, 'start': int, 'lines': List[str]}
+        """
+        if not output_exists(filepath):
+            return {'exists': False, 'start': start, 'lines': []}
+        
+        lines = indexed_lines(filepath, start, count)
+        if lines is not None:
+            page = [line.rstrip('\n') for line in lines]
+        else:
+            with open_output(filepath, 'rt') as f:
+                page = [line.rstrip('\n') for line in islice(f, start, start + count)]
+        return {'exists': True, 'start': start, 'lines': page}
+    
+    def read_records(self, filepath: str, query: Optional[str] = None,
+                     offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """
+        Read a page of JSON records, optionally filtered by a bcat query
+        (seek-based through the record index for large JSONL files)
+        
+        Returns:
+            {'exists': bool, 'offset': int, 'records': List[Dict]}
+        Raises:
+            ValueError: invalid query
+        """
+        if not output_exists(filepath):
+            return {'exists': False, 'offset': offset, 'records': []}
+        
+        from utils.query import compile_query
+        from utils.record_stream import iter_records, query_records
+        
+        predicate = compile_query(query) if query and query.strip() else None
+        records = indexed_query(filepath, query, offset=offset, limit=limit)
+        if records is None:
+            records = query_records(iter_records(filepath), predicate, offset=offset, limit=limit)
+        return {'exists': True, 'offset': offset, 'records': list(records)}
+    
     def list_output_files(self, directory: str) -> list:
         """
         List all output files in a directory
@@ -89,6 +284,8 @@ class FileReader:
         
         files = []
         for filename in os.listdir(directory):
+            # Compressed outputs are listed under their logical name
+            filename = logical_name(filename)
             if filename.endswith('.txt') and not filename.endswith('.meta.json'):
                 filepath = os.path.join(directory, filename)
                 files.append(filepath)
@@ -0,0 +1,234 @@
+"""
+Per-project output manifest.
+Keeps size, line/record counts and mtime of every output so that listing a
+project does not have to open (or decompress) each file.
+Stored as <project>/.reconflow/manifest.json, keyed by '<module>/<step>'.
+
+Updates are appended to manifest.journal (one JSON line each) and folded
+into manifest.json once the journal outgrows it, so saving an output costs
+one small append instead of rewriting the whole manifest. A file lock
+(manifest.lock) serializes writers across processes (CLI, server).
+"""
+import os
+import json
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+from core.storage import count_lines, codec_for, logical_name
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are serialized within the process only
+    fcntl = None
+
+MANIFEST_DIR = ".reconflow"
+MANIFEST_FILE = "manifest.json"
+JOURNAL_FILE = "manifest.journal"
+LOCK_FILE = "manifest.lock"
+
+# The journal is compacted once it is larger than this and than manifest.json
+COMPACT_MIN_BYTES = 256 * 1024
+
+# Key prefix used for files stored directly in the project directory
+ROOT_MODULE = ""
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: str) -> threading.Lock:
+    with _locks_guard:
+        if path not in _locks:
+            _locks[path] = threading.Lock()
+        return _locks[path]
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class ProjectManifest:
+    """Read/update the manifest of one project directory"""
+
+    def __init__(self, project_path: str):
+        self.project_path = project_path
+        directory = os.path.join(project_path, MANIFEST_DIR)
+        self.path = os.path.join(directory, MANIFEST_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.lock_path = os.path.join(directory, LOCK_FILE)
+        self._lock = _lock_for(os.path.abspath(self.path))
+
+    @staticmethod
+    def key(module: str, step: str) -> str:
+        return f"{module}/{step}" if module else step
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """Lock the manifest across threads and processes (shared for readers)"""
+        if exclusive:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        elif not os.path.exists(self.lock_path):
+            yield  # Nothing written yet
+            return
+        with self._lock if exclusive else nullcontext():
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self) -> Dict[str, Dict]:
+        """manifest.json with the journal replayed (caller holds a lock)"""
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f).get('files', {})
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            entries = {}
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        change = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line of an interrupted append
+                    key = change.get('key')
+                    if change.get('op') == 'remove':
+                        entries.pop(key, None)
+                    elif key:
+                        entry = entries.setdefault(key, {'module': change.get('module'), 'step': change.get('step')})
+                        entry.update(change.get('fields', {}))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def load(self) -> Dict[str, Dict]:
+        with self._locked(exclusive=False):
+            return self._load()
+
+    def _write(self, entries: Dict[str, Dict]):
+        """Replace manifest.json and empty the journal (caller holds the lock)"""
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': 1, 'files': entries}, f)
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.journal_path):
+            os.truncate(self.journal_path, 0)
+
+    def _append(self, change: Dict):
+        """Journal one change (compacting when the journal got large)"""
+        with self._locked():
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(change) + "\n")
+                size = f.tell()
+            if size > COMPACT_MIN_BYTES and size > _file_size(self.path):
+                self._write(self._load())
+
+    def update(self, module: str, step: str, **fields):
+        """Create or update the entry of an output (thread- and process-safe)"""
+        self._append({'op': 'update', 'key': self.key(module, step), 'module': module, 'step': step,
+                      'fields': fields})
+
+    def remove(self, module: str, step: str):
+        self._append({'op': 'remove', 'key': self.key(module, step)})
+
+    def record_file(self, module: str, file_path: str, **fields):
+        """Register an output from its on-disk state (size/mtime/codec) plus extra fields"""
+        st = os.stat(file_path)
+        name = os.path.basename(file_path)
+        self.update(
+            module, logical_name(name),
+            file=name,
+            codec=codec_for(name),
+            size=st.st_size,
+            mtime=st.st_mtime,
+            **fields
+        )
+
+    def _scan(self):
+        """Yield (module, DirEntry) for every output file in the project"""
+        with os.scandir(self.project_path) as it:
+            top = list(it)
+
+        for entry in top:
+            if entry.name.startswith('.') or entry.name.endswith('.meta.json'):
+                continue
+            if entry.is_file():
+                yield ROOT_MODULE, entry
+            elif entry.is_dir():
+                with os.scandir(entry.path) as sub:
+                    for child in sub:
+                        if child.name.startswith('.') or child.name.endswith('.meta.json'):
+                            continue
+                        if child.is_file():
+                            yield entry.name, child
+
+    def reconcile(self) -> List[Dict]:
+        """
+        Compare the manifest with the project directory (one os.scandir pass)
+        and return the up-to-date entries.
+        Files unknown to the manifest, or whose size/mtime changed outside
+        reconflow, get their lines counted; everything else is reused as-is.
+        """
+        if not os.path.isdir(self.project_path):
+            return []
+
+        with self._locked():
+            entries = self._load()
+            seen = set()
+            changed = False
+
+            for module, dir_entry in self._scan():
+                try:
+                    st = dir_entry.stat()
+                except OSError:
+                    continue
+
+                step = logical_name(dir_entry.name)
+                key = self.key(module, step)
+                seen.add(key)
+                entry = entries.get(key)
+
+                if (entry and entry.get('file') == dir_entry.name and 'lines' in entry
+                        and entry.get('size') == st.st_size and entry.get('mtime') == st.st_mtime):
+                    continue
+
+                try:
+                    lines = count_lines(dir_entry.path)
+                except Exception:
+                    lines = 0
+
+                new_entry = dict(entry or {})
+                if entry and entry.get('size') != st.st_size and entry.get('codec') == codec_for(dir_entry.name):
+                    # Content changed: the stored record count is stale
+                    new_entry.pop('records', None)
+                new_entry.update({
+                    'module': module,
+                    'step': step,
+                    'file': dir_entry.name,
+                    'codec': codec_for(dir_entry.name),
+                    'size': st.st_size,
+                    'mtime': st.st_mtime,
+                    'lines': lines,
+                })
+                entries[key] = new_entry
+                changed = True
+
+            for key in list(entries):
+                if key not in seen:
+                    del entries[key]
+                    changed = True
+
+            if changed or _file_size(self.journal_path):
+                self._write(entries)
+
+        return sorted(entries.values(), key=lambda e: (e.get('module', ''), e.get('step', '')))
+
+    def get(self, module: str, step: str) -> Optional[Dict]:
+        return self.load().get(self.key(module, step))
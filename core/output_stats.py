@@ -0,0 +1,132 @@
+"""
+Single-pass output metadata.
+OutputStatsWriter wraps the file a step output is written to and computes
+size, line count, JSON-lines record count and a sha256 as the data goes by,
+so saving an output never needs a second pass. Lines are only parsed while
+the output can still be JSON lines.
+"""
+import hashlib
+import json
+from typing import Dict, IO, Optional
+
+WRITE_CHUNK = 1024 * 1024
+
+# Line separating a saved step output from the stderr appended after it
+STDERR_MARKER = "--- STDERR ---"
+
+
+class OutputStats:
+    """Incremental statistics over a byte stream"""
+
+    def __init__(self):
+        self.size = 0
+        self.lines = 0
+        self.records = 0
+        self.blank_lines = 0
+        self.first_char: Optional[bytes] = None
+        self._jsonl = True  # Every content line so far is a JSON object
+        self._sha256 = hashlib.sha256()
+        self._partial = b""
+
+    def update(self, data: bytes, count_lines: bool = True):
+        self.size += len(data)
+        self._sha256.update(data)
+        if not count_lines or not data:
+            return
+
+        chunk = self._partial + data
+        lines = chunk.split(b'\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._count_line(line)
+
+    def _count_line(self, line: bytes):
+        self.lines += 1
+        stripped = line.strip()
+        if not stripped:
+            self.blank_lines += 1
+            return
+        if self.first_char is None:
+            self.first_char = stripped[:1]
+        if not self._jsonl:
+            return
+        if stripped[:1] == b'{' and stripped[-1:] == b'}':
+            try:
+                json.loads(stripped)
+                self.records += 1
+                return
+            except ValueError:
+                pass
+        # Not JSON lines: the record count is no longer reported
+        self._jsonl = False
+
+    def end_lines(self):
+        """Flush the last line (output without a trailing newline)"""
+        if self._partial:
+            self._count_line(self._partial)
+            self._partial = b""
+
+    @property
+    def format(self) -> str:
+        """'jsonl' (every non-blank line is an object), 'json' (document) or 'text'"""
+        content_lines = self.lines - self.blank_lines
+        if content_lines and self.records == content_lines:
+            return 'jsonl'
+        if self.first_char in (b'[', b'{'):
+            return 'json'
+        return 'text'
+
+    def as_metadata(self) -> Dict:
+        fmt = self.format
+        return {
+            'line_count': self.lines,
+            'file_size': self.size,
+            'format': fmt,
+            'has_json': fmt != 'text',
+            # JSON documents are only parsed on demand (bcat --count)
+            'record_count': self.records if fmt == 'jsonl' else (None if fmt == 'json' else 0),
+            'sha256': self._sha256.hexdigest(),
+        }
+
+
+class OutputStatsWriter:
+    """
+    Text file writer that feeds everything it writes to an OutputStats.
+    Small writes are buffered so per-line writers stay cheap.
+    """
+
+    def __init__(self, fileobj: IO[bytes], encoding: str = 'utf-8'):
+        self._file = fileobj
+        self.encoding = encoding
+        self.stats = OutputStats()
+        self._pending = []
+        self._pending_size = 0
+        self._pending_counted = True
+
+    def write(self, text: str, count_lines: bool = True) -> int:
+        """Write text; count_lines=False keeps it out of line/record counts (e.g. stderr)"""
+        if not text:
+            return 0
+        if self._pending and count_lines != self._pending_counted:
+            self.flush()
+        self._pending.append(text)
+        self._pending_size += len(text)
+        self._pending_counted = count_lines
+        if self._pending_size >= WRITE_CHUNK:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        text = "".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        for start in range(0, len(text), WRITE_CHUNK):
+            data = text[start:start + WRITE_CHUNK].encode(self.encoding, errors='replace')
+            self.stats.update(data, self._pending_counted)
+            self._file.write(data)
+
+    def close(self) -> OutputStats:
+        """Flush buffered text and finish the statistics (the file itself stays open)"""
+        self.flush()
+        self.stats.end_lines()
+        return self.stats
@@ -0,0 +1,418 @@
+"""
+Byte-offset index for large line-oriented outputs (JSONL, text).
+
+Built once per output and stored next to it in a hidden directory:
+    <module>/.index/<name>.idx           line offsets + line numbers of JSON records
+    <module>/.index/<name>.<field>.post  value -> record numbers (equality postings)
+
+Each sidecar records the size/mtime of the file it was built from and is
+rebuilt when they change. Compressed outputs cannot be seeked and are not indexed.
+"""
+import os
+import json
+import threading
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+from core.storage import codec_for
+
+INDEX_DIR = ".index"
+INDEX_VERSION = 1
+
+# Smaller files are scanned: building an index would not pay off
+INDEX_MIN_SIZE = 4 * 1024 * 1024
+
+# Postings built together with the offsets (other fields are indexed on first use)
+DEFAULT_INDEX_FIELDS = ('status_code', 'host', 'template-id')
+
+# Posting key for values that cannot be keyed (lists, objects): always candidates
+_OTHER = "*"
+
+
+def posting_keys(value: Any) -> Tuple[str, ...]:
+    """
+    Keys a field value is indexed under. Equal values under the query
+    semantics (numeric equality, case-insensitive strings) share a key.
+    """
+    if value is None:
+        return ()
+    if isinstance(value, bool):
+        return (f"s:{'true' if value else 'false'}", f"n:{float(value)!r}")
+    if isinstance(value, (int, float, str)):
+        try:
+            return (f"n:{float(value)!r}",)
+        except ValueError:
+            return (f"s:{value.lower()}",)
+    return (_OTHER,)
+
+
+def _write_sidecar(path: str, header: Dict, arrays: Iterable[array]):
+    """Header as a JSON line followed by raw array data (written atomically)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(json.dumps(header).encode('utf-8') + b'\n')
+        for data in arrays:
+            data.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def _read_sidecar(path: str) -> Tuple[Optional[Dict], Optional[bytes]]:
+    try:
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            return header, f.read()
+    except (OSError, ValueError):
+        return None, None
+
+
+def _parse_record(line: bytes) -> Optional[dict]:
+    """Parse a JSONL line the way bcat counts records: JSON objects only (else None)"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+class RecordIndex:
+    """Line/record offsets of one output file, with optional field postings"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory, name = os.path.split(path)
+        self.index_dir = os.path.join(directory, INDEX_DIR)
+        self.index_path = os.path.join(self.index_dir, f"{name}.idx")
+        self.line_offsets: Optional[array] = None
+        self.record_lines: Optional[array] = None
+        self.jsonl = False
+        self._postings: Dict[str, Tuple[Dict[str, List[int]], array]] = {}
+
+    @staticmethod
+    def supports(path: str) -> bool:
+        """Only plain (uncompressed) files can be indexed"""
+        return os.path.isfile(path) and codec_for(path) is None
+
+    @classmethod
+    def open(cls, path: str, fields: Iterable[str] = DEFAULT_INDEX_FIELDS) -> Optional['RecordIndex']:
+        """Load the index of a file, (re)building it if missing or stale. None if unsupported."""
+        if not cls.supports(path):
+            return None
+        index = cls(path)
+        if not index.load():
+            index.build(fields)
+        return index
+
+    @classmethod
+    def discard(cls, path: str):
+        """Remove every sidecar of a file (e.g. when it gets compressed or evicted)"""
+        index = cls(path)
+        if not os.path.isdir(index.index_dir):
+            return
+        name = os.path.basename(path)
+        for entry in os.listdir(index.index_dir):
+            if entry == f"{name}.idx" or (entry.startswith(f"{name}.") and entry.endswith('.post')):
+                try:
+                    os.remove(os.path.join(index.index_dir, entry))
+                except OSError:
+                    pass
+
+    def _stamp(self) -> Dict[str, int]:
+        st = os.stat(self.path)
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    def _is_current(self, header: Optional[Dict]) -> bool:
+        if not header or header.get('version') != INDEX_VERSION:
+            return False
+        stamp = self._stamp()
+        return header.get('size') == stamp['size'] and header.get('mtime_ns') == stamp['mtime_ns']
+
+    def load(self) -> bool:
+        """Load offsets from the sidecar; False if it is missing or stale"""
+        header, payload = _read_sidecar(self.index_path)
+        if not self._is_current(header):
+            return False
+        line_count = header['lines'] + 1
+        offsets = array('Q')
+        offsets.frombytes(payload[:line_count * offsets.itemsize])
+        records = array('Q')
+        records.frombytes(payload[line_count * offsets.itemsize:])
+        self.line_offsets, self.record_lines = offsets, records
+        self.jsonl = header.get('jsonl', False)
+        return True
+
+    def build(self, fields: Iterable[str] = ()):
+        """
+        One pass over the file: line offsets, JSON record line numbers and
+        postings for the requested fields.
+        """
+        stamp = self._stamp()
+        fields = list(fields)
+        offsets = array('Q', [0])
+        records = array('Q')
+        postings: Dict[str, Dict[str, array]] = {f: {} for f in fields}
+        jsonl = None
+        position = 0
+
+        with open(self.path, 'rb') as f:
+            for line_no, line in enumerate(f):
+                position += len(line)
+                offsets.append(position)
+
+                if jsonl is None:
+                    stripped = line.lstrip()
+                    if not stripped:
+                        continue
+                    # A JSON array / pretty-printed document is not record-per-line
+                    jsonl = stripped[:1] != b'[' and _parse_record(line) is not None
+                    if not jsonl:
+                        continue
+                elif not jsonl:
+                    continue
+
+                record = _parse_record(line)
+                if record is None:
+                    continue
+                record_no = len(records)
+                records.append(line_no)
+                if fields:
+                    for field in fields:
+                        for key in posting_keys(record.get(field)):
+                            postings[field].setdefault(key, array('Q')).append(record_no)
+
+        # The last offset is the file size; a trailing line without '\n' is still a line
+        line_count = len(offsets) - 1
+        self.line_offsets, self.record_lines, self.jsonl = offsets, records, bool(jsonl)
+        _write_sidecar(self.index_path, {
+            'version': INDEX_VERSION, **stamp,
+            'lines': line_count, 'records': len(records), 'jsonl': self.jsonl,
+        }, [offsets, records])
+
+        for field, values in postings.items():
+            self._store_postings(field, values, stamp)
+        return self
+
+    # --- Random access -------------------------------------------------
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets) - 1
+
+    @property
+    def record_count(self) -> int:
+        return len(self.record_lines)
+
+    def iter_lines(self, start: int = 0, count: Optional[int] = None) -> Iterator[str]:
+        """Yield lines [start, start+count) by seeking straight to the first one"""
+        if start >= self.line_count:
+            return
+        end = self.line_count if count is None else min(self.line_count, start + count)
+        with open(self.path, 'rb') as f:
+            f.seek(self.line_offsets[start])
+            for _ in range(end - start):
+                yield f.readline().decode('utf-8', errors='replace')
+
+    def iter_records(self, start: int = 0, count: Optional[int] = None) -> Iterator[dict]:
+        """Yield JSON object records [start, start+count), numbered as bcat counts them"""
+        end = self.record_count if count is None else min(self.record_count, start + count)
+        if start >= end:
+            return
+        first_line = self.record_lines[start]
+        with open(self.path, 'rb') as f:
+            f.seek(self.line_offsets[first_line])
+            remaining = end - start
+            while remaining:
+                line = f.readline()
+                if not line:
+                    break
+                record = _parse_record(line)
+                if record is not None:
+                    yield record
+                    remaining -= 1
+
+    def get_records(self, record_numbers: Iterable[int]) -> Iterator[Any]:
+        """Yield the given records (ascending record numbers) with one seek each"""
+        with open(self.path, 'rb') as f:
+            for record_no in record_numbers:
+                f.seek(self.line_offsets[self.record_lines[record_no]])
+                record = _parse_record(f.readline())
+                if record is not None:
+                    yield record
+
+    # --- Field postings ------------------------------------------------
+
+    def _postings_path(self, field: str) -> str:
+        name = os.path.basename(self.path)
+        return os.path.join(self.index_dir, f"{name}.{quote(field, safe='')}.post")
+
+    def _store_postings(self, field: str, values: Dict[str, array], stamp: Dict[str, int]):
+        keys = {}
+        data = array('Q')
+        for key, numbers in values.items():
+            keys[key] = [len(data), len(numbers)]
+            data.extend(numbers)
+        _write_sidecar(self._postings_path(field), {
+            'version': INDEX_VERSION, **stamp, 'field': field, 'keys': keys,
+        }, [data])
+        self._postings[field] = (keys, data)
+
+    def _load_postings(self, field: str) -> bool:
+        if field in self._postings:
+            return True
+        header, payload = _read_sidecar(self._postings_path(field))
+        if not self._is_current(header):
+            return False
+        data = array('Q')
+        data.frombytes(payload)
+        self._postings[field] = (header['keys'], data)
+        return True
+
+    def ensure_postings(self, field: str):
+        """Build postings for a field if missing (one pass, reused afterwards)"""
+        if self._load_postings(field):
+            return
+        stamp = self._stamp()
+        values: Dict[str, array] = {}
+        for record_no, record in enumerate(self.iter_records()):
+            for key in posting_keys(record.get(field)):
+                values.setdefault(key, array('Q')).append(record_no)
+        self._store_postings(field, values, stamp)
+
+    def lookup(self, field: str, value: Any) -> List[int]:
+        """
+        Record numbers whose field may equal value (a superset: callers
+        re-check candidates with the full predicate). Sorted ascending.
+        """
+        self.ensure_postings(field)
+        keys, data = self._postings[field]
+        numbers = set()
+        for key in posting_keys(value) + (_OTHER,):
+            if key in keys:
+                start, count = keys[key]
+                numbers.update(data[start:start + count])
+        return sorted(numbers)
+
+    def candidates(self, terms: List[Tuple[str, Any]]) -> Optional[List[int]]:
+        """Intersect the postings of several field==value terms (None if no terms)"""
+        result = None
+        for field, value in terms:
+            numbers = self.lookup(field, value)
+            result = numbers if result is None else sorted(set(result).intersection(numbers))
+            if not result:
+                return []
+        return result
+
+
+def equality_terms(ast) -> List[Tuple[str, Any]]:
+    """
+    Extract top-level 'field==literal' conditions from a parsed query
+    (see utils.query.parse_query). Any match must satisfy all of them,
+    so their postings can narrow the records to check.
+    """
+    nodes = ast[1] if ast[0] == 'and' else [ast]
+    terms = []
+    for node in nodes:
+        if node[0] != 'cmp':
+            continue
+        _, path, field, operator, literal = node
+        if operator != '==' or len(path) != 1 or not isinstance(path[0], str) or path[0] == '*':
+            continue
+        kind = literal[0]
+        if kind == 'num':
+            terms.append((path[0], literal[2]))
+        elif kind == 'bool':
+            terms.append((path[0], literal[1]))
+        elif kind == 'str' and '*' not in literal[1]:
+            terms.append((path[0], literal[1]))
+    return terms
+
+
+_building = set()
+_building_lock = threading.Lock()
+
+
+def build_in_background(path: str, fields: Iterable[str] = ()):
+    """Build (or complete) the index of a file in a daemon thread, once at a time per file"""
+    with _building_lock:
+        if path in _building:
+            return
+        _building.add(path)
+
+    def build():
+        try:
+            index = RecordIndex.open(path, _index_fields(fields))
+            if index is not None:
+                for field in fields:
+                    index.ensure_postings(field)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with _building_lock:
+                _building.discard(path)
+
+    threading.Thread(target=build, name=f"record-index({os.path.basename(path)})", daemon=True).start()
+
+
+def _index_fields(fields: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys((*DEFAULT_INDEX_FIELDS, *fields)))
+
+
+def _index_for(path: str, limit: Optional[int], fields: Iterable[str] = ()) -> Optional[RecordIndex]:
+    """
+    Index of a large file for one request. A missing or stale index (or
+    postings) is built in place only when the request reads the whole file
+    anyway; limited requests stream while it is built in the background.
+    """
+    if not RecordIndex.supports(path) or os.path.getsize(path) < INDEX_MIN_SIZE:
+        return None
+    index = RecordIndex(path)
+    if index.load() and all(index._load_postings(field) for field in fields):
+        return index
+    if limit is not None:
+        build_in_background(path, fields)
+        return None
+    return RecordIndex.open(path, _index_fields(fields))
+
+
+def indexed_query(path: str, query: Optional[str] = None, offset: int = 0,
+                  limit: Optional[int] = None) -> Optional[Iterator[dict]]:
+    """
+    Seek-based equivalent of query_records(iter_records(path), ...) for JSONL files.
+    Returns None when the index cannot answer (small, compressed or non-JSONL
+    file, a query without an equality condition to narrow on, or an index still
+    being built for a limited request); callers then scan.
+    """
+    from utils.query import parse_query, compile_query
+    from utils.record_stream import query_records
+
+    if not RecordIndex.supports(path) or os.path.getsize(path) < INDEX_MIN_SIZE:
+        return None
+
+    if not query or not query.strip():
+        if not offset:
+            return None  # Streaming from the start is as fast as the index
+        index = _index_for(path, limit)
+        if index is None or not index.jsonl:
+            return None
+        return query_records(index.iter_records(offset), None, 0, limit)
+
+    terms = equality_terms(parse_query(query))
+    if not terms:
+        return None
+    index = _index_for(path, limit, [field for field, _ in terms])
+    if index is None or not index.jsonl:
+        return None
+    predicate = compile_query(query)
+    numbers = index.candidates(terms)
+    return query_records(index.get_records(numbers), predicate, offset, limit)
+
+
+def indexed_lines(path: str, start: int = 0, count: Optional[int] = None) -> Optional[Iterator[str]]:
+    """Seek-based line paging for large plain files (None: caller streams instead)"""
+    index = _index_for(path, count)
+    if index is None:
+        return None
+    return index.iter_lines(start, count)
@@ -0,0 +1,292 @@
+"""
+Resource accounting of tool subprocesses.
+
+run_measured() is a drop-in for subprocess.run(..., check=True,
+capture_output=True) that also measures the child process tree:
+- rusage from os.wait4 (CPU user/sys, context switches). A shell child
+  accumulates the usage of the tools it waited for.
+- /proc/<pid>/io (bytes read/written): sampled while the process runs and
+  read once more after it exits but before it is reaped (waitid WNOWAIT),
+  when it includes the I/O of its reaped children.
+- max RSS: sampled from /proc/<pid>/status (VmRSS/VmHWM) of the process tree.
+  Not ru_maxrss, which includes the pages the child inherited from ReconFlow
+  before exec. Tools exiting before the first sample report no max RSS.
+The child runs in its own session so a timeout kills the whole pipeline
+(kill_running_tools() forwards a Ctrl-C, which no longer reaches it).
+On platforms without wait4 the command runs through subprocess.run and no
+usage is reported.
+"""
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Seconds between /proc/<pid>/io samples (fallback if the final read fails)
+IO_SAMPLE_INTERVAL = 1.0
+
+# Seconds before the first /proc sample; the interval then doubles up to IO_SAMPLE_INTERVAL
+FIRST_SAMPLE_INTERVAL = 0.05
+
+# Seconds to wait for output still buffered in the pipes of a killed process group
+KILL_GRACE = 2.0
+
+_running_groups = set()
+_groups_lock = threading.Lock()
+
+_IO_FIELDS = {
+    'rchar': 'read_chars',
+    'wchar': 'write_chars',
+    'read_bytes': 'read_bytes',
+    'write_bytes': 'write_bytes',
+}
+
+
+def read_proc_io(pid: int) -> Optional[Dict[str, int]]:
+    """I/O counters of a process from /proc/<pid>/io (None if unavailable)"""
+    try:
+        with open(f"/proc/{pid}/io", 'r') as f:
+            content = f.read()
+    except OSError:
+        return None
+    values = {}
+    for line in content.splitlines():
+        key, _, value = line.partition(':')
+        name = _IO_FIELDS.get(key.strip())
+        if name:
+            try:
+                values[name] = int(value)
+            except ValueError:
+                pass
+    return values or None
+
+
+def _read_cmdline(pid) -> Optional[bytes]:
+    try:
+        with open(f"/proc/{pid}/cmdline", 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+_SELF_CMDLINE = _read_cmdline('self')
+
+
+def read_proc_memory(pid: int) -> Optional[Tuple[int, int]]:
+    """(VmRSS, VmHWM) of a process in kilobytes from /proc/<pid>/status (None if unavailable)"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            content = f.read()
+    except OSError:
+        return None
+    values = {}
+    for line in content.splitlines():
+        key, _, value = line.partition(':')
+        if key in ('VmRSS', 'VmHWM'):
+            try:
+                values[key] = int(value.split()[0])
+            except (ValueError, IndexError):
+                pass
+    if 'VmRSS' not in values:
+        return None  # Zombie
+    return values['VmRSS'], values.get('VmHWM', values['VmRSS'])
+
+
+def process_tree(pid: int) -> List[int]:
+    """A process and its descendants (the process alone if /proc/.../children is unsupported)"""
+    pids, todo = [], [pid]
+    while todo:
+        current = todo.pop()
+        pids.append(current)
+        try:
+            tids = os.listdir(f"/proc/{current}/task")
+        except OSError:
+            continue
+        for tid in tids:
+            try:
+                with open(f"/proc/{current}/task/{tid}/children", 'r') as f:
+                    todo.extend(int(child) for child in f.read().split())
+            except (OSError, ValueError):
+                pass
+    return pids
+
+
+def tree_memory_kb(pid: int) -> Optional[int]:
+    """
+    Resident memory of a process tree: the larger of the summed VmRSS and the
+    highest VmHWM (a peak reached between samples). None if nothing was readable.
+    """
+    total, peak, found = 0, 0, False
+    for member in process_tree(pid):
+        if _read_cmdline(member) == _SELF_CMDLINE:
+            continue  # Forked but not yet exec'd: still ReconFlow's own pages
+        memory = read_proc_memory(member)
+        if memory:
+            found = True
+            total += memory[0]
+            peak = max(peak, memory[1])
+    return max(total, peak) if found else None
+
+
+def usage_from_rusage(rusage) -> Dict[str, float]:
+    return {
+        'cpu_user': round(rusage.ru_utime, 3),
+        'cpu_system': round(rusage.ru_stime, 3),
+        'voluntary_ctx_switches': rusage.ru_nvcsw,
+        'involuntary_ctx_switches': rusage.ru_nivcsw,
+    }
+
+
+def kill_running_tools(sig: int = signal.SIGINT):
+    """Signal the process groups of all tools currently running"""
+    with _groups_lock:
+        groups = list(_running_groups)
+    for pgid in groups:
+        try:
+            os.killpg(pgid, sig)
+        except OSError:
+            pass
+
+
+def _read_stream(stream, chunks):
+    try:
+        chunks.append(stream.read())
+    finally:
+        stream.close()
+
+
+def _write_stdin(stream, chunks: Iterable[str], encoding: str):
+    try:
+        for chunk in chunks:
+            if chunk:
+                stream.write(chunk.encode(encoding))
+    except (BrokenPipeError, OSError):
+        pass
+    finally:
+        try:
+            stream.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+
+def run_measured(cmd, shell: bool = True, input: Optional[Union[str, Iterable[str]]] = None,
+                 timeout: Optional[float] = None,
+                 cwd: Optional[str] = None, encoding: str = 'utf-8'
+                 ) -> Tuple[subprocess.CompletedProcess, Optional[Dict[str, float]]]:
+    """
+    Run a command, capture its text output and measure its resources.
+    input may be a string or an iterable of text chunks (streamed to stdin).
+    Raises subprocess.CalledProcessError / TimeoutExpired like subprocess.run(check=True).
+    Returns (completed process, usage dict or None).
+    """
+    if not hasattr(os, 'wait4') or not hasattr(os, 'waitid'):
+        if input is not None and not isinstance(input, str):
+            input = "".join(input)
+        proc = subprocess.run(cmd, shell=shell, check=True, capture_output=True, text=True,
+                              input=input, timeout=timeout, cwd=cwd)
+        return proc, None
+
+    proc = subprocess.Popen(
+        cmd, shell=shell, cwd=cwd,
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    pid = proc.pid
+    with _groups_lock:
+        _running_groups.add(pid)
+    stdout_chunks, stderr_chunks = [], []
+    threads = [
+        threading.Thread(target=_read_stream, args=(proc.stdout, stdout_chunks), daemon=True),
+        threading.Thread(target=_read_stream, args=(proc.stderr, stderr_chunks), daemon=True),
+    ]
+    if input is not None:
+        chunks = (input,) if isinstance(input, str) else input
+        threads.append(threading.Thread(target=_write_stdin, args=(proc.stdin, chunks, encoding), daemon=True))
+
+    # /proc sampling and timeout share one helper thread
+    exited = threading.Event()
+    timed_out = threading.Event()
+    last_io = [read_proc_io(pid)]
+    peak_memory = [None]
+
+    def monitor():
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        interval = FIRST_SAMPLE_INTERVAL
+        while True:
+            wait = interval
+            interval = min(interval * 2, IO_SAMPLE_INTERVAL)
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - time.monotonic()))
+            if exited.wait(wait):
+                return
+            sample = read_proc_io(pid)
+            if sample:
+                last_io[0] = sample
+            memory = tree_memory_kb(pid)
+            if memory is not None:
+                peak_memory[0] = max(peak_memory[0] or 0, memory)
+            if deadline is not None and time.monotonic() >= deadline:
+                timed_out.set()
+                try:
+                    # The whole group: a shell's pipeline children hold the output pipes open.
+                    # Not proc.kill(): its poll() could reap the child before wait4
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                return
+
+    threads.append(threading.Thread(target=monitor, daemon=True))
+    for t in threads:
+        t.start()
+
+    try:
+        # Wait for exit without reaping: /proc/<pid>/io is still readable
+        while True:
+            try:
+                os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+                break
+            except InterruptedError:
+                continue
+        final_io = read_proc_io(pid)
+        _, status, rusage = os.wait4(pid, 0)
+    except ChildProcessError:
+        # Reaped elsewhere: fall back to Popen's own bookkeeping
+        proc.wait()
+        status, rusage, final_io = None, None, None
+    finally:
+        exited.set()
+        with _groups_lock:
+            _running_groups.discard(pid)
+
+    if status is not None:
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    if timed_out.is_set():
+        try:
+            os.killpg(pid, signal.SIGKILL)  # Children started after the first kill
+        except OSError:
+            pass
+        # Processes that left the group may still hold the pipes: do not wait for them
+        for t in threads:
+            t.join(KILL_GRACE)
+    else:
+        for t in threads:
+            t.join()
+
+    stdout = b"".join(stdout_chunks).decode(encoding, errors='replace')
+    stderr = b"".join(stderr_chunks).decode(encoding, errors='replace')
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, output=stdout, stderr=stderr)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout, stderr=stderr)
+
+    usage = None
+    if rusage is not None:
+        usage = usage_from_rusage(rusage)
+        usage['max_rss_kb'] = peak_memory[0]
+        io = final_io or last_io[0]
+        if io:
+            usage.update(io)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr), usage
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from db.models import SessionModel, Project
 from db.session import get_session, create_new_session
 from core.base import BaseModule
+from utils.metrics import SESSIONS_ACTIVE, SESSIONS_TOTAL
 
 class SessionManager:
     def __init__(self):
@@ -44,12 +45,18 @@ class SessionManager:
         # Define wrapper for thread
         def run_wrapper(sess_id, mod, ctx):
             # Update status logic could go here
+            SESSIONS_ACTIVE.inc()
+            status = "completed"
             try:
                 mod.run(ctx, background=True)
                 self._update_status(sess_id, "completed")
             except Exception as e:
+                status = "failed"
                 print(f"Session {sess_id} failed: {e}")
                 self._update_status(sess_id, "failed", info=str(e))
+            finally:
+                SESSIONS_ACTIVE.dec()
+                SESSIONS_TOTAL.labels(status).inc()
 
         # Start Thread
         t = threading.Thread(target=run_wrapper, args=(session_id, module, context), daemon=True)
@@ -0,0 +1,315 @@
+"""
+Project output storage: transparent compression and retention.
+Compressed step outputs keep their logical name plus a codec suffix
+(e.g. httpx -> httpx.gz) and can be read back through open_output().
+"""
+import os
+import io
+import gzip
+import json
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, IO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+CODEC_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+CHUNK_SIZE = 1024 * 1024
+
+# Directory (inside each module directory) used for decompressed copies
+# handed to external tools.
+CACHE_DIR = ".cache"
+
+
+def available_codecs() -> list:
+    """Codecs usable in this environment (zstd requires the 'zstandard' package)"""
+    return [c for c in CODEC_SUFFIXES if c != 'zstd' or zstandard is not None]
+
+
+def codec_for(path: str) -> Optional[str]:
+    """Return the codec of a stored file based on its suffix, or None if uncompressed"""
+    for codec, suffix in CODEC_SUFFIXES.items():
+        if path.endswith(suffix):
+            return codec
+    return None
+
+
+def logical_name(path: str) -> str:
+    """Strip the codec suffix: 'mod/httpx.gz' -> 'mod/httpx'"""
+    codec = codec_for(path)
+    if codec:
+        return path[:-len(CODEC_SUFFIXES[codec])]
+    return path
+
+
+def resolve_output_path(path: str) -> Optional[str]:
+    """
+    Return the on-disk path holding the data of a logical output path.
+    The plain file wins; otherwise a compressed variant is looked up.
+    """
+    if os.path.exists(path):
+        return path
+    for suffix in CODEC_SUFFIXES.values():
+        candidate = path + suffix
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def output_exists(path: str) -> bool:
+    return resolve_output_path(path) is not None
+
+
+def open_output(path: str, mode: str = 'rt', encoding: str = 'utf-8', errors: str = 'replace') -> IO:
+    """
+    Open a (possibly compressed) output file for reading.
+    Decompression is streamed; nothing is loaded in memory up front.
+
+    Args:
+        path: Logical or physical path of the output
+        mode: 'rt' (text) or 'rb' (binary)
+    """
+    real_path = resolve_output_path(path)
+    if real_path is None:
+        raise FileNotFoundError(path)
+
+    codec = codec_for(real_path)
+    if codec is None:
+        if 'b' in mode:
+            return open(real_path, 'rb')
+        return open(real_path, 'r', encoding=encoding, errors=errors)
+
+    if codec == 'gzip':
+        raw = gzip.open(real_path, 'rb')
+    else:
+        if zstandard is None:
+            raise RuntimeError(f"Cannot read {real_path}: install 'zstandard' to read zstd outputs")
+        fh = open(real_path, 'rb')
+        raw = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fh, closefd=True), CHUNK_SIZE)
+
+    if 'b' in mode:
+        return raw
+    return io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+
+
+def materialize(path: str) -> str:
+    """
+    Return a plain path for a logical output, for consumers that cannot read
+    compressed data (external tools, {{step.output}} references).
+    Compressed outputs are stream-decompressed into a cache file next to them.
+    """
+    real_path = resolve_output_path(path)
+    if real_path is None or codec_for(real_path) is None:
+        return path
+
+    directory, name = os.path.split(logical_name(real_path))
+    cache_dir = os.path.join(directory, CACHE_DIR)
+    cache_path = os.path.join(cache_dir, name)
+
+    src_mtime = os.path.getmtime(real_path)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= src_mtime:
+        return cache_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open_output(real_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def count_lines(path: str) -> int:
+    """Count lines of a (possibly compressed) output by streaming it in binary chunks"""
+    count = 0
+    last = b''
+    with open_output(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            count += chunk.count(b'\n')
+            last = chunk
+    if last and not last.endswith(b'\n'):
+        count += 1
+    return count
+
+
+def compress_file(path: str, codec: str = 'gzip', level: int = None) -> str:
+    """
+    Compress a file in place (streamed), preserving its mtime.
+    The original is only removed once the compressed copy is complete.
+    Returns the new path.
+    """
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown codec '{codec}'. Use one of: {', '.join(CODEC_SUFFIXES)}")
+    if codec == 'zstd' and zstandard is None:
+        raise RuntimeError("zstd compression requires the 'zstandard' package")
+
+    dest = path + CODEC_SUFFIXES[codec]
+    tmp_dest = dest + ".tmp"
+    original_size = os.path.getsize(path)
+
+    with open(path, 'rb') as src, open(tmp_dest, 'wb') as raw_dst:
+        if codec == 'gzip':
+            with gzip.GzipFile(fileobj=raw_dst, mode='wb', compresslevel=level or 6) as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        else:
+            zstandard.ZstdCompressor(level=level or 3).copy_stream(src, raw_dst, read_size=CHUNK_SIZE)
+
+    shutil.copystat(path, tmp_dest)
+    os.replace(tmp_dest, dest)
+    os.remove(path)
+
+    _update_meta(path, {
+        'codec': codec,
+        'compressed_at': datetime.now().isoformat(),
+        'original_size': original_size,
+        'stored_size': os.path.getsize(dest),
+    })
+    return dest
+
+
+def _update_meta(logical_path: str, storage_info: Dict):
+    """Record storage information in the step's .meta.json sidecar (if any)"""
+    meta_path = f"{logical_path}.meta.json"
+    if not os.path.exists(meta_path):
+        return
+    try:
+        with open(meta_path, 'r') as f:
+            metadata = json.load(f)
+        metadata.setdefault('storage', {}).update(storage_info)
+        with open(meta_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+    except Exception:
+        pass
+
+
+def iter_step_outputs(project_path: str):
+    """
+    Yield physical paths of completed step outputs in a project,
+    i.e. files in module directories that have a .meta.json sidecar.
+    """
+    if not os.path.isdir(project_path):
+        return
+    with os.scandir(project_path) as it:
+        module_dirs = [e.path for e in it if e.is_dir() and not e.name.startswith('.')]
+
+    for module_dir in module_dirs:
+        with os.scandir(module_dir) as it:
+            for entry in it:
+                if entry.name.startswith('.') or entry.name.endswith('.meta.json') or not entry.is_file():
+                    continue
+                if os.path.exists(f"{logical_name(entry.path)}.meta.json"):
+                    yield entry.path
+
+
+def compact_project(project_path: str, codec: str = 'gzip', compress_after_days: int = None,
+                    retention_days: int = None, now: float = None) -> Dict[str, int]:
+    """
+    Apply a storage policy to a project directory.
+    - outputs older than compress_after_days are compressed with codec
+    - outputs older than retention_days are evicted (data removed, metadata kept)
+    Returns counters: compressed, evicted, bytes_saved.
+    """
+    from core.manifest import ProjectManifest
+    from core.record_index import RecordIndex
+
+    now = now or time.time()
+    stats = {'compressed': 0, 'evicted': 0, 'bytes_saved': 0}
+    manifest = ProjectManifest(project_path)
+
+    for path in list(iter_step_outputs(project_path)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        age_days = (now - st.st_mtime) / 86400
+
+        if retention_days is not None and age_days >= retention_days:
+            RecordIndex.discard(path)
+            os.remove(path)
+            directory, name = os.path.split(logical_name(path))
+            cached = os.path.join(directory, CACHE_DIR, name)
+            if os.path.exists(cached):
+                os.remove(cached)
+            _update_meta(logical_name(path), {'evicted_at': datetime.now().isoformat()})
+            manifest.remove(os.path.basename(directory), name)
+            stats['evicted'] += 1
+            stats['bytes_saved'] += st.st_size
+            continue
+
+        if compress_after_days is not None and age_days >= compress_after_days and codec_for(path) is None:
+            try:
+                RecordIndex.discard(path)
+                dest = compress_file(path, codec)
+            except Exception as e:
+                print(f"[!] Failed to compress {path}: {e}")
+                continue
+            # Keep line/record counts, only the physical file changed
+            manifest.record_file(os.path.basename(os.path.dirname(dest)), dest)
+            stats['compressed'] += 1
+            stats['bytes_saved'] += st.st_size - os.path.getsize(dest)
+
+    return stats
+
+
+class StorageManager:
+    """
+    Runs project storage policies in background threads
+    (at most one compaction per project at a time).
+    """
+    def __init__(self):
+        self._running: Dict[int, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self.last_stats: Dict[int, Dict[str, int]] = {}
+
+    def schedule(self, project, policy) -> bool:
+        """
+        Start a background compaction for a project if its policy asks for one.
+        Returns True if a compaction thread was started.
+        """
+        if not project or not policy:
+            return False
+        if policy.compress_after_days is None and policy.retention_days is None:
+            return False
+
+        # Snapshot plain values: the DB objects must not cross threads
+        project_id, project_path = project.id, project.path
+        kwargs = {
+            'codec': policy.codec or 'gzip',
+            'compress_after_days': policy.compress_after_days,
+            'retention_days': policy.retention_days,
+        }
+
+        with self._lock:
+            running = self._running.get(project_id)
+            if running and running.is_alive():
+                return False
+
+            def worker():
+                try:
+                    self.last_stats[project_id] = compact_project(project_path, **kwargs)
+                except Exception as e:
+                    print(f"[!] Storage compaction failed for project {project_id}: {e}")
+                finally:
+                    with self._lock:
+                        self._running.pop(project_id, None)
+
+            t = threading.Thread(target=worker, daemon=True)
+            self._running[project_id] = t
+            t.start()
+            return True
+
+    def is_running(self, project_id: int) -> bool:
+        t = self._running.get(project_id)
+        return bool(t and t.is_alive())
@@ -0,0 +1,126 @@
+"""
+Target extraction from JSON / JSON-lines outputs (used by 'set target <file>').
+
+Records are streamed, the first present field of each record (by precedence)
+gives its target(s), and targets are deduplicated in first-seen order without
+loading or sorting the whole set (ExternalDeduper spills past its budget).
+
+The result '<name>_targets.txt' is cached: a '.cache/<name>_targets.txt.key.json'
+sidecar records the source path, size, mtime and field precedence it was
+built from, so repeating 'set' on an unchanged output is instant.
+"""
+import os
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+from core.dedupe import ExternalDeduper
+from core.storage import open_output, CACHE_DIR
+from utils.query import field_getter
+from utils.record_stream import iter_records
+
+# Default precedence, overridable with the '$target_fields' variable (comma-separated)
+DEFAULT_TARGET_FIELDS = ('url', 'host', 'ip')
+
+KEY_SUFFIX = ".key.json"
+
+
+def parse_target_fields(value: Optional[str]) -> List[str]:
+    """'url, host,a[*]' -> ['url', 'host', 'a[*]'] (defaults if empty)"""
+    if not value:
+        return list(DEFAULT_TARGET_FIELDS)
+    fields = [f.strip() for f in str(value).split(',') if f.strip()]
+    return fields or list(DEFAULT_TARGET_FIELDS)
+
+
+def looks_like_json(path: str) -> bool:
+    """True for .json/.jsonl files or outputs whose first character opens a JSON value"""
+    if path.endswith('.json') or path.endswith('.jsonl'):
+        return True
+    try:
+        with open_output(path, 'rb') as f:
+            head = f.read(4096).lstrip()
+    except (OSError, RuntimeError):
+        return False
+    if head[:1] == b'[':
+        # '[INF] ...' log lines are not a JSON array
+        return head[1:].lstrip()[:1] in (b'{', b'[', b'"', b']')
+    return head[:1] == b'{'
+
+
+def targets_path_for(path: str) -> str:
+    base, ext = os.path.splitext(path)
+    if ext not in ('.json', '.jsonl'):
+        base = path
+    return f"{base}_targets.txt"
+
+
+def iter_targets(records: Iterable, fields: List[str]) -> Iterator[str]:
+    """First present field of each record (lists give one target per element)"""
+    getters = [field_getter(f) for f in fields]
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for getter in getters:
+            values = getter(record)
+            if not values:
+                continue
+            for value in values:
+                items = value if isinstance(value, list) else [value]
+                for item in items:
+                    if item is None or isinstance(item, (dict, list)):
+                        continue
+                    target = str(item).strip()
+                    if target and '\n' not in target:
+                        yield target
+            break
+
+
+def _key_path(out_path: str) -> str:
+    directory, name = os.path.split(out_path)
+    if os.path.basename(directory) != CACHE_DIR:
+        directory = os.path.join(directory, CACHE_DIR)
+    return os.path.join(directory, name + KEY_SUFFIX)
+
+
+def _cache_key(source: str, fields: List[str]) -> dict:
+    st = os.stat(source)
+    return {
+        'source': os.path.abspath(source),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'fields': fields,
+    }
+
+
+def extract_targets(source: str, fields: Optional[List[str]] = None,
+                    memory_mb: int = 64) -> Tuple[Optional[str], int, bool]:
+    """
+    Extract targets of a JSON/JSONL output into '<name>_targets.txt'.
+    Returns (targets_path, count, from_cache); targets_path is None when
+    no target could be extracted.
+    """
+    fields = fields or list(DEFAULT_TARGET_FIELDS)
+    out_path = targets_path_for(source)
+    key_path = _key_path(out_path)
+    key = _cache_key(source, fields)
+
+    try:
+        with open(key_path, 'r') as f:
+            cached = json.load(f)
+        if os.path.exists(out_path) and {k: cached.get(k) for k in key} == key:
+            return (out_path if cached.get('count') else None), cached.get('count', 0), True
+    except (OSError, ValueError):
+        pass
+
+    tmp_path = f"{out_path}.tmp"
+    deduper = ExternalDeduper(memory_mb=memory_mb, tmp_dir=os.path.dirname(key_path))
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        stats = deduper.run(iter_targets(iter_records(source), fields), out)
+    os.replace(tmp_path, out_path)
+
+    os.makedirs(os.path.dirname(key_path), exist_ok=True)
+    with open(key_path, 'w') as f:
+        json.dump({**key, 'count': stats['new']}, f)
+
+    if not stats['new']:
+        return None, 0, False
+    return out_path, stats['new'], False
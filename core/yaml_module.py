@@ -7,13 +7,28 @@ import concurrent.futures
 import threading
 import time
 import json
+import io
+import shlex
+import argparse
+from itertools import chain
 from datetime import datetime
 from jinja2 import Environment, StrictUndefined
 from core.base import BaseModule, Option
 from core.schema import validate_yaml, ModuleSchema
 from core.parser import OutputParser
+from core.storage import materialize, open_output, output_exists, resolve_output_path, CHUNK_SIZE
+from core.output_stats import OutputStats, OutputStatsWriter, STDERR_MARKER
+from core.dedupe import ExternalDeduper, iter_input_lines, seen_set_path, DEFAULT_MEMORY_MB
+from core.manifest import ProjectManifest, MANIFEST_DIR
+from core.resource_usage import run_measured, kill_running_tools
+from db.session import create_new_session
+from db.repositories.resource_repo import StepResourceRepository
 from parsers.builtin import BUILTIN_PARSERS
 from utils.progress import ProgressTracker
+from utils.metrics import (
+    RUNS_ACTIVE, RUNS_TOTAL, STEPS_RUNNING, STEPS_TOTAL, STEP_SECONDS,
+    SUBPROCESS_RUNNING, SUBPROCESS_TOTAL, SUBPROCESS_SECONDS, CAPTURED_BYTES
+)
 from utils.output_formatter import (
     format_tool_execution,
     format_output_saved,
@@ -23,6 +38,26 @@ from utils.output_formatter import (
     console
 )
 
+class OutputFile(str):
+    """Path of a step output used as stdin (streamed, not read into memory)"""
+
+
+def _stdin_chunks(sources):
+    """Stdin text of a step: dependency stdouts and output files, newline-separated"""
+    for i, source in enumerate(sources):
+        if i:
+            yield "\n"
+        if isinstance(source, OutputFile):
+            with open_output(source, 'rt') as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+        else:
+            yield source
+
+
 class GenericYamlModule(BaseModule):
     """
     A unified module that runs CLI tools or other modules defined in a YAML file.
@@ -34,6 +69,11 @@ class GenericYamlModule(BaseModule):
         self.schema: ModuleSchema = None
         self._execution_results = {} # Stores output of executed steps: {step_name: output_data}
         self._lock = threading.Lock() # For thread-safe updates to results
+        self._listeners = [] # Execution event callbacks: callback(event, data)
+        self.execution_id = None # API execution UUID (set by the server)
+        self.tracer = None # utils.trace.Tracer recording the timeline of the next runs
+        self._trace_parent = None # (pid, step) of the parent step when traced as a submodule
+        self._trace_pid = None
         
         # Initialize parser with built-in parsers
         self.parser = OutputParser()
@@ -223,6 +263,25 @@ class GenericYamlModule(BaseModule):
                 }
             )
 
+    def add_listener(self, callback):
+        """
+        Register an execution event callback: callback(event, data).
+        Events: run_started, step_started, step_finished, step_failed, run_finished.
+        Callbacks run on the scheduler thread and must not raise.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _emit(self, event: str, **data):
+        for callback in self._listeners:
+            try:
+                callback(event, data)
+            except Exception:
+                pass
+
     def run(self, context, background=False) -> Dict[str, Any]:
         """
         Execute the steps defined in the YAML Schema using a DAG scheduler.
@@ -285,18 +344,35 @@ class GenericYamlModule(BaseModule):
              except:
                  pass
 
+        tracer = self.tracer
+        if tracer:
+            self._trace_pid = tracer.begin_run(self.meta.get('id', 'unknown'), max_workers, parent=self._trace_parent)
+
+        RUNS_ACTIVE.inc()
+        self._emit('run_started', steps=[
+            {'name': step.name, 'depends_on': list(step.depends_on)} for step in self.schema.steps
+        ])
+        started_at = {}
+
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 while pending_steps or running_futures:
                     # 1. Check for completed futures
-                    done, _ = concurrent.futures.wait(
-                        running_futures.keys(), 
-                        timeout=0.5, 
-                        return_when=concurrent.futures.FIRST_COMPLETED
-                    )
+                    try:
+                        done, _ = concurrent.futures.wait(
+                            running_futures.keys(), 
+                            timeout=0.5, 
+                            return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                    except KeyboardInterrupt:
+                        # Tools run in their own sessions, out of reach of the terminal's Ctrl-C
+                        kill_running_tools()
+                        raise
 
                     for future in done:
                         step_name = running_futures.pop(future)
+                        STEPS_RUNNING.dec()
+                        STEP_SECONDS.observe(time.time() - started_at[step_name])
                         try:
                             result = future.result()
                             # Result logic (store output)
@@ -304,8 +380,9 @@ class GenericYamlModule(BaseModule):
                                 self._execution_results[step_name] = result
                                 completed_steps.add(step_name)
                                 
+                                output_file = result.get('output_file')
                                 step_ctx = {
-                                    'output': result.get('output_file'),
+                                    'output': materialize(output_file) if output_file else output_file,
                                     'stdout': result.get('stdout'),
                                     'stderr': result.get('stderr')
                                 }
@@ -314,10 +391,22 @@ class GenericYamlModule(BaseModule):
                                 # Update progress
                                 if progress:
                                     progress.update(len(completed_steps))
+
+                            STEPS_TOTAL.labels('skipped' if result.get('skipped') else 'completed').inc()
+                            self._emit('step_finished', step=step_name,
+                                       status='skipped' if result.get('skipped') else 'completed',
+                                       duration=time.time() - started_at[step_name],
+                                       output_file=output_file, return_code=result.get('return_code'),
+                                       resources=result.get('resources'),
+                                       completed=len(completed_steps) + len(failed_steps), total=total_steps)
                                 
                         except Exception as e:
                             # Format professional error message
                             failed_steps.add(step_name)
+                            STEPS_TOTAL.labels('failed').inc()
+                            self._emit('step_failed', step=step_name, error=str(e),
+                                       duration=time.time() - started_at[step_name],
+                                       completed=len(completed_steps) + len(failed_steps), total=total_steps)
                             # Still count as progress (failed but completed)
                             if progress:
                                 progress.update(len(completed_steps) + len(failed_steps))
@@ -329,22 +418,33 @@ class GenericYamlModule(BaseModule):
                         if deps.issubset(completed_steps):
                             # Ready to run!
                             step = steps_map[step_name]
+                            if tracer:
+                                tracer.step_ready(self._trace_pid, step_name, step.parallel)
                             
                             can_run = True
                             if not step.parallel and running_futures:
                                  can_run = len(running_futures) == 0
+                                 if tracer:
+                                     tracer.step_blocked(self._trace_pid, step_name, "parallel: false (waits for running steps)")
                             
                             if can_run:
                                 for running_step_name in running_futures.values():
                                     r_step = steps_map[running_step_name]
                                     if not r_step.parallel:
                                         can_run = False
+                                        if tracer:
+                                            tracer.step_blocked(self._trace_pid, step_name,
+                                                                f"'{running_step_name}' (parallel: false)")
                                         break
                                         
                             if can_run:
                                 pending_steps.remove(step_name)
                                 step_context = render_ctx.copy()
-                                future = executor.submit(self._execute_step, step, step_context, context, background)
+                                started_at[step_name] = time.time()
+                                STEPS_RUNNING.inc()
+                                self._emit('step_started', step=step_name)
+                                run_step = self._execute_traced_step if tracer else self._execute_step
+                                future = executor.submit(run_step, step, step_context, context, background)
                                 running_futures[future] = step_name
                     
                     if not running_futures and pending_steps:
@@ -359,10 +459,41 @@ class GenericYamlModule(BaseModule):
             # Ensure progress tracker stops on error
             if progress:
                 progress.stop()
+            RUNS_ACTIVE.dec()
+            RUNS_TOTAL.labels('failed').inc()
+            if tracer:
+                tracer.end_run(self._trace_pid, 'failed')
+            self._emit('run_finished', status='failed', error=str(e),
+                       completed=sorted(completed_steps), failed=sorted(failed_steps))
             raise e
 
+        run_status = 'failed' if failed_steps or pending_steps else 'completed'
+        RUNS_ACTIVE.dec()
+        RUNS_TOTAL.labels(run_status).inc()
+        if tracer:
+            tracer.end_run(self._trace_pid, run_status)
+        self._emit('run_finished', status=run_status,
+                   completed=sorted(completed_steps), failed=sorted(failed_steps))
+
         return self._execution_results
 
+    def _execute_traced_step(self, step, render_ctx, full_context, background=False):
+        """_execute_step within a trace span on the worker's lane"""
+        tracer, pid = self.tracer, self._trace_pid
+        tracer.step_started(pid, step.name)
+        status, details = 'failed', {}
+        try:
+            result = self._execute_step(step, render_ctx, full_context, background)
+            status = 'skipped' if result.get('skipped') else 'completed'
+            details = {'tool': step.tool, 'module': step.module, 'parallel': step.parallel,
+                       'return_code': result.get('return_code'), 'resources': result.get('resources')}
+            return result
+        except Exception as e:
+            details = {'error': str(e)}
+            raise
+        finally:
+            tracer.step_finished(pid, step.name, status, **details)
+
     def _execute_step(self, step, render_ctx, full_context, background=False):
         """
         Executes a single step (Tool or Module).
@@ -401,6 +532,10 @@ class GenericYamlModule(BaseModule):
         # Custom Path Logic
         tool_cmd = step.tool
         
+        # In-process built-in tools
+        if tool_cmd == 'dedupe' and not step.path:
+            return self._run_dedupe(step, cmd_args, render_ctx, full_context, background=background)
+        
         # Built-in Tool Aliases
         # Allow usage of "json_parser" -> "python3 {root}/tools/json_parser.py"
         builtin_tools = {
@@ -469,11 +604,19 @@ class GenericYamlModule(BaseModule):
              for dep_name in step.depends_on:
                  if dep_name in render_ctx and 'stdout' in render_ctx[dep_name]:
                      out = render_ctx[dep_name]['stdout']
-                     if out:
+                     dep_output = render_ctx[dep_name].get('output')
+                     stored = out is None and dep_output and resolve_output_path(dep_output)
+                     if stored:
+                         # Steps that stream to their output file (e.g. dedupe) keep no stdout:
+                         # the file is streamed to the tool instead of being read into memory.
+                         # Other output files also hold the stderr section: never read those.
+                         if os.path.getsize(stored):
+                             combined_input.append(OutputFile(dep_output))
+                     elif out:
                          combined_input.append(out)
              
              if combined_input:
-                 input_data = "\n".join(combined_input)
+                 input_data = _stdin_chunks(combined_input)
 
         # Timeout
         timeout_sec = self._parse_timeout(step.timeout)
@@ -488,18 +631,31 @@ class GenericYamlModule(BaseModule):
                 os.makedirs(working_dir, exist_ok=True)
 
         start_time = time.time()
+        SUBPROCESS_RUNNING.inc()
         try:
-            proc = subprocess.run(
-                full_cmd,
-                shell=True,
-                check=True,
-                capture_output=True,
-                text=True,
-                input=input_data,
-                timeout=timeout_sec,
-                cwd=working_dir  # Execute from project directory
-            )
+            try:
+                proc, usage = run_measured(
+                    full_cmd,
+                    shell=True,
+                    input=input_data,
+                    timeout=timeout_sec,
+                    cwd=working_dir  # Execute from project directory
+                )
+            except subprocess.CalledProcessError:
+                SUBPROCESS_TOTAL.labels('error').inc()
+                raise
+            except subprocess.TimeoutExpired:
+                SUBPROCESS_TOTAL.labels('timeout').inc()
+                raise
+            finally:
+                SUBPROCESS_RUNNING.dec()
+                SUBPROCESS_SECONDS.observe(time.time() - start_time)
             duration = time.time() - start_time
+            SUBPROCESS_TOTAL.labels('ok').inc()
+            CAPTURED_BYTES.labels('stdout').inc(len(proc.stdout or ''))
+            CAPTURED_BYTES.labels('stderr').inc(len(proc.stderr or ''))
+            if usage:
+                self._record_resources(step, usage, duration, full_context)
             
             # AUTOMATIC OUTPUT SAVING (ALWAYS)
             auto_output_path = self._get_auto_output_path(step, full_context)
@@ -510,7 +666,9 @@ class GenericYamlModule(BaseModule):
                     proc.stderr, 
                     step, 
                     duration,
-                    full_cmd
+                    full_cmd,
+                    project_path=full_context.current_project.path,
+                    resources=usage
                 )
                 if not background:
                     # Show save confirmation
@@ -524,7 +682,8 @@ class GenericYamlModule(BaseModule):
                 'stdout': proc.stdout,
                 'stderr': proc.stderr,
                 'output_file': auto_output_path or output_path,
-                'return_code': proc.returncode
+                'return_code': proc.returncode,
+                'resources': usage
             }
 
         except subprocess.CalledProcessError as e:
@@ -532,6 +691,102 @@ class GenericYamlModule(BaseModule):
             format_command_error(step_id, e, full_cmd)
             raise e 
 
+    def _run_dedupe(self, step, cmd_args, render_ctx, full_context, background=False):
+        """
+        Built-in 'dedupe' tool (replaces anew pipelines), run in-process.
+        Inputs: file paths given in args, plus the dependencies' outputs when stdin is true.
+        Args: [files...] [--seen <name>] [--memory <MB>]
+          --seen    only keep lines never seen by previous runs (per-project seen set)
+          --memory  in-memory budget before spilling sorted runs to disk
+        New lines are streamed straight to the step output file.
+        """
+        step_id = step.name
+        parser = argparse.ArgumentParser(prog='dedupe', add_help=False, exit_on_error=False)
+        parser.add_argument('inputs', nargs='*')
+        parser.add_argument('--seen')
+        parser.add_argument('--memory', type=int, default=DEFAULT_MEMORY_MB)
+        try:
+            opts = parser.parse_args(shlex.split(cmd_args))
+        except (argparse.ArgumentError, SystemExit, ValueError) as e:
+            raise ValueError(f"Invalid dedupe arguments for step '{step_id}': {cmd_args}") from e
+        
+        full_cmd = f"dedupe {cmd_args}".strip()
+        if not background:
+            format_tool_execution(step_id, 'dedupe', full_cmd)
+        
+        # Collect inputs: files are streamed. Dependencies feed their in-memory stdout
+        # (their output file also holds the stderr section); only steps that streamed
+        # to their output file (stdout None, e.g. another dedupe) are read from disk.
+        input_files = [p for p in opts.inputs if p]
+        extra_lines = []
+        if step.stdin and step.depends_on:
+            for dep_name in step.depends_on:
+                dep = render_ctx.get(dep_name)
+                if not isinstance(dep, dict):
+                    continue
+                dep_output = dep.get('output')
+                if dep.get('stdout') is None:
+                    if dep_output and output_exists(dep_output):
+                        input_files.append(dep_output)
+                elif dep['stdout']:
+                    extra_lines.append(dep['stdout'])
+        
+        missing = [p for p in input_files if not output_exists(p)]
+        if missing:
+            raise FileNotFoundError(f"dedupe input not found: {', '.join(missing)}")
+        
+        project = full_context.current_project if full_context else None
+        seen_path = None
+        tmp_dir = None
+        if project:
+            tmp_dir = os.path.join(project.path, MANIFEST_DIR, "tmp")
+            if opts.seen:
+                seen_path = seen_set_path(project.path, opts.seen)
+        elif opts.seen:
+            console.print(f"[yellow]⚠️  '--seen' needs an active project; ignored for '{step_id}'[/yellow]")
+        
+        lines = iter_input_lines(input_files)
+        if extra_lines:
+            lines = chain(lines, (line.rstrip('\r') for text in extra_lines
+                                  for line in text.split('\n') if line.strip()))
+        
+        deduper = ExternalDeduper(memory_mb=opts.memory, seen_path=seen_path, tmp_dir=tmp_dir)
+        start_time = time.time()
+        auto_output_path = self._get_auto_output_path(step, full_context)
+        
+        if auto_output_path:
+            with open(auto_output_path, 'wb') as f:
+                out = OutputStatsWriter(f)
+                stats = deduper.run(lines, out)
+                output_stats = out.close()
+            stdout = None
+        else:
+            buffer = io.StringIO()
+            stats = deduper.run(lines, buffer)
+            stdout = buffer.getvalue()
+        duration = time.time() - start_time
+        
+        if auto_output_path:
+            self._write_step_metadata(
+                auto_output_path, step, duration, full_cmd,
+                project_path=project.path if project else None,
+                stats=output_stats
+            )
+            if not background:
+                format_output_saved(auto_output_path)
+        
+        if not background:
+            spilled = f", {stats['runs']} run(s) spilled" if stats['runs'] else ""
+            console.print(f"[dim]   {stats['input']} input lines -> {stats['new']} new{spilled}[/dim]")
+        
+        return {
+            'stdout': stdout,
+            'stderr': '',
+            'output_file': auto_output_path,
+            'return_code': 0,
+            'dedupe': stats
+        }
+
     def _run_submodule(self, step, cmd_args, render_ctx, full_context, background=False):
         step_id = step.name
         mod_ref = step.module
@@ -564,7 +819,16 @@ class GenericYamlModule(BaseModule):
                 target_mod.update_option(key, render_ctx[key])
         
         # 3. Execute recursively
-        results = target_mod.run(full_context, background=background)
+        target_mod.execution_id = self.execution_id
+        if self.tracer:
+            target_mod.tracer = self.tracer
+            target_mod._trace_parent = (self._trace_pid, step_id)
+        try:
+            results = target_mod.run(full_context, background=background)
+        finally:
+            if self.tracer:
+                target_mod.tracer = None
+                target_mod._trace_parent = None
         
         return {
             'module_results': results,
@@ -623,61 +887,43 @@ class GenericYamlModule(BaseModule):
         output_file = f"{step_name}"
         return os.path.join(module_dir, output_file)
     
-    def _save_step_output(self, path, stdout, stderr, step, duration, command):
-        """Save step output with metadata and JSON parsing"""
+    def _record_resources(self, step, usage, duration, full_context):
+        """Store the resource usage of a tool run (best effort)"""
+        project = full_context.current_project if full_context else None
+        session = None
         try:
-            # 1. Save raw text output
-            with open(path, 'w') as f:
+            session = create_new_session()
+            StepResourceRepository(session).record(
+                usage, self.meta.get('id', 'unknown'), step.name, step.tool or 'unknown', round(duration, 3),
+                project_id=project.id if project else None,
+                execution_id=self.execution_id
+            )
+        except Exception as e:
+            console.print(f"[dim]Could not record resource usage of '{step.name}': {e}[/dim]")
+        finally:
+            if session is not None:
+                session.close()
+
+    def _save_step_output(self, path, stdout, stderr, step, duration, command, project_path=None, resources=None):
+        """
+        Save step output with metadata and a project manifest entry.
+        Metadata (lines, JSONL records, size, sha256) is computed while writing;
+        the output is never parsed here (bcat/bstats parse on demand).
+        """
+        try:
+            # 1. Save raw text output (stats computed in the same pass)
+            with open(path, 'wb') as f:
+                writer = OutputStatsWriter(f)
                 if stdout:
-                    f.write(stdout)
+                    writer.write(stdout)
                 if stderr:
-                    f.write("\n\n--- STDERR ---\n")
-                    f.write(stderr)
-            
-            # 2. Parse output to JSON (server-side) - but DO NOT SAVE as separate file
-            # Just keep for metadata purposes
-            tool_name = step.tool if step.tool else 'unknown'
-            json_data = None
-            
-            if stdout and stdout.strip():
-                try:
-                    # Attempt simple JSON load first
-                     json_data = json.loads(stdout)
-                except:
-                     try:
-                         json_data = self.parser.parse_to_json(stdout, tool_name)
-                     except:
-                         pass
-            
-            # 3. Save JSON removed (User request: exact output only)
-            has_json = bool(json_data)
-            record_count = len(json_data) if isinstance(json_data, list) else (1 if json_data else 0)
+                    writer.write(f"\n\n{STDERR_MARKER}\n", count_lines=False)
+                    writer.write(stderr, count_lines=False)
+                stats = writer.close()
             
-            # 4. Calculate line count
-            line_count = 0
-            if stdout:
-                line_count = len(stdout.splitlines())
-            
-            # 5. Save enhanced metadata
-            metadata = {
-                'step_name': step.name,
-                'tool': tool_name,
-                'module_id': self.meta.get('id', 'unknown'),
-                'module_name': self.meta.get('name', 'Unknown'),
-                'timestamp': datetime.now().isoformat(),
-                'duration_seconds': round(duration, 2),
-                'line_count': line_count,
-                'file_size': os.path.getsize(path),
-                'command': command,
-                'exit_code': 0,
-                'has_json': has_json,
-                'record_count': record_count,
-                'parser_used': tool_name if has_json else None
-            }
-            
-            meta_path = f"{path}.meta.json"
-            with open(meta_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            # 2. Save enhanced metadata (+ manifest entry)
+            self._write_step_metadata(path, step, duration, command,
+                                      project_path=project_path, stats=stats, resources=resources)
                 
         except Exception as e:
             # Retry once
@@ -687,8 +933,48 @@ class GenericYamlModule(BaseModule):
                     if stdout:
                         f.write(stdout)
                     if stderr:
-                        f.write("\n\n--- STDERR ---\n")
+                        f.write(f"\n\n{STDERR_MARKER}\n")
                         f.write(stderr)
             except Exception as retry_error:
                 console.print(f"[red]⚠️  Failed to save output: {retry_error}[/red]")
 
+    def _write_step_metadata(self, path, step, duration, command, project_path=None, stats=None, resources=None):
+        """Write the .meta.json sidecar of a step output and its manifest entry"""
+        tool_name = step.tool if step.tool else 'unknown'
+        if stats is None:
+            stats = OutputStats()
+        content = stats.as_metadata()
+        
+        metadata = {
+            'step_name': step.name,
+            'tool': tool_name,
+            'module_id': self.meta.get('id', 'unknown'),
+            'module_name': self.meta.get('name', 'Unknown'),
+            'timestamp': datetime.now().isoformat(),
+            'duration_seconds': round(duration, 2),
+            'line_count': content['line_count'],
+            'file_size': content['file_size'],
+            'command': command,
+            'exit_code': 0,
+            'has_json': content['has_json'],
+            'record_count': content['record_count'],
+            'format': content['format'],
+            'sha256': content['sha256'],
+            'parser_used': tool_name if content['has_json'] else None
+        }
+        if resources:
+            metadata['resources'] = resources
+        
+        meta_path = f"{path}.meta.json"
+        with open(meta_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        # Update project manifest (read by 'ls')
+        if project_path:
+            ProjectManifest(project_path).record_file(
+                metadata['module_id'],
+                path,
+                lines=content['line_count'],
+                records=content['record_count'],
+                tool=tool_name
+            )
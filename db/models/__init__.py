@@ -4,3 +4,6 @@ from .tool import Tool
 from .workflow import Workflow, WorkflowModule, WorkflowModuleTool
 from .api_key import APIKey
 from .config import Config
+from .storage_policy import StoragePolicy
+from .execution import Execution, ExecutionStep
+from .step_resources import StepResourceUsage
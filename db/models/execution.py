@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..base import Base
+
+class Execution(Base):
+    __tablename__ = 'executions'
+
+    # Sequential id: keyset pagination cursor (newest first)
+    id = Column(Integer, primary_key=True, index=True)
+    execution_id = Column(String, unique=True, nullable=False, index=True) # Public UUID
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=True, index=True)
+    module_id = Column(String, index=True)
+    module_name = Column(String)
+    status = Column(String, default="queued", index=True) # queued, running, completed, failed, cancelled
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+
+    steps = relationship("ExecutionStep", back_populates="execution", cascade="all, delete-orphan",
+                         order_by="ExecutionStep.id")
+
+    def __repr__(self):
+        return f"<Execution(id={self.execution_id}, module={self.module_id}, status={self.status})>"
+
+class ExecutionStep(Base):
+    __tablename__ = 'execution_steps'
+
+    id = Column(Integer, primary_key=True, index=True)
+    execution_id = Column(Integer, ForeignKey('executions.id'), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    depends_on = Column(Text, default="[]") # JSON list of step names
+    status = Column(String, default="pending") # pending, running, completed, skipped, failed, not_run
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration = Column(Float, nullable=True)
+    output_file = Column(String, nullable=True)
+    return_code = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    execution = relationship("Execution", back_populates="steps")
+
+    def __repr__(self):
+        return f"<ExecutionStep(name={self.name}, status={self.status})>"
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from datetime import datetime
+from ..base import Base
+
+class StepResourceUsage(Base):
+    __tablename__ = 'step_resources'
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey('projects.id'), nullable=True, index=True)
+    execution_id = Column(String, nullable=True, index=True) # API execution UUID (None for CLI runs)
+    module_id = Column(String, index=True)
+    step = Column(String)
+    tool = Column(String, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    duration = Column(Float)
+    cpu_user = Column(Float)
+    cpu_system = Column(Float)
+    max_rss_kb = Column(Integer)
+    read_bytes = Column(Integer, nullable=True)
+    write_bytes = Column(Integer, nullable=True)
+    read_chars = Column(Integer, nullable=True)
+    write_chars = Column(Integer, nullable=True)
+    voluntary_ctx_switches = Column(Integer)
+    involuntary_ctx_switches = Column(Integer)
+
+    def __repr__(self):
+        return f"<StepResourceUsage(tool={self.tool}, cpu={self.cpu_user}+{self.cpu_system}s, rss={self.max_rss_kb}KB)>"
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from ..base import Base
+
+class StoragePolicy(Base):
+    __tablename__ = 'storage_policies'
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey('projects.id'), unique=True, nullable=False, index=True)
+    codec = Column(String, default="gzip") # "gzip" or "zstd"
+    compress_after_days = Column(Integer, nullable=True) # Null = never compress
+    retention_days = Column(Integer, nullable=True) # Null = keep forever
+
+    def __repr__(self):
+        return f"<StoragePolicy(project={self.project_id}, codec={self.codec}, compress_after={self.compress_after_days}, retention={self.retention_days})>"
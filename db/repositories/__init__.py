@@ -1,3 +1,5 @@
 from .project_repo import ProjectRepository
 from .tool_repo import ToolRepository
 from .workflow_repo import WorkflowRepository
+from .execution_repo import ExecutionRepository
+from .resource_repo import StepResourceRepository
@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+import json
+from sqlalchemy.orm import Session
+from .base_repo import BaseRepository
+from ..models.execution import Execution, ExecutionStep
+
+# Step states that are final
+STEP_DONE = ('completed', 'skipped', 'failed', 'not_run')
+
+class ExecutionRepository(BaseRepository[Execution]):
+    def __init__(self, session: Session):
+        super().__init__(Execution, session)
+
+    def get_by_execution_id(self, execution_id: str) -> Execution | None:
+        return self.session.query(Execution).filter(Execution.execution_id == execution_id).first()
+
+    def create_execution(self, execution_id: str, module_id: str = None, module_name: str = None,
+                         project_id: int = None, status: str = "queued") -> Execution:
+        return self.create({
+            "execution_id": execution_id,
+            "module_id": module_id,
+            "module_name": module_name,
+            "project_id": project_id,
+            "status": status,
+        })
+
+    def set_status(self, execution_id: str, status: str, error: str = None) -> Execution | None:
+        execution = self.get_by_execution_id(execution_id)
+        if not execution:
+            return None
+        execution.status = status
+        now = datetime.utcnow()
+        if status == "running" and not execution.started_at:
+            execution.started_at = now
+        elif status in ("completed", "failed", "cancelled"):
+            execution.finished_at = now
+            if error:
+                execution.error = error
+        self.session.commit()
+        return execution
+
+    def set_steps(self, execution_id: str, steps: Iterable[dict]):
+        """Register the DAG of an execution: [{'name': ..., 'depends_on': [...]}, ...]"""
+        execution = self.get_by_execution_id(execution_id)
+        if not execution:
+            return
+        existing = {step.name for step in execution.steps}
+        for step in steps:
+            if step['name'] in existing:
+                continue
+            execution.steps.append(ExecutionStep(
+                name=step['name'],
+                depends_on=json.dumps(list(step.get('depends_on') or [])),
+                status="pending",
+            ))
+        self.session.commit()
+
+    def get_step(self, execution_id: str, name: str) -> ExecutionStep | None:
+        return (self.session.query(ExecutionStep)
+                .join(Execution)
+                .filter(Execution.execution_id == execution_id, ExecutionStep.name == name)
+                .first())
+
+    def update_step(self, execution_id: str, name: str, **fields) -> ExecutionStep | None:
+        step = self.get_step(execution_id, name)
+        if not step:
+            return None
+        for field, value in fields.items():
+            setattr(step, field, value)
+        self.session.commit()
+        return step
+
+    def close_pending_steps(self, execution_id: str, status: str = "not_run"):
+        """Mark steps that never ran (failed dependency, deadlock, cancellation)"""
+        execution = self.get_by_execution_id(execution_id)
+        if not execution:
+            return
+        for step in execution.steps:
+            if step.status not in STEP_DONE:
+                step.status = status
+        self.session.commit()
+
+    def list_executions(self, cursor: Optional[int] = None, limit: int = 50,
+                        status: Optional[str] = None, project_id: Optional[int] = None) -> Tuple[List[Execution], Optional[int]]:
+        """
+        Newest executions first, keyset-paginated on the sequential id.
+        Returns (page, next_cursor); next_cursor is None on the last page.
+        """
+        query = self.session.query(Execution)
+        if cursor is not None:
+            query = query.filter(Execution.id < cursor)
+        if status:
+            query = query.filter(Execution.status == status)
+        if project_id is not None:
+            query = query.filter(Execution.project_id == project_id)
+
+        rows = query.order_by(Execution.id.desc()).limit(limit + 1).all()
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1].id
+        return rows, None
@@ -1,6 +1,9 @@
+from typing import Iterable
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from .base_repo import BaseRepository
 from ..models.project import Project, ScanResult, SessionModel, ProjectFile
+from ..models.storage_policy import StoragePolicy
 import os
 
 class ProjectRepository(BaseRepository[Project]):
@@ -34,6 +37,39 @@ class ProjectRepository(BaseRepository[Project]):
         self.session.refresh(file_record)
         return file_record
 
+    def add_file_records(self, project_id: int, records: Iterable[dict]) -> list[int]:
+        """
+        Bulk insert file records in a single transaction.
+        Each record is a dict with 'tool_name', 'file_path' and 'file_size_bytes'.
+        Returns the ids of the inserted rows, in input order.
+        """
+        rows = [
+            {
+                "project_id": project_id,
+                "tool_name": r.get("tool_name"),
+                "file_path": r["file_path"],
+                "file_size_bytes": r.get("file_size_bytes", 0),
+            }
+            for r in records
+        ]
+        if not rows:
+            return []
+
+        try:
+            ids = self.session.scalars(
+                insert(ProjectFile).returning(ProjectFile.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return list(ids)
+
+    def get_file_paths(self, project_id: int) -> set[str]:
+        rows = self.session.query(ProjectFile.file_path).filter(ProjectFile.project_id == project_id).all()
+        return {r[0] for r in rows}
+
     def get_files(self, project_id: int) -> list[ProjectFile]:
         return self.session.query(ProjectFile).filter(ProjectFile.project_id == project_id).all()
 
@@ -72,3 +108,21 @@ class ProjectRepository(BaseRepository[Project]):
         self.session.commit()
         self.session.refresh(session_obj)
         return session_obj
+
+    def get_storage_policy(self, project_id: int) -> StoragePolicy | None:
+        return self.session.query(StoragePolicy).filter(StoragePolicy.project_id == project_id).first()
+
+    def set_storage_policy(self, project_id: int, **fields) -> StoragePolicy:
+        """
+        Create or update the storage policy of a project.
+        Accepted fields: codec, compress_after_days, retention_days.
+        """
+        policy = self.get_storage_policy(project_id)
+        if not policy:
+            policy = StoragePolicy(project_id=project_id, codec="gzip")
+        for field, value in fields.items():
+            setattr(policy, field, value)
+        self.session.add(policy)
+        self.session.commit()
+        self.session.refresh(policy)
+        return policy
@@ -0,0 +1,29 @@
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from .base_repo import BaseRepository
+from ..models.step_resources import StepResourceUsage
+
+USAGE_FIELDS = ('cpu_user', 'cpu_system', 'max_rss_kb', 'read_bytes', 'write_bytes',
+                'read_chars', 'write_chars', 'voluntary_ctx_switches', 'involuntary_ctx_switches')
+
+class StepResourceRepository(BaseRepository[StepResourceUsage]):
+    def __init__(self, session: Session):
+        super().__init__(StepResourceUsage, session)
+
+    def record(self, usage: Dict[str, float], module_id: str, step: str, tool: str, duration: float,
+               project_id: int = None, execution_id: str = None) -> StepResourceUsage:
+        fields = {name: usage.get(name) for name in USAGE_FIELDS}
+        return self.create({
+            "project_id": project_id,
+            "execution_id": execution_id,
+            "module_id": module_id,
+            "step": step,
+            "tool": tool,
+            "duration": duration,
+            **fields,
+        })
+
+    def for_execution(self, execution_id: str) -> List[StepResourceUsage]:
+        return (self.session.query(StepResourceUsage)
+                .filter(StepResourceUsage.execution_id == execution_id)
+                .order_by(StepResourceUsage.id).all())
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
 from contextlib import contextmanager
 from utils.paths import get_project_root
@@ -21,6 +22,7 @@ def init_db():
             get_db_url(), 
             connect_args={"check_same_thread": False} # Needed for SQLite
         )
+        _install_metrics(_engine)
         # Create all tables
         Base.metadata.create_all(bind=_engine)
         
@@ -28,6 +30,30 @@ def init_db():
         session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
         _SessionLocal = scoped_session(session_factory)
 
+def _install_metrics(engine):
+    """Statement latency and commit counters (utils.metrics)"""
+    from utils.metrics import DB_QUERY_SECONDS, DB_COMMITS
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_start'].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get('query_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        DB_COMMITS.inc()
+
 def get_session():
     """
     Return a new database session.
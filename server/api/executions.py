@@ -0,0 +1,130 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from itertools import islice, takewhile
+import json
+
+from core.file_reader import FileReader
+from core.output_stats import STDERR_MARKER
+from core.storage import open_output, output_exists
+from db.session import create_new_session
+from db.repositories.execution_repo import ExecutionRepository
+from db.repositories.project_repo import ProjectRepository
+from db.repositories.resource_repo import StepResourceRepository, USAGE_FIELDS
+from server.core.executions import execution_to_dict
+
+router = APIRouter()
+file_reader = FileReader()
+
+
+@router.get("/executions")
+def list_executions(cursor: Optional[int] = Query(None, ge=1), limit: int = Query(50, ge=1, le=500),
+                    status: Optional[str] = None, project: Optional[str] = None):
+    """
+    List executions, newest first.
+    Pass next_cursor back as 'cursor' to get the following page.
+    """
+    session = create_new_session()
+    try:
+        project_id = None
+        if project:
+            found = ProjectRepository(session).get_by_name(project)
+            if not found:
+                raise HTTPException(status_code=404, detail=f"Project '{project}' not found")
+            project_id = found.id
+        rows, next_cursor = ExecutionRepository(session).list_executions(cursor, limit, status, project_id)
+        return {'items': [execution_to_dict(row) for row in rows], 'next_cursor': next_cursor}
+    finally:
+        session.close()
+
+
+@router.get("/executions/{execution_id}")
+def get_execution(execution_id: str):
+    """Execution details with the DAG state of every step."""
+    session = create_new_session()
+    try:
+        execution = ExecutionRepository(session).get_by_execution_id(execution_id)
+        if not execution:
+            raise HTTPException(status_code=404, detail=f"Execution '{execution_id}' not found")
+        return execution_to_dict(execution, steps=True)
+    finally:
+        session.close()
+
+
+@router.get("/executions/{execution_id}/resources")
+def get_execution_resources(execution_id: str):
+    """CPU, peak memory and I/O of every tool process run by an execution."""
+    session = create_new_session()
+    try:
+        if not ExecutionRepository(session).get_by_execution_id(execution_id):
+            raise HTTPException(status_code=404, detail=f"Execution '{execution_id}' not found")
+        rows = StepResourceRepository(session).for_execution(execution_id)
+        return {'items': [{'module_id': row.module_id, 'step': row.step, 'tool': row.tool,
+                           'duration': row.duration, **{name: getattr(row, name) for name in USAGE_FIELDS}}
+                          for row in rows]}
+    finally:
+        session.close()
+
+
+def _step_output(execution_id: str, step: str) -> str:
+    session = create_new_session()
+    try:
+        found = ExecutionRepository(session).get_step(execution_id, step)
+        if not found:
+            raise HTTPException(status_code=404, detail=f"Step '{step}' not found in execution '{execution_id}'")
+        path = found.output_file
+    finally:
+        session.close()
+
+    if not path or not output_exists(path):
+        raise HTTPException(status_code=404, detail=f"Step '{step}' has no stored output")
+    return path
+
+
+@router.get("/executions/{execution_id}/steps/{step}/output")
+def read_step_output(execution_id: str, step: str,
+                     offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=10000)):
+    """
+    Page through the lines of a step output (seek-based on large outputs).
+    Pass next_offset back as 'offset' for the next page (null at the end).
+    """
+    path = _step_output(execution_id, step)
+    result = file_reader.read_lines(path, offset, limit + 1)
+    lines = result['lines']
+    more = len(lines) > limit
+    return {
+        'offset': offset,
+        'lines': lines[:limit],
+        'next_offset': offset + limit if more else None,
+    }
+
+
+@router.get("/executions/{execution_id}/steps/{step}/output.ndjson")
+def stream_step_output(execution_id: str, step: str,
+                       offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """
+    Stream a step output as NDJSON: JSON-lines outputs are passed through
+    (up to the stderr section, which is not part of the records), other
+    lines are wrapped as {"line": ...}.
+    """
+    path = _step_output(execution_id, step)
+    metadata = file_reader.read_metadata(path) or {}
+    jsonl = metadata.get('format') == 'jsonl'
+
+    def generate():
+        batch = []
+        with open_output(path, 'rt') as f:
+            lines = (line.rstrip('\r\n') for line in f)
+            if jsonl:
+                lines = takewhile(lambda line: line != STDERR_MARKER, lines)
+            lines = (line for line in lines if line.strip())
+            stop = offset + limit if limit is not None else None
+            for line in islice(lines, offset, stop):
+                batch.append(line if jsonl else json.dumps({'line': line}))
+                if len(batch) >= 500:
+                    yield "\n".join(batch) + "\n"
+                    batch = []
+        if batch:
+            yield "\n".join(batch) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
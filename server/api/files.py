@@ -0,0 +1,145 @@
+from fastapi import APIRouter, HTTPException, Query, Header
+from fastapi.responses import StreamingResponse, Response
+from typing import List, Optional
+import os
+
+from core.file_reader import FileReader, parse_byte_range
+from core.record_index import indexed_query
+from core.storage import output_exists
+from utils.aggregate import run_stats
+from utils.query import compile_query
+from utils.record_stream import iter_records, query_records
+from db.session import create_new_session
+from db.repositories.project_repo import ProjectRepository
+
+router = APIRouter()
+file_reader = FileReader()
+
+ROOT_ALIASES = ("Root", "(Project Root)", "[Project Root]")
+
+
+def _resolve_output(project_name: str, module: str, step: str) -> str:
+    """Map project/module/step to an output path inside the project directory"""
+    session = create_new_session()
+    try:
+        project = ProjectRepository(session).get_by_name(project_name)
+        if not project:
+            raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found")
+        project_path = os.path.realpath(project.path)
+    finally:
+        session.close()
+    
+    if module in ROOT_ALIASES:
+        path = os.path.realpath(os.path.join(project_path, step))
+    else:
+        path = os.path.realpath(os.path.join(project_path, module, step))
+    
+    if not path.startswith(project_path + os.sep):
+        raise HTTPException(status_code=400, detail="Invalid output path")
+    return path
+
+
+def _existing_output(project: str, module: str, step: str) -> str:
+    path = _resolve_output(project, module, step)
+    if not output_exists(path):
+        raise HTTPException(status_code=404, detail=f"Output '{module}/{step}' not found")
+    return path
+
+
+@router.get("/projects/{project}/files/{module}/{step}/raw")
+def read_raw(project: str, module: str, step: str, range: Optional[str] = Header(default=None)):
+    """
+    Raw content of an output, streamed in chunks.
+    Supports single HTTP byte ranges (Range: bytes=start-end) on uncompressed outputs;
+    compressed outputs are always sent whole (decompressed on the fly).
+    """
+    path = _existing_output(project, module, step)
+    size = file_reader.size(path)
+    headers = {'Accept-Ranges': 'bytes' if size is not None else 'none'}
+    
+    if range and size is not None:
+        try:
+            start, end = parse_byte_range(range, size)
+        except ValueError:
+            return Response(status_code=416, headers={'Content-Range': f"bytes */{size}"})
+        headers.update({
+            'Content-Range': f"bytes {start}-{end}/{size}",
+            'Content-Length': str(end - start + 1),
+        })
+        return StreamingResponse(file_reader.iter_chunks(path, start, end + 1), status_code=206,
+                                 media_type="application/octet-stream", headers=headers)
+    
+    if size is not None:
+        headers['Content-Length'] = str(size)
+    return StreamingResponse(file_reader.iter_chunks(path), media_type="application/octet-stream", headers=headers)
+
+
+@router.get("/projects/{project}/files/{module}/{step}/head")
+def read_head(project: str, module: str, step: str, n: int = Query(10, ge=1, le=10000)):
+    """First n lines of an output."""
+    return {'lines': file_reader.head(_existing_output(project, module, step), n)}
+
+
+@router.get("/projects/{project}/files/{module}/{step}/tail")
+def read_tail(project: str, module: str, step: str, n: int = Query(10, ge=1, le=10000)):
+    """Last n lines of an output (seeks from the end of uncompressed files)."""
+    return {'lines': file_reader.tail(_existing_output(project, module, step), n)}
+
+
+@router.get("/projects/{project}/files/{module}/{step}/meta")
+def read_meta(project: str, module: str, step: str):
+    """Step metadata (.meta.json) and size of an output."""
+    path = _existing_output(project, module, step)
+    return {'size': file_reader.size(path), 'metadata': file_reader.read_metadata(path)}
+
+
+@router.get("/projects/{project}/files/{module}/{step}/lines")
+def read_lines(project: str, module: str, step: str,
+               start: int = Query(0, ge=0), count: int = Query(100, ge=1, le=10000)):
+    """
+    Page through the raw lines of an output.
+    """
+    result = file_reader.read_lines(_resolve_output(project, module, step), start, count)
+    if not result['exists']:
+        raise HTTPException(status_code=404, detail=f"Output '{module}/{step}' not found")
+    return result
+
+
+@router.get("/projects/{project}/files/{module}/{step}/records")
+def read_records(project: str, module: str, step: str,
+                 q: Optional[str] = None,
+                 offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=10000)):
+    """
+    Page through the JSON records of an output, optionally filtered by a bcat query (q).
+    """
+    try:
+        result = file_reader.read_records(_resolve_output(project, module, step), q, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid query: {e}")
+    if not result['exists']:
+        raise HTTPException(status_code=404, detail=f"Output '{module}/{step}' not found")
+    return result
+
+
+@router.get("/projects/{project}/files/{module}/{step}/stats")
+def file_stats(project: str, module: str, step: str,
+               op: str = Query("count", pattern="^(count|uniq|top|group|hist)$"),
+               field: Optional[str] = None,
+               n: int = Query(10, ge=1, le=10000),
+               agg: List[str] = Query(default=[]),
+               bins: int = Query(10, ge=1, le=1000),
+               where: Optional[str] = None):
+    """
+    Aggregate the JSON records of an output (same operations as the bstats command).
+    Example: /stats?op=group&field=host&agg=sum:content_length&agg=max:time
+    """
+    path = _existing_output(project, module, step)
+    
+    try:
+        predicate = compile_query(where) if where and where.strip() else None
+        records = indexed_query(path, where)
+        if records is None:
+            records = query_records(iter_records(path), predicate)
+        return run_stats(records, op, field, n=n, aggregates=agg or ['count'], bins=bins)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, WebSocket, BackgroundTasks, HTTPException
+from fastapi import APIRouter, WebSocket, HTTPException, Request, Query
+from fastapi.responses import PlainTextResponse
 from fastapi.websockets import WebSocketDisconnect
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
@@ -9,28 +10,99 @@ import json
 from core.schema import ModuleSchema
 from core.yaml_module import GenericYamlModule
 from core.context import Context
-from server.core.log_manager import log_manager
+from server.core.log_manager import log_manager, READ_CHUNK
+from server.core.executions import ExecutionRecorder
+from server.core.job_queue import job_queue, Job
+from server.core.event_hub import event_hub, DEFAULT_RATE
+from db.session import create_new_session
+from db.repositories.execution_repo import ExecutionRepository
+from db.repositories.project_repo import ProjectRepository
 
 router = APIRouter()
 
 class RunRequest(BaseModel):
     workflow: ModuleSchema
     variables: Dict[str, Any] = {}
+    project: Optional[str] = None # Project name: outputs are saved in its directory
+    priority: int = 0 # Higher runs first when the queue is full
+
+def _register_execution(execution_id: str, schema: ModuleSchema, project_name: Optional[str]) -> Optional[int]:
+    """Create the execution record; returns the project id (404 if the project is unknown)"""
+    session = create_new_session()
+    try:
+        project_id = None
+        if project_name:
+            project = ProjectRepository(session).get_by_name(project_name)
+            if not project:
+                raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found")
+            project_id = project.id
+        ExecutionRepository(session).create_execution(
+            execution_id, module_id=schema.info.id, module_name=schema.info.name, project_id=project_id,
+        )
+        return project_id
+    finally:
+        session.close()
+
+def _set_execution_status(execution_id: str, status: str, error: str = None):
+    session = create_new_session()
+    try:
+        ExecutionRepository(session).set_status(execution_id, status, error)
+    finally:
+        session.close()
+    event_hub.publish_threadsafe(execution_id, 'status', status=status, error=error)
+
+def _on_job_cancelled(job: Job):
+    _set_execution_status(job.execution_id, "cancelled")
+    log_manager.finish(job.execution_id)
 
 @router.post("/run")
-async def run_workflow(request: RunRequest, background_tasks: BackgroundTasks):
+async def run_workflow(request: RunRequest, http_request: Request):
     """
     Execute a workflow definition provided in the request body.
+    The execution is queued and starts when the concurrency limits allow it.
     """
+    if not job_queue.accepting:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
     execution_id = str(uuid.uuid4())
-    
-    # Run in background
-    background_tasks.add_task(_execute_workflow, execution_id, request.workflow, request.variables)
-    
-    return {"execution_id": execution_id, "status": "started"}
+    app_context: Context = http_request.app.state.context
+    project_id = await asyncio.to_thread(_register_execution, execution_id, request.workflow, request.project)
 
-async def _execute_workflow(execution_id: str, schema: ModuleSchema, variables: Dict[str, Any]):
+    try:
+        job = job_queue.submit(
+            execution_id,
+            lambda: _execute_workflow(app_context, execution_id, request.workflow, request.variables, project_id),
+            priority=request.priority, project_id=project_id, on_cancel=_on_job_cancelled,
+        )
+    except RuntimeError as e:
+        # Shutdown started while the execution was being registered
+        await asyncio.to_thread(_set_execution_status, execution_id, "cancelled", str(e))
+        log_manager.finish(execution_id)
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+
+    event_hub.publish(execution_id, 'status', status=job.state)
+    return {"execution_id": execution_id, "status": job.state, "position": job_queue.position(execution_id)}
+
+@router.get("/queue")
+def get_queue():
+    """Queued, running and recently finished executions with the concurrency limits."""
+    return job_queue.snapshot()
+
+@router.delete("/queue/{execution_id}")
+def cancel_queued(execution_id: str):
+    """Cancel an execution that has not started yet."""
+    if not job_queue.cancel(execution_id):
+        job = job_queue.get(execution_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Execution '{execution_id}' is not in the queue")
+        raise HTTPException(status_code=409, detail=f"Execution '{execution_id}' is {job.state}")
+    return {"execution_id": execution_id, "status": "cancelled"}
+
+async def _execute_workflow(app_context: Context, execution_id: str, schema: ModuleSchema, variables: Dict[str, Any],
+                            project_id: Optional[int] = None):
     """Background execution wrapper"""
+    ctx = None
+    recorder = ExecutionRecorder(execution_id)
+    outcome = {}
     try:
         await log_manager.emit_log(execution_id, f"[INFO] Starting execution {execution_id}\n")
         
@@ -38,8 +110,16 @@ async def _execute_workflow(execution_id: str, schema: ModuleSchema, variables:
         module = GenericYamlModule()
         module.load_from_schema(schema)
         
-        # Initialize Context
-        ctx = Context()
+        # Per-run view of the shared application context (own DB session and state)
+        ctx = app_context.fork()
+        if project_id is not None:
+            ctx.current_project = ctx.project_repo.get(project_id)
+        
+        # Record run and step states in the execution registry
+        module.execution_id = execution_id
+        module.add_listener(recorder)
+        module.add_listener(event_hub.module_listener(execution_id))
+        module.add_listener(lambda event, data: outcome.update(data) if event == 'run_finished' else None)
         
         # Inject variables into context (if needed/supported)
         # We might need to manually update module options or context settings
@@ -58,24 +138,88 @@ async def _execute_workflow(execution_id: str, schema: ModuleSchema, variables:
         # FastAPI's background_tasks run sync functions in a threadpool. `_execute_workflow` is async, so it runs on loop.
         # We must wrap the blocking call.
         
+        await asyncio.to_thread(_set_execution_status, execution_id, "running")
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(None, lambda: module.run(ctx, background=False))
         
-        await log_manager.emit_log(execution_id, f"\n[INFO] Execution {execution_id} completed.\n")
+        status = outcome.get('status', 'completed')
+        failed = outcome.get('failed') or []
+        await asyncio.to_thread(_set_execution_status, execution_id, status,
+                                f"Failed steps: {', '.join(failed)}" if failed else None)
+        await log_manager.emit_log(execution_id, f"\n[INFO] Execution {execution_id} {status}.\n")
         
     except Exception as e:
+        await asyncio.to_thread(_set_execution_status, execution_id, "failed", str(e))
         await log_manager.emit_log(execution_id, f"\n[ERROR] Execution failed: {str(e)}\n")
+    finally:
+        if ctx is not None:
+            ctx.close()
+        recorder.close()
+        log_manager.finish(execution_id)
+
+@router.get("/logs/{execution_id}")
+def read_logs(execution_id: str, since: int = Query(0, ge=0), max_bytes: int = Query(READ_CHUNK, ge=1, le=4 * READ_CHUNK)):
+    """
+    Read an execution log from a byte offset.
+    X-Log-Offset is the cursor to pass as 'since' on the next call (or to /ws/logs).
+    """
+    text, next_offset = log_manager.read(execution_id, since, max_bytes)
+    return PlainTextResponse(text, headers={
+        "X-Log-Offset": str(next_offset),
+        "X-Log-Finished": "true" if log_manager.is_finished(execution_id) else "false",
+    })
 
 @router.websocket("/ws/logs/{execution_id}")
-async def websocket_endpoint(websocket: WebSocket, execution_id: str):
+async def websocket_endpoint(websocket: WebSocket, execution_id: str, since: int = 0):
     await websocket.accept()
-    queue = await log_manager.subscribe(execution_id)
+    subscription = await log_manager.subscribe(execution_id, since=max(0, since))
     
     try:
         while True:
-            # Check if client is still alive
-            data = await queue.get()
-            # Send log line
+            data = await subscription.get()
+            if data is None:
+                # Execution finished and everything was sent
+                await websocket.close()
+                break
+            # Send log text
             await websocket.send_text(data)
     except WebSocketDisconnect:
-        log_manager.unsubscribe(execution_id, queue)
+        pass
+    finally:
+        log_manager.unsubscribe(execution_id, subscription)
+
+@router.websocket("/ws/events")
+async def events_endpoint(websocket: WebSocket, rate: float = DEFAULT_RATE):
+    """
+    Multiplexed events of many executions over one connection.
+    Client messages (JSON):
+        {"op": "subscribe", "executions": ["<id>" | "*", ...], "types": ["step_finished", "log", ...]}
+        {"op": "unsubscribe", "executions": ["<id>", ...]}
+        {"op": "rate", "value": 5}
+    Server frames: {"events": [{"e": id, "t": type, "ts": ..., ...}], "dropped": n, "dropped_by_execution": {id: n}}
+    The rate applies to the connection; each execution has its own buffer.
+    """
+    await websocket.accept()
+    client = event_hub.connect(rate=max(0.1, rate))
+
+    async def send_frames():
+        while True:
+            frame = await client.next_frame()
+            await websocket.send_text(json.dumps(frame, separators=(',', ':'), default=str))
+
+    sender = asyncio.ensure_future(send_frames())
+    try:
+        while True:
+            message = await websocket.receive_json()
+            op = message.get('op')
+            if op == 'subscribe':
+                client.subscribe(message.get('executions') or [], message.get('types'))
+            elif op == 'unsubscribe':
+                client.unsubscribe(message.get('executions') or [])
+            elif op == 'rate':
+                client.set_rate(float(message.get('value', DEFAULT_RATE)))
+    except (WebSocketDisconnect, ValueError, TypeError):
+        pass
+    finally:
+        sender.cancel()
+        event_hub.disconnect(client)
@@ -0,0 +1,159 @@
+"""
+Multiplexed execution events for dashboards (/ws/events).
+
+One connection follows any number of executions. Each client has filters
+(execution ids or '*', and event types), a bounded buffer per execution and
+a frame rate (per connection: a frame carries the events of all its
+executions). Consecutive log events of an execution are merged, and when a
+client cannot keep up, only the execution whose buffer is full loses its
+oldest events (counted per execution), so a busy execution cannot starve the
+others on the same connection.
+
+Event types: status, run_started, step_started, step_finished, step_failed,
+progress, run_finished, log
+"""
+import time
+import heapq
+import asyncio
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+EVENT_TYPES = ('status', 'run_started', 'step_started', 'step_finished', 'step_failed',
+               'progress', 'run_finished', 'log')
+
+DEFAULT_RATE = 10          # Frames per second per client
+DEFAULT_BUFFER = 1000      # Events buffered per execution and client between frames
+MAX_LOG_MERGE = 64 * 1024  # Largest merged log text in one event
+
+ALL = '*'
+
+
+class EventClient:
+    """Filters, buffer and frame pacing of one connection"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, max_buffer: int = DEFAULT_BUFFER):
+        self.filters: Dict[str, Optional[Set[str]]] = {}  # execution id / '*' -> types (None: all)
+        self.buffers: Dict[str, deque] = {}  # execution id -> (sequence, event) since the last frame
+        self.dropped: Dict[str, int] = {}    # execution id -> events dropped since the last frame
+        self.max_buffer = max_buffer
+        self.min_interval = 1.0 / rate
+        self._last_frame = 0.0
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+
+    def subscribe(self, executions: List[str], types: Optional[List[str]] = None):
+        wanted = set(types) & set(EVENT_TYPES) if types else None
+        for execution_id in executions:
+            self.filters[execution_id] = wanted
+
+    def unsubscribe(self, executions: List[str]):
+        for execution_id in executions:
+            self.filters.pop(execution_id, None)
+
+    def set_rate(self, rate: float):
+        """Frames per second of the whole connection (shared by its executions)"""
+        self.min_interval = 1.0 / max(0.1, min(rate, 100.0))
+
+    def wants(self, execution_id: str, event_type: str) -> bool:
+        types = self.filters.get(execution_id, False)
+        if types is False:
+            types = self.filters.get(ALL, False)
+            if types is False:
+                return False
+        return types is None or event_type in types
+
+    def push(self, event: Dict[str, Any]):
+        execution_id = event['e']
+        events = self.buffers.get(execution_id)
+        if events is None:
+            events = self.buffers[execution_id] = deque()
+        elif event['t'] == 'log':
+            previous = events[-1][1] if events else None
+            # Merge into the execution's previous event if it is a log (keeps ordering)
+            if previous and previous['t'] == 'log' and len(previous['text']) < MAX_LOG_MERGE:
+                previous['text'] += event['text']
+                previous['offset'] = event['offset']
+                return
+
+        if len(events) >= self.max_buffer:
+            events.popleft()
+            self.dropped[execution_id] = self.dropped.get(execution_id, 0) + 1
+
+        self._sequence += 1
+        events.append((self._sequence, event))
+        self._wakeup.set()
+
+    async def next_frame(self) -> Dict[str, Any]:
+        """Wait for events, respecting the frame rate, and return them as one frame"""
+        await self._wakeup.wait()
+        delay = self._last_frame + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        # Events of all executions, in publication order
+        frame = {'events': [event for _, event in heapq.merge(*self.buffers.values(), key=lambda item: item[0])]}
+        if self.dropped:
+            frame['dropped'] = sum(self.dropped.values())
+            frame['dropped_by_execution'] = self.dropped
+        self.buffers = {}
+        self.dropped = {}
+        self._wakeup.clear()
+        self._last_frame = time.monotonic()
+        return frame
+
+
+class EventHub:
+    """Fan-out of execution events to EventClients (runs on the event loop)"""
+
+    def __init__(self):
+        self.clients: Set[EventClient] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def connect(self, rate: float = DEFAULT_RATE, max_buffer: int = DEFAULT_BUFFER) -> EventClient:
+        client = EventClient(rate, max_buffer)
+        self.clients.add(client)
+        return client
+
+    def disconnect(self, client: EventClient):
+        self.clients.discard(client)
+
+    def publish(self, execution_id: str, event_type: str, **data):
+        """Publish an event (from the event loop)"""
+        event = None
+        for client in self.clients:
+            if client.wants(execution_id, event_type):
+                if event is None:
+                    event = {'e': execution_id, 't': event_type, 'ts': round(time.time(), 3), **data}
+                # Clients may merge log events: each gets its own copy
+                client.push(dict(event))
+
+    def publish_threadsafe(self, execution_id: str, event_type: str, **data):
+        """Publish an event from a worker thread (e.g. module scheduler events)"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self.clients:
+            return
+        try:
+            loop.call_soon_threadsafe(lambda: self.publish(execution_id, event_type, **data))
+        except RuntimeError:
+            pass
+
+    # --- Sources ---------------------------------------------------------
+
+    def log_listener(self, execution_id: str, message: str, end: int):
+        """LogManager listener: log text as 'log' events"""
+        self.publish(execution_id, 'log', text=message, offset=end)
+
+    def module_listener(self, execution_id: str):
+        """GenericYamlModule listener publishing its events for an execution"""
+        def listener(event: str, data: Dict[str, Any]):
+            self.publish_threadsafe(execution_id, event, **data)
+            if event in ('step_finished', 'step_failed'):
+                self.publish_threadsafe(execution_id, 'progress',
+                                        completed=data.get('completed'), total=data.get('total'))
+        return listener
+
+
+event_hub = EventHub()
@@ -0,0 +1,82 @@
+"""
+Persistent execution registry for the API server.
+ExecutionRecorder listens to a module's execution events and records the
+run and per-step DAG state in the executions / execution_steps tables.
+"""
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from db.session import create_new_session
+from db.repositories.execution_repo import ExecutionRepository
+
+
+class ExecutionRecorder:
+    """
+    Module event listener (see GenericYamlModule.add_listener).
+    Owns a DB session: events arrive on the module's scheduler thread.
+    """
+    def __init__(self, execution_id: str):
+        self.execution_id = execution_id
+        self._session = create_new_session()
+        self._repo = ExecutionRepository(self._session)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: str, data: Dict[str, Any]):
+        with self._lock:
+            try:
+                self._record(event, data)
+            except Exception:
+                self._session.rollback()
+
+    def _record(self, event: str, data: Dict[str, Any]):
+        repo = self._repo
+        if event == 'run_started':
+            repo.set_steps(self.execution_id, data.get('steps', []))
+        elif event == 'step_started':
+            repo.update_step(self.execution_id, data['step'], status='running', started_at=datetime.utcnow())
+        elif event == 'step_finished':
+            repo.update_step(self.execution_id, data['step'], status=data.get('status', 'completed'),
+                             finished_at=datetime.utcnow(), duration=data.get('duration'),
+                             output_file=data.get('output_file'), return_code=data.get('return_code'))
+        elif event == 'step_failed':
+            repo.update_step(self.execution_id, data['step'], status='failed',
+                             finished_at=datetime.utcnow(), duration=data.get('duration'),
+                             error=data.get('error'))
+        elif event == 'run_finished':
+            repo.close_pending_steps(self.execution_id)
+
+    def close(self):
+        self._session.close()
+
+
+def step_to_dict(step) -> Dict[str, Any]:
+    return {
+        'name': step.name,
+        'status': step.status,
+        'depends_on': json.loads(step.depends_on or "[]"),
+        'started_at': step.started_at.isoformat() if step.started_at else None,
+        'finished_at': step.finished_at.isoformat() if step.finished_at else None,
+        'duration': step.duration,
+        'return_code': step.return_code,
+        'has_output': bool(step.output_file),
+        'error': step.error,
+    }
+
+
+def execution_to_dict(execution, steps: bool = False) -> Dict[str, Any]:
+    result = {
+        'execution_id': execution.execution_id,
+        'module_id': execution.module_id,
+        'module_name': execution.module_name,
+        'project_id': execution.project_id,
+        'status': execution.status,
+        'created_at': execution.created_at.isoformat() if execution.created_at else None,
+        'started_at': execution.started_at.isoformat() if execution.started_at else None,
+        'finished_at': execution.finished_at.isoformat() if execution.finished_at else None,
+        'error': execution.error,
+    }
+    if steps:
+        result['steps'] = [step_to_dict(step) for step in execution.steps]
+    return result
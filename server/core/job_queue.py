@@ -0,0 +1,193 @@
+import heapq
+import asyncio
+import itertools
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from utils.metrics import QUEUE_DEPTH, QUEUE_RUNNING
+
+# Finished jobs kept for the queue view (older ones are only in the executions table)
+FINISHED_HISTORY = 200
+
+
+class Job:
+    """One queued execution: a coroutine factory plus its scheduling state"""
+    def __init__(self, execution_id: str, factory: Callable[[], Awaitable[Any]], priority: int = 0,
+                 project_id: Optional[int] = None, seq: int = 0,
+                 on_cancel: Optional[Callable[['Job'], None]] = None):
+        self.execution_id = execution_id
+        self.factory = factory
+        self.priority = priority
+        self.project_id = project_id
+        self.seq = seq
+        self.on_cancel = on_cancel
+        self.state = "queued"  # queued, running, finished, cancelled
+        self.submitted_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def sort_key(self):
+        # Higher priority first, then submission order
+        return (-self.priority, self.seq)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'execution_id': self.execution_id,
+            'state': self.state,
+            'priority': self.priority,
+            'project_id': self.project_id,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobQueue:
+    """
+    Admission control for API executions.
+    Jobs wait in a priority queue and start when both the global and the
+    per-project concurrency limits allow it. Runs on the event loop; the
+    jobs themselves offload blocking work to threads.
+    """
+    def __init__(self, max_concurrent: int = 4, per_project: int = 2):
+        self.max_concurrent = max_concurrent
+        self.per_project = per_project
+        self._heap: List[tuple] = []
+        self._queued: Dict[str, Job] = {}
+        self._running: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()
+        self._seq = itertools.count()
+        self._accepting = True
+
+    def configure(self, max_concurrent: int = None, per_project: int = None):
+        if max_concurrent is not None:
+            self.max_concurrent = max(1, max_concurrent)
+        if per_project is not None:
+            self.per_project = max(1, per_project)
+        self._dispatch()
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    # --- Submission ----------------------------------------------------
+
+    def submit(self, execution_id: str, factory: Callable[[], Awaitable[Any]], priority: int = 0,
+               project_id: Optional[int] = None, on_cancel: Optional[Callable[[Job], None]] = None) -> Job:
+        """Queue a job (must be called from the event loop). Raises RuntimeError while draining."""
+        if not self._accepting:
+            raise RuntimeError("Server is shutting down, not accepting new executions")
+        job = Job(execution_id, factory, priority, project_id, next(self._seq), on_cancel)
+        self._queued[execution_id] = job
+        heapq.heappush(self._heap, (job.sort_key(), execution_id))
+        self._dispatch()
+        return job
+
+    def cancel(self, execution_id: str) -> bool:
+        """Cancel a queued job (running jobs are not interrupted)"""
+        job = self._queued.pop(execution_id, None)
+        if job is None:
+            return False
+        self._finish(job, "cancelled")
+        if job.on_cancel:
+            try:
+                job.on_cancel(job)
+            except Exception:
+                pass
+        return True
+
+    # --- Scheduling ----------------------------------------------------
+
+    def _project_running(self, project_id: Optional[int]) -> int:
+        return sum(1 for job in self._running.values() if job.project_id == project_id)
+
+    def _can_start(self, job: Job) -> bool:
+        if job.project_id is None:
+            return True
+        return self._project_running(job.project_id) < self.per_project
+
+    def _dispatch(self):
+        """Start queued jobs, best priority first, while slots are free"""
+        if not self._accepting:
+            return
+        deferred = []
+        while self._heap and len(self._running) < self.max_concurrent:
+            key, execution_id = heapq.heappop(self._heap)
+            job = self._queued.get(execution_id)
+            if job is None:
+                continue  # cancelled
+            if not self._can_start(job):
+                # Project at its limit: let lower-priority jobs of other projects go first
+                deferred.append((key, execution_id))
+                continue
+            self._start(job)
+        for item in deferred:
+            heapq.heappush(self._heap, item)
+
+    def _start(self, job: Job):
+        del self._queued[job.execution_id]
+        job.state = "running"
+        job.started_at = datetime.utcnow()
+        self._running[job.execution_id] = job
+        job.task = asyncio.ensure_future(self._run(job))
+
+    async def _run(self, job: Job):
+        try:
+            await job.factory()
+        except Exception:
+            pass
+        finally:
+            self._running.pop(job.execution_id, None)
+            self._finish(job, "finished")
+            self._dispatch()
+
+    def _finish(self, job: Job, state: str):
+        job.state = state
+        job.finished_at = datetime.utcnow()
+        self._finished[job.execution_id] = job
+        while len(self._finished) > FINISHED_HISTORY:
+            self._finished.popitem(last=False)
+
+    # --- Visibility ----------------------------------------------------
+
+    def get(self, execution_id: str) -> Optional[Job]:
+        return (self._queued.get(execution_id) or self._running.get(execution_id)
+                or self._finished.get(execution_id))
+
+    def position(self, execution_id: str) -> Optional[int]:
+        """0-based position of a queued job in start order (None if not queued)"""
+        if execution_id not in self._queued:
+            return None
+        ordered = sorted(self._queued.values(), key=Job.sort_key)
+        return next(i for i, job in enumerate(ordered) if job.execution_id == execution_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'per_project': self.per_project,
+            'accepting': self._accepting,
+            'queued': [job.to_dict() for job in sorted(self._queued.values(), key=Job.sort_key)],
+            'running': [job.to_dict() for job in self._running.values()],
+            'finished': [job.to_dict() for job in reversed(self._finished.values())],
+        }
+
+    # --- Shutdown ------------------------------------------------------
+
+    async def drain(self, timeout: float = 30.0, cancel_queued: bool = True):
+        """
+        Stop admitting jobs, cancel queued ones (if asked) and wait up to
+        timeout seconds for running jobs to finish.
+        """
+        self._accepting = False
+        if cancel_queued:
+            for execution_id in list(self._queued):
+                self.cancel(execution_id)
+        tasks = [job.task for job in self._running.values() if job.task]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+
+job_queue = JobQueue()
+QUEUE_DEPTH.set_function(lambda: len(job_queue._queued))
+QUEUE_RUNNING.set_function(lambda: len(job_queue._running))
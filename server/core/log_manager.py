@@ -1,39 +1,239 @@
+import os
 import asyncio
-from typing import List, Dict, Callable
-from collections import defaultdict
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from utils.paths import get_project_root
+from utils.metrics import LOG_MESSAGES, LOG_BYTES, LOG_SUBSCRIBERS, LOG_SLOW_CONSUMERS
+
+# Recent log bytes kept in memory per running execution (older ones are read from disk)
+DEFAULT_BUFFER_BYTES = 256 * 1024
+
+# Messages queued per subscriber before it is considered slow
+DEFAULT_QUEUE_SIZE = 1000
+
+# Largest chunk handed to a subscriber when catching up from disk
+READ_CHUNK = 64 * 1024
+
+
+def default_log_dir() -> str:
+    return str(get_project_root() / "logs" / "executions")
+
+
+class ExecutionLog:
+    """
+    Log of one execution: an append-only file plus a ring buffer of the
+    most recent messages. Offsets are byte offsets in the (utf-8) log file.
+    """
+    def __init__(self, path: str, buffer_bytes: int):
+        self.path = path
+        self.buffer_bytes = buffer_bytes
+        self.buffer: Deque[Tuple[int, str]] = deque()  # (start offset, message)
+        self.buffered = 0
+        self.end = os.path.getsize(path) if os.path.exists(path) else 0
+        self._file = None
+
+    @property
+    def base(self) -> int:
+        """Offset of the oldest message still in memory"""
+        return self.buffer[0][0] if self.buffer else self.end
+
+    def append(self, message: str) -> Tuple[int, int]:
+        data = message.encode('utf-8', errors='replace')
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'ab')
+        self._file.write(data)
+
+        start = self.end
+        self.end += len(data)
+        self.buffer.append((start, message))
+        self.buffered += len(data)
+        while self.buffered > self.buffer_bytes and len(self.buffer) > 1:
+            old_start, _ = self.buffer.popleft()
+            self.buffered -= self.buffer[0][0] - old_start
+        return start, self.end
+
+    def read(self, since: int = 0, max_bytes: int = READ_CHUNK) -> Tuple[str, int]:
+        """Text from offset since (at most about max_bytes) and the offset after it"""
+        since = max(0, min(since, self.end))
+        if since == self.end:
+            return "", since
+        if since >= self.base:
+            parts = []
+            size = 0
+            next_offset = since
+            for start, message in self.buffer:
+                if start < since:
+                    continue
+                if not parts and start != since:
+                    break  # cursor inside a message: read the exact bytes from the file
+                parts.append(message)
+                size += len(message)
+                next_offset = start + len(message.encode('utf-8', errors='replace'))
+                if size >= max_bytes:
+                    break
+            if parts:
+                return "".join(parts), next_offset
+
+        if self._file is not None:
+            self._file.flush()
+        return read_log_file(self.path, since, max_bytes)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.buffer.clear()
+        self.buffered = 0
+
+
+def read_log_file(path: str, since: int = 0, max_bytes: int = READ_CHUNK) -> Tuple[str, int]:
+    try:
+        with open(path, 'rb') as f:
+            f.seek(since)
+            data = f.read(max_bytes)
+    except OSError:
+        return "", since
+    return data.decode('utf-8', errors='replace'), since + len(data)
+
+
+class Subscription:
+    """
+    Bounded queue of one subscriber. When the subscriber falls behind, new
+    messages are dropped from its queue and it catches up from the log
+    (memory or disk) at its own cursor instead, so nothing is lost.
+    """
+    def __init__(self, manager: 'LogManager', execution_id: str, since: int, queue_size: int):
+        self.manager = manager
+        self.execution_id = execution_id
+        self.cursor = since
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagging = True  # starts by replaying from 'since'
+        self.finished = False
+
+    def _offer(self, end: int, message: Optional[str]):
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait((end, message))
+        except asyncio.QueueFull:
+            self.lagging = True
+            LOG_SLOW_CONSUMERS.inc()
+
+    async def get(self) -> Optional[str]:
+        """Next log text; None once the execution has finished and everything was sent"""
+        while True:
+            if not self.queue.empty() or not (self.lagging or self.finished):
+                end, message = await self.queue.get()
+                if message is None:
+                    self.finished = True
+                    self.lagging = True
+                    continue
+                self.cursor = end
+                return message
+
+            # Queue drained: catch up from the log at the cursor
+            text, next_offset = self.manager.read(self.execution_id, self.cursor)
+            if text:
+                self.cursor = next_offset
+                return text
+            if self.finished or self.manager.is_finished(self.execution_id):
+                return None
+            # Up to date again: back to live messages
+            self.lagging = False
+
 
 class LogManager:
     """
-    Simple in-memory log manager for the MVP.
-    Stores logs and manages WebSocket subscribers.
+    Execution logs for the API.
+    Each execution is written to an append-only file; only a bounded ring
+    buffer is kept in memory while it runs and it is evicted when it finishes.
+    Subscribers get bounded queues and can resume from a byte offset (cursor).
     """
-    def __init__(self):
-        self._logs: Dict[str, List[str]] = defaultdict(list)
-        self._subscribers: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+    def __init__(self, log_dir: Optional[str] = None, buffer_bytes: int = DEFAULT_BUFFER_BYTES,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.log_dir = log_dir or default_log_dir()
+        self.buffer_bytes = buffer_bytes
+        self.queue_size = queue_size
+        self._logs: Dict[str, ExecutionLog] = {}
+        self._finished = set()
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._listeners: List[Callable[[str, str, int], None]] = []
+
+    def add_listener(self, callback: Callable[[str, str, int], None]):
+        """callback(execution_id, message, end_offset) for every emitted message (on the loop)"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, str, int], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _path(self, execution_id: str) -> str:
+        safe_id = "".join(c for c in execution_id if c.isalnum() or c in '-_') or "_"
+        return os.path.join(self.log_dir, f"{safe_id}.log")
+
+    def _log(self, execution_id: str) -> ExecutionLog:
+        log = self._logs.get(execution_id)
+        if log is None:
+            log = self._logs[execution_id] = ExecutionLog(self._path(execution_id), self.buffer_bytes)
+            self._finished.discard(execution_id)
+        return log
 
     async def emit_log(self, execution_id: str, message: str):
-        """Save log and push to subscribers"""
-        self._logs[execution_id].append(message)
-        
-        # Notify subscribers
-        if execution_id in self._subscribers:
-            for queue in self._subscribers[execution_id]:
-                await queue.put(message)
-
-    async def subscribe(self, execution_id: str) -> asyncio.Queue:
-        """Subscribe to logs for an execution ID"""
-        queue = asyncio.Queue()
-        self._subscribers[execution_id].append(queue)
-        
-        # Replay existing logs
-        for log in self._logs[execution_id]:
-            await queue.put(log)
-            
-        return queue
-
-    def unsubscribe(self, execution_id: str, queue: asyncio.Queue):
-        if execution_id in self._subscribers:
-            if queue in self._subscribers[execution_id]:
-                self._subscribers[execution_id].remove(queue)
+        """Append a log message and push it to subscribers (never blocks on slow ones)"""
+        if not message:
+            return
+        start, end = self._log(execution_id).append(message)
+        LOG_MESSAGES.inc()
+        LOG_BYTES.inc(end - start)
+        for subscription in self._subscribers.get(execution_id, ()):
+            subscription._offer(end, message)
+        for callback in self._listeners:
+            try:
+                callback(execution_id, message, end)
+            except Exception:
+                pass
+
+    def read(self, execution_id: str, since: int = 0, max_bytes: int = READ_CHUNK) -> Tuple[str, int]:
+        """Log text from a byte offset (memory if recent, else the log file)"""
+        log = self._logs.get(execution_id)
+        if log is not None:
+            return log.read(since, max_bytes)
+        return read_log_file(self._path(execution_id), since, max_bytes)
+
+    def offset(self, execution_id: str) -> int:
+        """Current end offset of an execution's log"""
+        log = self._logs.get(execution_id)
+        if log is not None:
+            return log.end
+        path = self._path(execution_id)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def is_finished(self, execution_id: str) -> bool:
+        return execution_id in self._finished
+
+    def finish(self, execution_id: str):
+        """Mark an execution as finished: close its file and evict its buffer"""
+        log = self._logs.pop(execution_id, None)
+        if log is not None:
+            log.close()
+        self._finished.add(execution_id)
+        for subscription in self._subscribers.get(execution_id, ()):
+            subscription._offer(0, None)
+
+    async def subscribe(self, execution_id: str, since: int = 0) -> Subscription:
+        """Subscribe to logs for an execution ID, replaying from offset 'since'"""
+        subscription = Subscription(self, execution_id, since, self.queue_size)
+        self._subscribers.setdefault(execution_id, []).append(subscription)
+        LOG_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, execution_id: str, subscription: Subscription):
+        subscribers = self._subscribers.get(execution_id)
+        if subscribers and subscription in subscribers:
+            subscribers.remove(subscription)
+            LOG_SUBSCRIBERS.dec()
+            if not subscribers:
+                del self._subscribers[execution_id]
 
 log_manager = LogManager()
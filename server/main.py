@@ -1,30 +1,55 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
 import asyncio
 from contextlib import asynccontextmanager
 
-from server.api import workflow
+from core.context import Context
+from server.api import workflow, files, executions
 from server.core.log_manager import log_manager
+from server.core.job_queue import job_queue
+from server.core.event_hub import event_hub
 from utils.output_formatter import stdout_stream
+from utils.metrics import registry
 
 # Log Listener Bridge
+# Called on the stdout flusher thread with coalesced batches of lines;
+# hands them to the event loop captured at startup (worker-thread safe)
+_loop: asyncio.AbstractEventLoop = None
+
 def log_bridge(text: str):
+    loop = _loop
+    if loop is None or loop.is_closed():
+        return
     try:
-        # Get running loop (or try to)
-        loop = asyncio.get_running_loop()
-        if loop.is_running():
-            asyncio.create_task(log_manager.emit_log("system", text))
+        loop.call_soon_threadsafe(_emit_system_log, text)
     except RuntimeError:
+        # Loop closed during shutdown
         pass
 
+def _emit_system_log(text: str):
+    asyncio.ensure_future(log_manager.emit_log("system", text))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    # One application context (config, module registry, DB engine) for every run;
+    # executions work on lightweight views of it (Context.fork)
+    global _loop
+    app.state.context = await asyncio.to_thread(Context)
+    server_config = app.state.context.config.server
+    job_queue.configure(server_config.max_concurrent_runs, server_config.max_runs_per_project)
+    _loop = asyncio.get_running_loop()
+    event_hub.attach(_loop)
+    log_manager.add_listener(event_hub.log_listener)
     stdout_stream.add_listener(log_bridge)
     yield
-    # Shutdown
+    # Shutdown: cancel queued executions, let running ones finish
+    await job_queue.drain(timeout=server_config.shutdown_timeout)
     stdout_stream.remove_listener(log_bridge)
+    log_manager.remove_listener(event_hub.log_listener)
+    _loop = None
 
 # Initialize API
 app = FastAPI(
@@ -45,6 +70,13 @@ app.add_middleware(
 
 # Routers
 app.include_router(workflow.router, prefix="/api", tags=["Workflow"])
+app.include_router(files.router, prefix="/api", tags=["Files"])
+app.include_router(executions.router, prefix="/api", tags=["Executions"])
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics (text exposition format)"""
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():
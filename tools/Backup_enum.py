@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 
-import requests
 import argparse
+import asyncio
+import hashlib
+import math
+import os
+import secrets
 import sys
 import json
-import time
-import urllib3
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from http_engine import HttpEngine, HttpError, bounded_map
+
 # Try importing rich for beautiful output
 try:
     from rich.console import Console
@@ -20,15 +24,8 @@ except ImportError:
     sys.exit(1)
 
 # --- Configuration ---
-# Suppress SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
 console = Console()
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
-}
-
 def banner():
     text = """
     [bold cyan]╔21:00╗[/bold cyan] [bold white]BACKUP ARTIFACT HUNTER[/bold white]
@@ -92,12 +89,176 @@ def generate_wordlist(subdomains, mode):
     
     return local_map
 
-def check_target(target_data):
+def base_url_of(sub):
+    base_url = f"http://{sub}" if not sub.startswith('http') else sub
+    return base_url.rstrip('/')
+
+def iter_urls(subs, wordlist_map, exts):
+    """
+    Lazily yields (sub, ext, url) to check, one host after the other in turn
+    (spreads the load over hosts so per-host connection pools stay busy).
+    """
+    def host_urls(sub):
+        base_url = base_url_of(sub)
+        for stem in wordlist_map.get(sub, []):
+            for ext in exts:
+                yield sub, ext, f"{base_url}/{stem}{ext}"
+
+    hosts = [host_urls(sub) for sub in subs]
+    while hosts:
+        remaining = []
+        for urls in hosts:
+            item = next(urls, None)
+            if item is not None:
+                yield item
+                remaining.append(urls)
+        hosts = remaining
+
+# --- Soft-404 / wildcard calibration ---
+
+def is_hit(status, length):
+    """200/401/403 count as found (200 only with a body)"""
+    return status in (200, 401, 403) and not (status == 200 and length == 0)
+
+def response_length(resp):
+    return int(resp.headers.get('content-length', 0) or 0)
+
+def length_bucket(length):
+    """Log-scale size bucket (~9% wide), so pages echoing the path still match"""
+    return round(math.log2(length + 1) * 8)
+
+def redirect_target(resp, name):
+    """Final URL of a redirected request, with the requested file name as a placeholder"""
+    return resp.url.replace(name, '{name}') if resp.history else ''
+
+def body_hash(body, name):
+    """Hash of a body with the requested file name blanked out"""
+    return hashlib.sha1(body.replace(name.encode(), b'')).hexdigest()
+
+class HostProfile:
+    """
+    Calibration result of one host: per extension, the fingerprint of its
+    answers to random non-existent paths (status, length buckets, redirect
+    target, body hash), or the reason to skip the host.
+    """
+
+    def __init__(self, sub):
+        self.sub = sub
+        self.skip = None
+        self.wildcards = {}
+
+    def wildcard_match(self, ext, status, length, location):
+        wildcard = self.wildcards.get(ext)
+        if wildcard is None or status != wildcard["status"] or location != wildcard["location"]:
+            return False
+        bucket = length_bucket(length)
+        return any(abs(bucket - known) <= 1 for known in wildcard["buckets"])
+
+async def fetch_head(engine, url):
+    """HEAD the URL (GET without reading the body on 405)."""
+    # HEAD request first for speed
+    resp = await engine.request('HEAD', url, follow_redirects=True)
+
+    # 405 Method Not Allowed? Try GET
+    if resp.status == 405:
+        resp = await engine.request('GET', url, read_body=False, follow_redirects=True)
+    return resp
+
+async def send_probe(engine, item):
+    """One calibration request: item = (sub, ext, name, method)"""
+    sub, ext, name, method = item
+    url = f"{base_url_of(sub)}/{name}"
+    if method == 'GET':
+        return await engine.request('GET', url, follow_redirects=True)
+    return await fetch_head(engine, url)
+
+async def calibrate(engine, subs, exts, args, progress):
+    """
+    Fingerprints every host's answers to random non-existent paths, in rounds
+    sharing the scan's request window:
+    1. one probe per extension (a host answering none of them is skipped),
+    2. args.calibrate - 1 more probes for the extensions whose probe was a hit,
+    3. a GET of every hit probe, for the body hash.
+    Returns {sub: HostProfile}.
+    """
+    profiles = {sub: HostProfile(sub) for sub in subs}
+    replies = {}  # (sub, ext) -> [(name, response)]
+    total = len(profiles) * len(exts)
+    task_id = progress.add_task("[cyan]Calibrating...", total=total)
+
+    async def run_round(items):
+        async for (sub, ext, name, _), resp in bounded_map(lambda item: send_probe(engine, item), items, args.threads):
+            progress.advance(task_id)
+            if not isinstance(resp, Exception):
+                yield sub, ext, name, resp
+
+    def add_round(items):
+        nonlocal total
+        total += len(items)
+        progress.update(task_id, total=total)
+        return items
+
+    # 1. One probe per extension, host after host in turn
+    first = ((sub, ext, f"{secrets.token_hex(8)}{ext}", 'HEAD') for ext in exts for sub in profiles)
+    async for sub, ext, name, resp in run_round(first):
+        replies[(sub, ext)] = [(name, resp)]
+    for sub, profile in profiles.items():
+        if not any((sub, ext) in replies for ext in exts):
+            profile.skip = "no answer to calibration requests"
+
+    def hit_extensions():
+        for (sub, ext), answers in replies.items():
+            if not profiles[sub].skip and any(is_hit(resp.status, response_length(resp)) for _, resp in answers):
+                yield sub, ext
+
+    # 2. More probes where the first one looked like a file
+    extra = []
+    for sub, ext in list(hit_extensions()):
+        if args.wildcard == "skip":
+            profiles[sub].skip = f"wildcard answers to random {ext} paths"
+            continue
+        extra += [(sub, ext, f"{secrets.token_hex(8)}{ext}", 'HEAD') for _ in range(args.calibrate - 1)]
+    async for sub, ext, name, resp in run_round(add_round(extra)):
+        replies[(sub, ext)].append((name, resp))
+
+    hits = {}
+    for sub, ext in list(hit_extensions()):
+        answers = replies[(sub, ext)]
+        ext_hits = [(name, resp) for name, resp in answers if is_hit(resp.status, response_length(resp))]
+        if len(ext_hits) < len(answers) or len({(resp.status, redirect_target(resp, name)) for name, resp in ext_hits}) > 1:
+            # Random paths answered differently: nothing to filter against
+            profiles[sub].skip = f"inconsistent answers to random {ext} paths"
+            continue
+        hits[(sub, ext)] = ext_hits
+
+    # 3. Body hashes of the wildcard answers
+    hashes = {}
+    pages = [(sub, ext, name, 'GET') for (sub, ext), ext_hits in hits.items()
+             if not profiles[sub].skip for name, _ in ext_hits]
+    async for sub, ext, name, page in run_round(add_round(pages)):
+        hashes.setdefault((sub, ext), []).append(body_hash(page.body, name))
+
+    for (sub, ext), ext_hits in hits.items():
+        profile = profiles[sub]
+        if profile.skip:
+            continue
+        known = hashes.get((sub, ext), [])
+        name, resp = ext_hits[0]
+        profile.wildcards[ext] = {
+            "status": resp.status,
+            "location": redirect_target(resp, name),
+            "buckets": {length_bucket(response_length(resp)) for _, resp in ext_hits},
+            # Only a body that is identical for every probe can tell real files apart
+            "hash": known[0] if len(known) == len(ext_hits) and len(set(known)) == 1 else None,
+        }
+    return profiles
+
+async def check_target(engine, item, profiles):
     """
-    Worker function.
-    target_data = (url, proxy_config)
+    Worker coroutine: checks one URL. Hits that match the host's wildcard
+    fingerprint are flagged "wildcard" instead of "found".
     """
-    url, proxies = target_data
+    sub, ext, url = item
     result = {
         "url": url,
         "status": 0,
@@ -106,36 +267,88 @@ def check_target(target_data):
     }
 
     try:
-        # HEAD request first for speed
-        resp = requests.head(url, headers=HEADERS, proxies=proxies, verify=False, timeout=5, allow_redirects=True)
-        
-        # 405 Method Not Allowed? Try GET
-        if resp.status_code == 405:
-             resp = requests.get(url, headers=HEADERS, proxies=proxies, verify=False, stream=True, timeout=5)
-             resp.close()
-
-        result["status"] = resp.status_code
-        result["length"] = int(resp.headers.get('content-length', 0))
-
-        if resp.status_code in [200, 401, 403]:
-            # Simple filter: Ignore 200 OK if content-length is 0
-            if resp.status_code == 200 and result["length"] == 0:
-                pass
-            else:
-                result["found"] = True
-
-    except Exception:
+        resp = await fetch_head(engine, url)
+
+        result["status"] = resp.status
+        result["length"] = response_length(resp)
+
+        if is_hit(resp.status, result["length"]):
+            result["found"] = True
+
+            name = url.rsplit('/', 1)[1]
+            profile = profiles.get(sub)
+            if profile and profile.wildcard_match(ext, resp.status, result["length"], redirect_target(resp, name)):
+                known_hash = profile.wildcards[ext]["hash"]
+                if known_hash is None:
+                    result["found"] = False
+                else:
+                    page = await engine.request('GET', url, follow_redirects=True)
+                    result["found"] = body_hash(page.body, name) != known_hash
+                if not result["found"]:
+                    result["wildcard"] = True
+
+    except (HttpError, ValueError):
         pass
 
     return result
 
+async def scan(subs, wordlist_map, exts, args, progress, json_file, counts):
+    """
+    Calibrates every host, then checks the URLs of the remaining hosts with at
+    most args.threads requests in flight (findings counted in counts).
+    """
+    async with HttpEngine(concurrency=args.threads, per_host=args.per_host or args.threads, timeout=5,
+                          proxy=args.proxy, verify=False) as engine:
+        profiles = {}
+        if args.calibrate > 0:
+            profiles = await calibrate(engine, subs, exts, args, progress)
+            for sub, profile in profiles.items():
+                if profile.skip:
+                    counts["skipped"] += 1
+                    console.print(f"[dim][-] Skipping {sub}: {profile.skip}[/dim]")
+                elif profile.wildcards:
+                    console.print(f"[dim][~] {sub}: filtering wildcard answers for {', '.join(profile.wildcards)}[/dim]")
+
+        subs = [sub for sub in subs if not (sub in profiles and profiles[sub].skip)]
+        total = sum(len(wordlist_map.get(sub, [])) for sub in subs) * len(exts)
+        if counts["skipped"]:
+            console.print(f"[blue][*] {counts['skipped']} hosts skipped, {total} URLs left to check.[/blue]")
+
+        task_id = progress.add_task("[cyan]Scanning...", total=total)
+        check = lambda item: check_target(engine, item, profiles)
+        async for _, result in bounded_map(check, iter_urls(subs, wordlist_map, exts), args.threads):
+            progress.advance(task_id)
+
+            if result.get("wildcard"):
+                counts["filtered"] += 1
+
+            elif result["found"]:
+                counts["found"] += 1
+
+                # Color coding based on status
+                color = "green"
+                if result["status"] == 401: color = "yellow"
+                if result["status"] == 403: color = "magenta"
+
+                # Print finding to console
+                console.print(f"[{color}][{result['status']}] found: {result['url']} (Size: {result['length']})[/{color}]")
+
+                # Save to JSON if requested
+                if json_file:
+                    json.dump(result, json_file)
+                    json_file.write('\n')
+                    json_file.flush()
+
 def main():
     parser = argparse.ArgumentParser(description="Backup File Hunter")
     parser.add_argument("-f", "--file", required=True, help="List of subdomains")
     parser.add_argument("-x", "--extensions", required=True, help="List of extensions")
     parser.add_argument("-m", "--mode", type=int, choices=[1, 2, 3], default=1, help="1=Normal, 2=Aggressive, 3=All Combinations")
     parser.add_argument("-p", "--proxy", help="Proxy URL (http://127.0.0.1:8080)")
-    parser.add_argument("-t", "--threads", type=int, default=20, help="Threads")
+    parser.add_argument("-t", "--threads", type=int, default=20, help="Concurrent requests")
+    parser.add_argument("--per-host", type=int, help="Max connections per host (default: --threads)")
+    parser.add_argument("--calibrate", type=int, default=3, help="Random paths probed per extension and host to detect soft-404/wildcard answers (1 unless the first is a hit; 0 = off)")
+    parser.add_argument("--wildcard", choices=["filter", "skip"], default="filter", help="Hosts with wildcard answers: filter matching hits or skip the host")
     parser.add_argument("--json", help="Output file for JSONL format (e.g., output.jsonl)")
     
     args = parser.parse_args()
@@ -153,33 +366,20 @@ def main():
         sys.exit(1)
 
     # 2. Prepare Proxy
-    proxies = {"http": args.proxy, "https": args.proxy} if args.proxy else None
-    if proxies:
+    if args.proxy:
         console.print(f"[yellow][*] Proxy Enabled:[/yellow] {args.proxy}")
 
     # 3. Generate Tasks based on Mode
     console.print(f"[blue][*] analyzing {len(subs)} domains in Mode {args.mode}...[/blue]")
     
     wordlist_map = generate_wordlist(subs, args.mode)
-    tasks = []
-
-    for sub in subs:
-        base_url = f"http://{sub}" if not sub.startswith('http') else sub
-        base_url = base_url.rstrip('/')
-        
-        # Get the specific list of words for this domain based on the map
-        stems = wordlist_map.get(sub, [])
-        
-        for stem in stems:
-            for ext in exts:
-                full_url = f"{base_url}/{stem}{ext}"
-                tasks.append((full_url, proxies))
+    total = sum(len(wordlist_map.get(sub, [])) for sub in subs) * len(exts)
 
-    console.print(f"[bold green][+] Generated {len(tasks)} URLs to check.[/bold green]")
+    console.print(f"[bold green][+] Generated {total} URLs to check.[/bold green]")
     console.print("-" * 50)
 
     # 4. Execute with Progress Bar
-    found_count = 0
+    counts = {"found": 0, "filtered": 0, "skipped": 0}
     json_file = None
     
     if args.json:
@@ -195,32 +395,7 @@ def main():
             console=console
         ) as progress:
             
-            task_id = progress.add_task("[cyan]Scanning...", total=len(tasks))
-            
-            with ThreadPoolExecutor(max_workers=args.threads) as executor:
-                # Submit all tasks
-                futures = {executor.submit(check_target, t): t for t in tasks}
-                
-                for future in as_completed(futures):
-                    result = future.result()
-                    progress.advance(task_id)
-                    
-                    if result["found"]:
-                        found_count += 1
-                        
-                        # Color coding based on status
-                        color = "green"
-                        if result["status"] == 401: color = "yellow"
-                        if result["status"] == 403: color = "magenta"
-                        
-                        # Print finding to console
-                        console.print(f"[{color}][{result['status']}] found: {result['url']} (Size: {result['length']})[/{color}]")
-                        
-                        # Save to JSON if requested
-                        if json_file:
-                            json.dump(result, json_file)
-                            json_file.write('\n')
-                            json_file.flush()
+            asyncio.run(scan(subs, wordlist_map, exts, args, progress, json_file, counts))
 
     except KeyboardInterrupt:
         console.print("\n[bold red][!] Scan interrupted by user.[/bold red]")
@@ -229,7 +404,9 @@ def main():
             json_file.close()
 
     console.print("-" * 50)
-    console.print(f"[bold white]Scan Finished. Found {found_count} files.[/bold white]")
+    console.print(f"[bold white]Scan Finished. Found {counts['found']} files.[/bold white]")
+    if counts["filtered"] or counts["skipped"]:
+        console.print(f"[dim]Wildcard hits filtered: {counts['filtered']}, hosts skipped: {counts['skipped']}[/dim]")
     if args.json:
         console.print(f"[dim]JSONL results saved to: {args.json}[/dim]")
 
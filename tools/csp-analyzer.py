@@ -6,13 +6,16 @@ Analyzes CSP headers with deep security insights and multiple output formats
 Author: Enhanced by Claude (Original by @gwendallecoguic)
 """
 
+import os
 import sys
 import json
-import requests
 import urllib.parse
 from typing import Dict, List, Tuple
 import tldextract
 
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from http_engine import fetch
+
 # Optional rich library for beautiful tables
 try:
     from rich.console import Console
@@ -263,20 +266,18 @@ class CSPAnalyzer:
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:105.0) Gecko/20100101 Firefox/105.0"
             }
 
-            response = requests.get(
-                self.url,
-                cookies=self.cookies,
-                allow_redirects=False,
-                headers=headers,
-                timeout=10,
-            )
+            cookie = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            if cookie:
+                headers["Cookie"] = cookie
+
+            response = fetch("GET", self.url, headers=headers, read_body=False, timeout=10)
 
-            if "Content-Security-Policy" in response.headers:
-                self.csp_header = response.headers["Content-Security-Policy"]
+            if "content-security-policy" in response.headers:
+                self.csp_header = response.headers["content-security-policy"]
                 return True
-            elif "Content-Security-Policy-Report-Only" in response.headers:
+            elif "content-security-policy-report-only" in response.headers:
                 self.csp_header = response.headers[
-                    "Content-Security-Policy-Report-Only"
+                    "content-security-policy-report-only"
                 ]
                 self.findings.append(
                     {
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Shared asyncio HTTP/1.1 client for the Python tools (standard library only).
+
+- Keep-alive connection pool per (scheme, host, port), with a per-host
+  connection limit and a global in-flight limit
+- DNS cache (positive and negative answers, concurrent lookups coalesced)
+- HTTP proxies: absolute-form requests for http://, CONNECT tunnels for https://
+- bounded_map(): bounded in-flight window fed from a lazy iterable, so
+  millions of URLs never become millions of pending tasks
+
+    async with HttpEngine(concurrency=50, per_host=6, verify=False) as engine:
+        async for url, response in bounded_map(lambda u: engine.request('HEAD', u), urls, 50):
+            ...
+
+For a single request from synchronous code: fetch('GET', url).
+"""
+import asyncio
+import base64
+import socket
+import ssl
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/91.0.4472.114 Safari/537.36',
+    'Accept': '*/*',
+}
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+DRAIN_LIMIT = 64 * 1024      # Unread bodies up to this size are drained to keep the connection
+DNS_NEGATIVE_TTL = 30.0      # Seconds a failed lookup is remembered
+
+
+class HttpError(Exception):
+    """Request failed (connection, TLS, protocol or timeout error)"""
+
+
+class _StaleConnection(Exception):
+    """A pooled connection was closed by the server before answering"""
+
+
+class Response:
+    __slots__ = ('url', 'status', 'reason', 'headers', 'body', 'elapsed', 'history', 'truncated')
+
+    def __init__(self, url: str, status: int, reason: str, headers: Dict[str, str], body: bytes,
+                 elapsed: float, history: Optional[List[str]] = None, truncated: bool = False):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers  # Lower-cased names
+        self.body = body
+        self.elapsed = elapsed
+        self.history = history or []
+        self.truncated = truncated
+
+    @property
+    def length(self) -> int:
+        """Content-Length header, or the size of the body read"""
+        try:
+            return int(self.headers.get('content-length', ''))
+        except ValueError:
+            return len(self.body)
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        return self.body.decode(encoding, errors='replace')
+
+    def __repr__(self):
+        return f"<Response [{self.status}] {self.url}>"
+
+
+class _Connection:
+    __slots__ = ('reader', 'writer', 'requests')
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+
+    def usable(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class HttpEngine:
+    """Pooled asyncio HTTP/1.1 client (one per event loop)"""
+
+    def __init__(self, concurrency: int = 50, per_host: int = 6, timeout: float = 10.0,
+                 proxy: Optional[str] = None, verify: bool = True, headers: Optional[Dict[str, str]] = None,
+                 dns_ttl: float = 300.0, max_body: int = 1024 * 1024):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.verify = verify
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.dns_ttl = dns_ttl
+        self.max_body = max_body
+        self.proxy = urlsplit(proxy) if proxy else None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._host_slots: Dict[tuple, asyncio.Semaphore] = {}
+        self._idle: Dict[tuple, List[_Connection]] = {}
+        self._dns: Dict[str, Tuple[float, Any]] = {}  # host -> (expires, address or exception)
+        self._dns_pending: Dict[str, asyncio.Future] = {}
+        self._ssl: Optional[ssl.SSLContext] = None
+        self.stats = {'requests': 0, 'connections': 0, 'reused': 0, 'dns_lookups': 0, 'errors': 0}
+
+    async def __aenter__(self) -> 'HttpEngine':
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+    # --- Connections ---------------------------------------------------------
+
+    def _ssl_context(self) -> ssl.SSLContext:
+        if self._ssl is None:
+            context = ssl.create_default_context()
+            if not self.verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            context.set_alpn_protocols(['http/1.1'])
+            self._ssl = context
+        return self._ssl
+
+    async def resolve(self, host: str, port: int) -> str:
+        """Address of a host, cached for dns_ttl seconds (failures for DNS_NEGATIVE_TTL)"""
+        cached = self._dns.get(host)
+        if cached and cached[0] > time.monotonic():
+            if isinstance(cached[1], Exception):
+                raise cached[1]
+            return cached[1]
+
+        pending = self._dns_pending.get(host)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._dns_pending[host] = future
+        self.stats['dns_lookups'] += 1
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            address = infos[0][4][0]
+            self._dns[host] = (time.monotonic() + self.dns_ttl, address)
+            future.set_result(address)
+            return address
+        except (OSError, IndexError) as e:
+            error = HttpError(f"DNS lookup failed for {host}: {e}")
+            self._dns[host] = (time.monotonic() + DNS_NEGATIVE_TTL, error)
+            future.set_exception(error)
+            future.exception()  # Mark retrieved when nobody else waits
+            raise error
+        finally:
+            del self._dns_pending[host]
+
+    async def _open(self, scheme: str, host: str, port: int) -> _Connection:
+        context = self._ssl_context() if scheme == 'https' else None
+        if self.proxy is None:
+            address = await self.resolve(host, port)
+            reader, writer = await asyncio.open_connection(
+                address, port, ssl=context, server_hostname=host if context else None)
+            self.stats['connections'] += 1
+            return _Connection(reader, writer)
+
+        proxy_port = self.proxy.port or (443 if self.proxy.scheme == 'https' else 8080)
+        address = await self.resolve(self.proxy.hostname, proxy_port)
+        reader, writer = await asyncio.open_connection(address, proxy_port)
+        connection = _Connection(reader, writer)
+        self.stats['connections'] += 1
+        if context is not None:
+            # CONNECT tunnel, then TLS with the target inside it
+            request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            for name, value in self._proxy_headers().items():
+                request += f"{name}: {value}\r\n"
+            writer.write((request + "\r\n").encode('latin-1'))
+            await writer.drain()
+            status, reason, _ = await self._read_head(connection)
+            if status != 200:
+                connection.close()
+                raise HttpError(f"Proxy CONNECT to {host}:{port} failed: {status} {reason}")
+            if not hasattr(writer, 'start_tls'):
+                connection.close()
+                raise HttpError("HTTPS through a proxy needs Python 3.11+")
+            await writer.start_tls(context, server_hostname=host)
+        return connection
+
+    def _proxy_headers(self) -> Dict[str, str]:
+        if self.proxy is None or not self.proxy.username:
+            return {}
+        credentials = f"{self.proxy.username}:{self.proxy.password or ''}".encode()
+        return {'Proxy-Authorization': 'Basic ' + base64.b64encode(credentials).decode()}
+
+    async def _acquire(self, key: tuple) -> Tuple[_Connection, bool]:
+        """Idle connection of a host (reused=True) or a new one"""
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            if connection.usable():
+                self.stats['reused'] += 1
+                return connection, True
+            connection.close()
+        return await self._open(*key), False
+
+    def _release(self, key: tuple, connection: _Connection, reusable: bool):
+        if reusable and connection.usable():
+            self._idle.setdefault(key, []).append(connection)
+        else:
+            connection.close()
+
+    # --- Requests ------------------------------------------------------------
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: Optional[bytes] = None, read_body: bool = True,
+                      follow_redirects: bool = False, max_redirects: int = 5) -> Response:
+        """
+        Send a request. read_body=False skips the body (small ones are drained
+        to keep the connection). Raises HttpError on failure.
+        """
+        history = []
+        started = time.perf_counter()
+        while True:
+            response = await self._request_once(method, url, headers, body, read_body)
+            location = response.headers.get('location')
+            if not (follow_redirects and location and response.status in REDIRECT_STATUSES):
+                break
+            if len(history) >= max_redirects:
+                break
+            history.append(url)
+            url = urljoin(url, location)
+            if response.status == 303 or (response.status in (301, 302) and method == 'POST'):
+                method, body = 'GET', None
+        response.history = history
+        response.elapsed = time.perf_counter() - started
+        return response
+
+    async def _request_once(self, method, url, headers, body, read_body) -> Response:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https') or not parts.hostname:
+            raise HttpError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname.lower(), port)
+
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        if self.proxy is not None and scheme == 'http':
+            target = f"http://{parts.netloc}{target}"
+
+        request_headers = dict(self.headers)
+        request_headers['Host'] = parts.netloc.rpartition('@')[2]
+        if headers:
+            request_headers.update(headers)
+        if body is not None:
+            request_headers['Content-Length'] = str(len(body))
+        if self.proxy is not None and scheme == 'http':
+            request_headers.update(self._proxy_headers())
+        head = f"{method} {target} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()) + "\r\n"
+        payload = head.encode('latin-1') + (body or b"")
+
+        slots = self._host_slots.get(key)
+        if slots is None:
+            slots = self._host_slots[key] = asyncio.Semaphore(self.per_host)
+
+        self.stats['requests'] += 1
+        # Host slot first: requests queued on a busy host must not hold global slots
+        async with slots, self._semaphore:
+            for attempt in range(2):
+                connection = None
+                try:
+                    connection, reused = await asyncio.wait_for(self._acquire(key), self.timeout)
+                    response, reusable = await asyncio.wait_for(
+                        self._exchange(connection, payload, method, url, read_body, reused), self.timeout)
+                    self._release(key, connection, reusable)
+                    return response
+                except _StaleConnection:
+                    connection.close()
+                    continue  # Server closed an idle connection: retry on a new one
+                except asyncio.TimeoutError:
+                    if connection:
+                        connection.close()
+                    self.stats['errors'] += 1
+                    raise HttpError(f"Timeout after {self.timeout}s: {url}")
+                except HttpError:
+                    if connection:
+                        connection.close()
+                    self.stats['errors'] += 1
+                    raise
+                except (OSError, ssl.SSLError, asyncio.IncompleteReadError, ValueError) as e:
+                    if connection:
+                        connection.close()
+                    self.stats['errors'] += 1
+                    raise HttpError(f"{type(e).__name__}: {e} ({url})") from e
+            self.stats['errors'] += 1
+            raise HttpError(f"Connection closed by server: {url}")
+
+    async def _exchange(self, connection: _Connection, payload: bytes, method: str, url: str,
+                        read_body: bool, reused: bool) -> Tuple[Response, bool]:
+        connection.writer.write(payload)
+        await connection.writer.drain()
+        connection.requests += 1
+        try:
+            status, reason, headers = await self._read_head(connection)
+        except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+            if reused:
+                raise _StaleConnection()
+            raise
+        if status == 0:
+            if reused:
+                raise _StaleConnection()
+            raise HttpError(f"Empty response: {url}")
+
+        reusable = headers.get('connection', '').lower() != 'close'
+        body, truncated = b"", False
+        no_body = method == 'HEAD' or status in (204, 304) or 100 <= status < 200
+        if not no_body:
+            body, truncated, complete = await self._read_body(connection, headers, read_body)
+            reusable = reusable and complete
+        return Response(url, status, reason, headers, body, 0.0, truncated=truncated), reusable
+
+    async def _read_head(self, connection: _Connection) -> Tuple[int, str, Dict[str, str]]:
+        """Status line and headers (1xx interim responses are skipped). Status 0: connection closed."""
+        reader = connection.reader
+        while True:
+            line = await reader.readline()
+            if not line:
+                return 0, "", {}
+            version, _, rest = line.decode('latin-1').strip().partition(' ')
+            if not version.startswith('HTTP/'):
+                raise HttpError(f"Invalid status line: {line[:100]!r}")
+            code, _, reason = rest.partition(' ')
+            status = int(code)
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name = name.strip().lower()
+                value = value.strip()
+                headers[name] = f"{headers[name]}, {value}" if name in headers else value
+            if version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive':
+                headers['connection'] = 'close'
+            if 100 <= status < 200 and status != 101:
+                continue
+            return status, reason, headers
+
+    async def _read_body(self, connection: _Connection, headers: Dict[str, str],
+                         read_body: bool) -> Tuple[bytes, bool, bool]:
+        """(body, truncated, connection left at a message boundary)"""
+        reader = connection.reader
+        limit = self.max_body if read_body else DRAIN_LIMIT
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks, size = [], 0
+            while True:
+                line = await reader.readline()
+                chunk_size = int(line.split(b';', 1)[0].strip() or b'0', 16)
+                if chunk_size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass  # Trailers
+                    break
+                if size + chunk_size > limit:
+                    return (b"".join(chunks) if read_body else b""), True, False
+                chunks.append(await reader.readexactly(chunk_size))
+                size += chunk_size
+                await reader.readexactly(2)
+            return (b"".join(chunks) if read_body else b""), False, True
+
+        length = headers.get('content-length')
+        if length is not None:
+            length = int(length)
+            if length > limit:
+                partial = await reader.readexactly(self.max_body) if read_body else b""
+                return partial, True, False
+            data = await reader.readexactly(length)
+            return (data if read_body else b""), False, True
+
+        # No length: the body ends when the server closes the connection
+        if not read_body:
+            return b"", False, False
+        data = await reader.read(self.max_body)
+        return data, not reader.at_eof(), False
+
+
+async def bounded_map(fn: Callable[[Any], Awaitable[Any]], items: Iterable[Any],
+                      limit: int = 50) -> AsyncIterator[Tuple[Any, Any]]:
+    """
+    Run fn(item) for items pulled lazily from an iterable, with at most
+    `limit` in flight. Yields (item, result or exception) as they complete.
+    """
+    iterator = iter(items)
+    pending: Dict[asyncio.Task, Any] = {}
+
+    def refill():
+        while len(pending) < limit:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            pending[asyncio.ensure_future(fn(item))] = item
+
+    refill()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = pending.pop(task)
+                error = task.exception()
+                yield item, error if error is not None else task.result()
+            refill()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def fetch(method: str, url: str, **kwargs) -> Response:
+    """One request from synchronous code (engine options and request options as keywords)"""
+    engine_options = {name: kwargs.pop(name) for name in
+                      ('timeout', 'proxy', 'verify', 'max_body') if name in kwargs}
+
+    async def run():
+        async with HttpEngine(concurrency=1, per_host=1, **engine_options) as engine:
+            return await engine.request(method, url, **kwargs)
+
+    return asyncio.run(run())
@@ -0,0 +1,211 @@
+"""
+Aggregations over JSON records (bstats / stats API).
+
+Records are streamed once into a compact column store holding only the
+fields an aggregation needs:
+- value columns: dictionary-encoded (interned values + array of codes),
+  list values are exploded so 'top tech' counts every technology
+- numeric columns: array('d') with NaN for missing / non-numeric values
+"""
+import math
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from utils.query import field_getter
+
+AGGREGATES = ('count', 'sum', 'min', 'max', 'avg')
+
+_NAN = float('nan')
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _key(value: Any) -> str:
+    """Display/grouping key of a scalar value"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class DictColumn:
+    """(row, code) pairs of a field; values interned in a dictionary"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.lookup: Dict[str, int] = {}
+        self.rows = array('I')
+        self.codes = array('I')
+
+    def add(self, row: int, value: Any):
+        items = value if isinstance(value, list) else (value,)
+        for item in items:
+            if item is None or isinstance(item, (dict, list)):
+                continue
+            key = _key(item)
+            code = self.lookup.get(key)
+            if code is None:
+                code = self.lookup[key] = len(self.values)
+                self.values.append(key)
+            self.rows.append(row)
+            self.codes.append(code)
+
+    def counts(self) -> Counter:
+        return Counter(self.codes)
+
+
+class ColumnStore:
+    """Columns of the requested fields, filled while streaming records"""
+
+    def __init__(self, fields: Iterable[str] = (), numeric: Iterable[str] = ()):
+        self.rows = 0
+        self.columns: Dict[str, DictColumn] = {f: DictColumn() for f in fields}
+        self.numeric: Dict[str, array] = {f: array('d') for f in numeric}
+        self._getters = {f: field_getter(f) for f in set(self.columns) | set(self.numeric)}
+
+    def add(self, record: Dict[str, Any]):
+        row = self.rows
+        for field, column in self.columns.items():
+            for value in self._getters[field](record):
+                column.add(row, value)
+        for field, values in self.numeric.items():
+            found = self._getters[field](record)
+            values.append(_to_float(found[0]) if found else _NAN)
+        self.rows += 1
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], fields: Iterable[str] = (),
+                     numeric: Iterable[str] = ()) -> 'ColumnStore':
+        store = cls(fields, numeric)
+        for record in records:
+            store.add(record)
+        return store
+
+    # --- Aggregations --------------------------------------------------
+
+    def uniq(self, field: str) -> List[Tuple[str, int]]:
+        """Distinct values of a field with their counts, sorted by value"""
+        column = self.columns[field]
+        counts = column.counts()
+        return sorted(((column.values[code], n) for code, n in counts.items()), key=lambda x: x[0])
+
+    def top(self, field: str, n: int = 10) -> List[Tuple[str, int]]:
+        """Most frequent values of a field"""
+        column = self.columns[field]
+        return [(column.values[code], count) for code, count in column.counts().most_common(n)]
+
+    def group(self, field: str, aggregates: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """
+        Group rows by the values of a field and aggregate numeric fields.
+        aggregates: [('count', None), ('sum', 'content_length'), ...]
+        Returns one dict per group, largest groups first.
+        """
+        column = self.columns[field]
+        group_count: Dict[int, int] = Counter(column.codes)
+        results: Dict[int, Dict[str, Any]] = {code: {field: column.values[code], 'count': n}
+                                               for code, n in group_count.items()}
+
+        for func, target in aggregates:
+            if func == 'count' or target is None:
+                continue
+            values = self.numeric[target]
+            label = f"{func}({target})"
+            acc: Dict[int, List[float]] = {}
+            for row, code in zip(column.rows, column.codes):
+                v = values[row]
+                if v != v:  # NaN: missing / not numeric
+                    continue
+                state = acc.get(code)
+                if state is None:
+                    acc[code] = [v, v, v, 1]
+                else:
+                    state[0] += v
+                    if v < state[1]: state[1] = v
+                    if v > state[2]: state[2] = v
+                    state[3] += 1
+
+            for code, result in results.items():
+                state = acc.get(code)
+                if state is None:
+                    result[label] = None
+                elif func == 'sum':
+                    result[label] = state[0]
+                elif func == 'min':
+                    result[label] = state[1]
+                elif func == 'max':
+                    result[label] = state[2]
+                else:
+                    result[label] = state[0] / state[3]
+
+        return sorted(results.values(), key=lambda r: (-r['count'], r[field]))
+
+    def histogram(self, field: str, bins: int = 10) -> List[Tuple[float, float, int]]:
+        """Equal-width histogram of a numeric field: [(low, high, count), ...]"""
+        values = [v for v in self.numeric[field] if v == v and not math.isinf(v)]
+        if not values:
+            return []
+        low, high = min(values), max(values)
+        if low == high:
+            return [(low, high, len(values))]
+        width = (high - low) / bins
+        counts = [0] * bins
+        for v in values:
+            counts[min(int((v - low) / width), bins - 1)] += 1
+        return [(low + i * width, low + (i + 1) * width, c) for i, c in enumerate(counts)]
+
+
+def parse_aggregates(specs: Iterable[str]) -> List[Tuple[str, Optional[str]]]:
+    """'sum:content_length' -> ('sum', 'content_length'); 'count' -> ('count', None)"""
+    aggregates = []
+    for spec in specs:
+        func, _, target = spec.partition(':')
+        func = func.strip().lower()
+        if func not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{func}'. Use one of: {', '.join(AGGREGATES)}")
+        if func != 'count' and not target:
+            raise ValueError(f"Aggregate '{func}' needs a field, e.g. {func}:content_length")
+        aggregates.append((func, target.strip() or None))
+    return aggregates
+
+
+def run_stats(records: Iterable[Dict[str, Any]], op: str, field: Optional[str] = None,
+              n: int = 10, aggregates: Iterable[str] = (), bins: int = 10) -> Dict[str, Any]:
+    """
+    Stream records once and compute one aggregation.
+    op: count | uniq | top | group | hist
+    Returns a JSON-serializable result.
+    """
+    if op == 'count':
+        return {'op': op, 'count': sum(1 for _ in records)}
+
+    if not field:
+        raise ValueError(f"'{op}' needs a field")
+
+    if op in ('uniq', 'top'):
+        store = ColumnStore.from_records(records, fields=[field])
+        values = store.uniq(field) if op == 'uniq' else store.top(field, n)
+        return {'op': op, 'field': field, 'records': store.rows,
+                'values': [{'value': v, 'count': c} for v, c in values]}
+
+    if op == 'group':
+        parsed = parse_aggregates(aggregates)
+        numeric = sorted({target for _, target in parsed if target})
+        store = ColumnStore.from_records(records, fields=[field], numeric=numeric)
+        return {'op': op, 'field': field, 'records': store.rows, 'groups': store.group(field, parsed)}
+
+    if op == 'hist':
+        store = ColumnStore.from_records(records, numeric=[field])
+        return {'op': op, 'field': field, 'records': store.rows,
+                'bins': [{'low': lo, 'high': hi, 'count': c} for lo, hi, c in store.histogram(field, bins)]}
+
+    raise ValueError(f"Unknown operation '{op}'. Use count, uniq, top, group or hist")
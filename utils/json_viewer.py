@@ -8,150 +8,37 @@ import json
 import re
 from typing import List, Dict, Any, Optional
 from collections import Counter
+from utils.query import compile_query
 
 
 class JsonLogViewer:
-    def __init__(self, data: List[Dict]):
+    def __init__(self, data: Optional[List[Dict]] = None):
         """
-        Initialize with already parsed list of dicts.
+        Initialize with already parsed list of dicts
+        (or nothing, when records are streamed through compile_query/format_entry).
         """
-        self.data = data
+        self.data = data if data is not None else []
 
     @staticmethod
-    def _match_value(actual: Any, operator: str, expected_str: str) -> bool:
+    def compile_query(query: str):
         """
-        Helper for single condition matching.
-        Operators: ==, !=, >, <, >=, <=, ~= (contains/regex-ish)
-        For strings, wildcards * are supported in == and !=.
+        Parse a query once and return a predicate record -> bool.
+        See utils.query for the syntax (&&, ||, parentheses, nested paths).
+        Raises ValueError on invalid syntax.
         """
-        if actual is None:
-            return False
-            
-        # Convert actual to appropriate type for comparison if possible
-        actual_str = str(actual)
-        
-        # Handle Wildcards for Strings
-        if operator in ('==', '!='):
-            if '*' in expected_str:
-                # Convert glob * to regex .*
-                # Escape other chars
-                pattern = re.escape(expected_str).replace(r'\*', '.*')
-                match = re.fullmatch(pattern, actual_str, re.IGNORECASE)
-                
-                if operator == '==':
-                    return bool(match)
-                else:
-                    return not bool(match)
-
-        # Standard Comparisons
-        try:
-            # Try numeric comparison first
-            if operator in ('>', '<', '>=', '<='):
-                val_num = float(actual)
-                exp_num = float(expected_str)
-                if operator == '>': return val_num > exp_num
-                if operator == '<': return val_num < exp_num
-                if operator == '>=': return val_num >= exp_num
-                if operator == '<=': return val_num <= exp_num
-            
-            # Equality checks
-            if operator == '==':
-                # Try int/float
-                try:
-                    return float(actual) == float(expected_str)
-                except:
-                    return actual_str.lower() == expected_str.lower()
-            
-            if operator == '!=':
-                try:
-                    return float(actual) != float(expected_str)
-                except:
-                    return actual_str.lower() != expected_str.lower()
-                    
-            if operator == '~=':
-                # Contains (case-insensitive)
-                if isinstance(actual, list):
-                     return any(expected_str.lower() in str(i).lower() for i in actual)
-                return expected_str.lower() in actual_str.lower()
-                
-        except Exception:
-            # Fallback to string comparison or False on error
-            pass
-            
-        return False
+        return compile_query(query)
 
     def advanced_search(self, query: str) -> List[Dict[str, Any]]:
         """
-        Advanced search with logical operators (&&, ||) and comparisons.
-        Example: 'status_code==200 && url==*admin*'
+        Advanced search with logical operators (&&, ||), parentheses,
+        nested fields and comparisons.
+        Example: 'status_code==200 && (url==*admin* || tech[*]~=nginx)'
         """
         if not query or not query.strip():
             return self.data
 
-        logging_results = []
-        
-        # We need to parse the query into conditions.
-        # This is a simple parser that supports && and ||.
-        # Precedence: AND before OR (standard).
-        # We'll split by || first, then by &&.
-        
-        or_groups = query.split('||')
-        
-        filtered_results = []
-        
-        for record in self.data:
-            # Handle non-dict records
-            if not isinstance(record, dict):
-                 # For now, we skip non-dict records in advanced search 
-                 # or we could try to match against the raw value if field is 'value' or something
-                 continue
-                 
-            record_match = False
-            
-            # Interpret OR groups (if any of these match, the record matches)
-            for group in or_groups:
-                # Within an OR group, all AND conditions must match
-                and_conditions = group.split('&&')
-                group_match = True
-                
-                for condition in and_conditions:
-                    condition = condition.strip()
-                    if not condition: continue
-                    
-                    # Parse operator
-                    # Sort by length desc to match >=, <= matched before > or <
-                    ops = ['==', '!=', '>=', '<=', '>', '<', '~=']
-                    operator = None
-                    field = None
-                    value = None
-                    
-                    for op in ops:
-                        if op in condition:
-                            operator = op
-                            parts = condition.split(op, 1) # Split only on first occurrence
-                            field = parts[0].strip()
-                            value = parts[1].strip().strip('"').strip("'")
-                            break
-                    
-                    if not operator:
-                        # Invalid condition syntax, treat as Fail
-                        group_match = False
-                        break
-                    
-                    # Check match
-                    val = record.get(field)
-                    if not self._match_value(val, operator, value):
-                        group_match = False
-                        break
-                
-                if group_match:
-                    record_match = True
-                    break # Found a matching OR group, no need to check others
-            
-            if record_match:
-                filtered_results.append(record)
-                
-        return filtered_results
+        predicate = self.compile_query(query)
+        return [record for record in self.data if predicate(record)]
 
     def _classify_value_type(self, value: str) -> str:
         """
@@ -191,20 +78,20 @@ class JsonLogViewer:
         color = colors.get(value_type, 'white')
         return f"[{color}]{value}[/{color}]"
     
-    def print_entry(self, entry: Dict[str, Any], 
-                    include_fields: List[str] = None,
-                    exclude_fields: List[str] = None):
+    def format_entry(self, entry: Dict[str, Any],
+                     include_fields: List[str] = None,
+                     exclude_fields: List[str] = None) -> str:
         """
-        Print entry in a readable key-value format.
+        Render entry in a readable key-value format (rich markup).
         
         Args:
-            entry: Dictionary to print
-            include_fields: If provided, only print these fields
-            exclude_fields: If provided, print all fields except these
+            entry: Dictionary to render
+            include_fields: If provided, only render these fields
+            exclude_fields: If provided, render all fields except these
         """
         if not isinstance(entry, dict):
             # Skip non-dict entries as requested
-            return
+            return ""
 
         # Define priority fields order for consistent display
         priority = [
@@ -245,10 +132,7 @@ class JsonLogViewer:
                 if field not in priority:
                     fields_to_print.append(field)
         
-        # Print the fields with colorization
-        from rich.console import Console
-        console = Console()
-        
+        lines = []
         for key in fields_to_print:
             val = entry[key]
             if isinstance(val, list):
@@ -259,7 +143,28 @@ class JsonLogViewer:
             val_type = self._classify_value_type(val_str)
             colored_val = self._colorize_value(val_str, val_type)
             
-            # Print with colored key (blue) and colored value
-            console.print(f"  [bold blue]{key}[/bold blue]: {colored_val}")
+            # Colored key (blue) and colored value
+            lines.append(f"  [bold blue]{key}[/bold blue]: {colored_val}")
         
-        console.print() # Newline between entries
+        lines.append("") # Newline between entries
+        return "\n".join(lines)
+
+    def print_entry(self, entry: Dict[str, Any], 
+                    include_fields: List[str] = None,
+                    exclude_fields: List[str] = None):
+        """Print entry in a readable key-value format (see format_entry)."""
+        if not isinstance(entry, dict):
+            return
+        _get_console().print(self.format_entry(entry, include_fields, exclude_fields))
+
+
+_console = None
+
+
+def _get_console():
+    """Shared console (creating one per printed entry is expensive)"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
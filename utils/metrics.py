@@ -0,0 +1,305 @@
+"""
+In-process metrics registry (counters, gauges, histograms).
+
+Increments are lock-free: every thread updates its own cell and readers sum
+the cells. Cells of finished threads are folded into a base value when the
+metrics are collected, so thread churn (one pool per run) does not grow them.
+Exposed as Prometheus text (/metrics on the API server) and by the 'stats'
+CLI command.
+"""
+import bisect
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800)
+
+
+class _Cells:
+    """Per-thread accumulators of a fixed number of float slots"""
+
+    def __init__(self, size: int = 1):
+        self.size = size
+        self._local = threading.local()
+        self._cells: List[Tuple[weakref.ref, List[float]]] = []
+        self._base = [0.0] * size
+        self._lock = threading.Lock()  # only taken on a thread's first update and on collect
+
+    def cell(self) -> List[float]:
+        cell = getattr(self._local, 'cell', None)
+        if cell is None:
+            cell = self._local.cell = [0.0] * self.size
+            with self._lock:
+                self._cells.append((weakref.ref(threading.current_thread()), cell))
+        return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            alive = []
+            totals = list(self._base)
+            for thread_ref, cell in self._cells:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    # Owner is gone: nobody writes this cell any more
+                    for i, value in enumerate(cell):
+                        self._base[i] += value
+                else:
+                    alive.append((thread_ref, cell))
+                for i, value in enumerate(cell):
+                    totals[i] += value
+            self._cells = alive
+            return totals
+
+    def reset(self, value: float = 0.0):
+        with self._lock:
+            for _, cell in self._cells:
+                for i in range(self.size):
+                    cell[i] = 0.0
+            self._base = [0.0] * self.size
+            self._base[0] = value
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str = "", labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], '_Metric'] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs) -> '_Metric':
+        """Child metric for a set of label values (created once, then a dict lookup)"""
+        key = tuple(str(v) for v in values) if values else tuple(str(kwargs.get(n, "")) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self) -> '_Metric':
+        raise NotImplementedError
+
+    def series(self) -> List[Tuple[Dict[str, str], '_Metric']]:
+        if not self.labelnames:
+            return [({}, self)]
+        return [(dict(zip(self.labelnames, key)), child) for key, child in sorted(self._children.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "", labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._cells = _Cells()
+
+    def _new_child(self):
+        return Counter(self.name, self.help)
+
+    def inc(self, amount: float = 1):
+        self._cells.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str = "", labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._cells = _Cells()
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self):
+        return Gauge(self.name, self.help)
+
+    def inc(self, amount: float = 1):
+        self._cells.cell()[0] += amount
+
+    def dec(self, amount: float = 1):
+        self._cells.cell()[0] -= amount
+
+    def set(self, value: float):
+        self._cells.reset(value)
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value when collected (e.g. a queue length)"""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return 0.0
+        return self._cells.totals()[0]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Slots: one per bucket, +Inf, sum
+        self._cells = _Cells(len(self.buckets) + 2)
+
+    def _new_child(self):
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def observe(self, value: float):
+        cell = self._cells.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> '_Timer':
+        """Context manager observing the elapsed time"""
+        return _Timer(self)
+
+    def snapshot(self) -> Dict[str, object]:
+        totals = self._cells.totals()
+        cumulative = []
+        running = 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return {'buckets': list(zip(self.buckets + (float('inf'),), cumulative)),
+                'count': running, 'sum': totals[-1]}
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+        return metric
+
+    def counter(self, name: str, help: str = "", labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str = "", labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str = "", labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def metrics(self) -> List[_Metric]:
+        return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, series in metric.series():
+                if isinstance(series, Histogram):
+                    snapshot = series.snapshot()
+                    for bound, count in snapshot['buckets']:
+                        le = "+Inf" if bound == float('inf') else _format_number(bound)
+                        lines.append(f"{metric.name}_bucket{_format_labels({**labels, 'le': le})} {_format_number(count)}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_number(snapshot['sum'])}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {_format_number(snapshot['count'])}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_number(series.value)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> List[Tuple[str, Dict[str, str], str]]:
+        """(name, labels, display value) rows for the CLI"""
+        rows = []
+        for metric in self.metrics():
+            for labels, series in metric.series():
+                if isinstance(series, Histogram):
+                    snapshot = series.snapshot()
+                    count = snapshot['count']
+                    if not count:
+                        continue
+                    avg = snapshot['sum'] / count
+                    rows.append((metric.name, labels, f"count={_format_number(count)} avg={avg:.3f}s "
+                                                      f"p50<={_quantile_bound(snapshot, 0.5)} p95<={_quantile_bound(snapshot, 0.95)}"))
+                else:
+                    rows.append((metric.name, labels, _format_number(series.value)))
+        return rows
+
+
+def _format_number(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _quantile_bound(snapshot: Dict[str, object], q: float) -> str:
+    """Upper bucket bound containing the q-quantile"""
+    target = snapshot['count'] * q
+    for bound, count in snapshot['buckets']:
+        if count >= target:
+            return "+Inf" if bound == float('inf') else f"{bound}s"
+    return "+Inf"
+
+
+registry = MetricsRegistry()
+
+# --- Instruments shared across modules ------------------------------------
+
+RUNS_TOTAL = registry.counter("reconflow_runs_total", "Module runs by final status", ["status"])
+RUNS_ACTIVE = registry.gauge("reconflow_runs_active", "Module runs in progress")
+STEPS_TOTAL = registry.counter("reconflow_steps_total", "Finished steps by status", ["status"])
+STEPS_RUNNING = registry.gauge("reconflow_steps_running", "Steps currently executing")
+STEP_SECONDS = registry.histogram("reconflow_step_duration_seconds", "Step wall-clock duration")
+
+SUBPROCESS_RUNNING = registry.gauge("reconflow_subprocesses_running", "Tool subprocesses currently running")
+SUBPROCESS_TOTAL = registry.counter("reconflow_subprocesses_total", "Tool subprocesses by result", ["result"])
+SUBPROCESS_SECONDS = registry.histogram("reconflow_subprocess_duration_seconds", "Tool subprocess duration")
+CAPTURED_BYTES = registry.counter("reconflow_captured_bytes_total", "Bytes captured from tools", ["stream"])
+
+SESSIONS_ACTIVE = registry.gauge("reconflow_sessions_active", "Background sessions running")
+SESSIONS_TOTAL = registry.counter("reconflow_sessions_total", "Background sessions by final status", ["status"])
+
+LOG_MESSAGES = registry.counter("reconflow_log_messages_total", "Execution log messages emitted")
+LOG_BYTES = registry.counter("reconflow_log_bytes_total", "Execution log bytes emitted")
+LOG_SUBSCRIBERS = registry.gauge("reconflow_log_subscribers", "Connected log subscribers")
+LOG_SLOW_CONSUMERS = registry.counter("reconflow_log_slow_consumer_total", "Times a log subscriber fell behind")
+
+DB_QUERY_SECONDS = registry.histogram("reconflow_db_query_seconds", "DB statement latency", ["operation"])
+DB_COMMITS = registry.counter("reconflow_db_commits_total", "DB transactions committed")
+
+QUEUE_DEPTH = registry.gauge("reconflow_queue_depth", "Executions waiting in the API queue")
+QUEUE_RUNNING = registry.gauge("reconflow_queue_running", "Executions started by the API queue and running")
@@ -9,25 +9,39 @@ from rich.text import Text
 from typing import Optional
 
 import sys
+import queue
+import threading
 from typing import List, Callable
 
+# Flusher batching: partial lines wait at most FLUSH_INTERVAL seconds,
+# listeners get at most about MAX_BATCH characters per call
+FLUSH_INTERVAL = 0.05
+MAX_BATCH = 64 * 1024
+
+_STOP = object()
+
+
 class SplitStream:
     """
     Splits stdout to original stream and registered listeners.
     Used to capture CLI output for WebSockets.
+
+    Writers only enqueue fragments (safe from any thread); a single
+    background flusher coalesces them into whole lines / batches and
+    calls the listeners, so slow listeners never block the writers.
     """
     def __init__(self, original_stream):
         self.original = original_stream
         self.listeners: List[Callable[[str], None]] = []
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._flusher: threading.Thread = None
+        self._lock = threading.Lock()
 
     def write(self, text):
         try:
             self.original.write(text)
-            for listener in self.listeners:
-                try:
-                    listener(text)
-                except:
-                    pass
+            if self.listeners and text:
+                self._queue.put(text)
         except:
             pass
             
@@ -36,13 +50,85 @@ class SplitStream:
             self.original.flush()
         except:
             pass
-            
+
+    def drain(self, timeout: float = 1.0) -> bool:
+        """Wait until everything written so far has reached the listeners"""
+        flusher = self._flusher
+        if not flusher or not flusher.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _notify(self, text: str):
+        for listener in list(self.listeners):
+            try:
+                listener(text)
+            except:
+                pass
+
+    def _flush_loop(self):
+        pending = ""
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL if pending else None)
+            except queue.Empty:
+                # A partial line waited long enough
+                self._notify(pending)
+                pending = ""
+                continue
+
+            parts = [pending]
+            size = len(pending)
+            markers = []
+            stop = False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    parts.append(item)
+                    size += len(item)
+                if stop or markers or size >= MAX_BATCH:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            text = "".join(parts)
+            if stop or markers:
+                cut = len(text)
+            else:
+                cut = text.rfind('\n') + 1
+                if size >= MAX_BATCH and not cut:
+                    cut = len(text)
+            if cut:
+                self._notify(text[:cut])
+            pending = text[cut:]
+
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
     def add_listener(self, callback: Callable[[str], None]):
-        self.listeners.append(callback)
+        with self._lock:
+            self.listeners.append(callback)
+            if not self._flusher or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="stdout-flusher", daemon=True)
+                self._flusher.start()
 
     def remove_listener(self, callback: Callable[[str], None]):
-        if callback in self.listeners:
-            self.listeners.remove(callback)
+        with self._lock:
+            if callback in self.listeners:
+                self.drain()
+                self.listeners.remove(callback)
+            if not self.listeners and self._flusher:
+                self._queue.put(_STOP)
+                self._flusher.join(timeout=1.0)
+                self._flusher = None
 
 # Initialize console with split stream
 stdout_stream = SplitStream(sys.stdout)
@@ -0,0 +1,188 @@
+"""
+Profiling of module runs ('run --profile[=cpu|mem]').
+
+cpu: every thread of the run (scheduler, step workers, subprocess I/O
+     helpers, progress animation) gets its own cProfile profiler; blocking
+     calls (waiting on child processes, locks, sleeps) are set apart so the
+     summary separates ReconFlow's own work from time spent waiting on tools.
+     Artifact: a pstats file (python -m pstats, snakeviz, ...).
+mem: tracemalloc snapshot of the run (peak and top allocation sites).
+     Artifact: a tracemalloc snapshot (tracemalloc.Snapshot.load).
+Both modes also compare the CPU time of ReconFlow with that of its tools.
+"""
+import os
+import sys
+import time
+import pstats
+import cProfile
+import resource
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_DIR = "profiles"  # Under <project>/.reconflow (or the working directory)
+MODES = ('cpu', 'mem')
+
+# Built-in calls that block the calling thread (their time is waiting, not work)
+WAIT_CALLS = ('acquire', 'waitid', 'wait4', 'waitpid', 'sleep', 'select', 'poll',
+              "'wait' of", "'read' of '_io.BufferedReader", "'readinto'", "'join'",
+              "'get' of '_queue.SimpleQueue'")
+
+
+def profile_dir(project_path: Optional[str] = None) -> str:
+    if project_path:
+        from core.manifest import MANIFEST_DIR
+        return os.path.join(project_path, MANIFEST_DIR, PROFILE_DIR)
+    return PROFILE_DIR
+
+
+def thread_role(name: str) -> str:
+    if name.startswith('ThreadPoolExecutor'):
+        return 'step workers'
+    if any(target in name for target in ('(_read_stream)', '(_write_stdin)', '(monitor)')):
+        return 'tool I/O'
+    if '(_animate)' in name:
+        return 'progress'
+    return 'other'
+
+
+def function_name(func: Tuple[str, int, str]) -> str:
+    """Short 'path:line(name)' of a pstats function key"""
+    filename, line, name = func
+    if filename == '~':
+        return name
+    relative = os.path.relpath(filename)
+    if relative.startswith('..'):
+        relative = os.path.join(*filename.split(os.sep)[-2:])
+    return f"{relative}:{line}({name})"
+
+
+def _is_wait(func: Tuple[str, int, str]) -> bool:
+    filename, _, name = func
+    return filename == '~' and any(call in name for call in WAIT_CALLS)
+
+
+class RunProfiler:
+    """Context manager profiling everything the process does while it is active"""
+
+    def __init__(self, mode: str = 'cpu'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (use {' or '.join(MODES)})")
+        self.mode = mode
+        self._profiles: List[Tuple[str, cProfile.Profile]] = []  # (role, profiler)
+        self._lock = threading.Lock()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_bytes = 0
+        self.wall = self.cpu = self.child_cpu = 0.0
+
+    def _thread_hook(self, frame, event, arg):
+        """threading.setprofile hook: start a profiler in every new thread of the run"""
+        role = thread_role(threading.current_thread().name)
+        if role == 'other':
+            # Long-lived threads (e.g. output flusher) would keep profiling after the run
+            sys.setprofile(None)
+            return
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._profiles.append((role, profiler))
+        profiler.enable()  # Replaces this hook for the thread
+
+    def __enter__(self):
+        self._children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._cpu_before = time.process_time()
+        self._started = time.perf_counter()
+        if self.mode == 'cpu':
+            profiler = cProfile.Profile()
+            if sys.version_info >= (3, 12):
+                # cProfile is process-wide (sys.monitoring): one profiler sees all threads
+                self._profiles.append(('all threads', profiler))
+            else:
+                threading.setprofile(self._thread_hook)
+                self._profiles.append(('scheduler', profiler))
+            profiler.enable()
+        else:
+            tracemalloc.start(10)
+        return self
+
+    def __exit__(self, *exc):
+        if self.mode == 'cpu':
+            self._profiles[0][1].disable()
+            threading.setprofile(None)
+        else:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.wall = time.perf_counter() - self._started
+        self.cpu = time.process_time() - self._cpu_before
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.child_cpu = ((children.ru_utime - self._children_before.ru_utime) +
+                          (children.ru_stime - self._children_before.ru_stime))
+        return False
+
+    # --- Results -----------------------------------------------------------
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """Profiles of all threads merged into one pstats.Stats"""
+        merged = None
+        for _, profiler in self._profiles:
+            profiler.create_stats()
+            if not profiler.stats:
+                continue
+            if merged is None:
+                merged = pstats.Stats(profiler)
+            else:
+                merged.add(profiler)
+        return merged
+
+    def breakdown(self) -> Dict[str, Dict[str, float]]:
+        """Per thread role: profiled seconds spent working vs blocked"""
+        roles: Dict[str, Dict[str, float]] = {}
+        for role, profiler in self._profiles:
+            profiler.create_stats()
+            entry = roles.setdefault(role, {'threads': 0, 'work': 0.0, 'wait': 0.0})
+            entry['threads'] += 1
+            for func, (_, _, tottime, _, _) in profiler.stats.items():
+                entry['wait' if _is_wait(func) else 'work'] += tottime
+        return roles
+
+    def top(self, n: int = 20) -> List[Tuple[str, int, float, float]]:
+        """Top functions by own time, blocking calls excluded: (function, calls, tottime, cumtime)"""
+        if self.mode == 'mem':
+            return []
+        stats = self.stats()
+        if stats is None:
+            return []
+        rows = []
+        for func, (_, calls, tottime, cumtime, _) in stats.stats.items():
+            if _is_wait(func):
+                continue
+            rows.append((function_name(func), calls, tottime, cumtime))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:n]
+
+    def top_allocations(self, n: int = 20) -> List[Tuple[str, int, int]]:
+        """Top allocation sites still alive at the end of the run: (site, bytes, blocks)"""
+        if self.snapshot is None:
+            return []
+        snapshot = self.snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        return [(str(stat.traceback[0]), stat.size, stat.count) for stat in snapshot.statistics('lineno')[:n]]
+
+    def save(self, module_id: str, project_path: Optional[str] = None) -> Optional[str]:
+        """Write the profile artifact and return its path"""
+        directory = profile_dir(project_path)
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        if self.mode == 'cpu':
+            stats = self.stats()
+            if stats is None:
+                return None
+            path = os.path.join(directory, f"{module_id}-{stamp}.prof")
+            stats.dump_stats(path)
+        else:
+            path = os.path.join(directory, f"{module_id}-{stamp}.tracemalloc")
+            self.snapshot.dump(path)
+        return path
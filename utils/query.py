@@ -0,0 +1,369 @@
+"""
+Query language for JSON records (bcat / JsonLogViewer).
+
+    status_code==200 && (url==*admin* || title~=login)
+    tech[*]~=nginx || a.b.c>=3 || !(port==443)
+
+A query is parsed once into an AST and compiled to a single predicate
+record -> bool; regexes and numeric literals are prepared at compile time.
+
+Operators: == != (glob '*' supported) > < >= <= ~= (contains, case-insensitive)
+Paths:     key, a.b.c, list[0], list[*] (matches if any element matches)
+Literals:  numbers, true/false, null, "quoted" or bare strings
+"""
+import re
+from typing import Any, Callable, List, Optional, Tuple
+
+OPERATORS = ('==', '!=', '>=', '<=', '>', '<', '~=')
+
+Predicate = Callable[[Any], bool]
+
+_PATH_PART = re.compile(r'([^.\[\]]+)|\[(\*|-?\d+)\]')
+
+
+def _tokenize(query: str) -> List[Tuple[str, Any]]:
+    """
+    Split a query into tokens: ('(',), (')',), ('&&',), ('||',), ('!',)
+    and ('cond', field, operator, raw_value).
+    Bare values run until '&&', '||' or an unbalanced ')'.
+    """
+    tokens = []
+    i, n = 0, len(query)
+
+    while i < n:
+        ch = query[i]
+        if ch.isspace():
+            i += 1
+            continue
+        if query.startswith('&&', i) or query.startswith('||', i):
+            tokens.append((query[i:i + 2],))
+            i += 2
+            continue
+        if ch in '()':
+            tokens.append((ch,))
+            i += 1
+            continue
+        if ch == '!' and not query.startswith('!=', i):
+            tokens.append(('!',))
+            i += 1
+            continue
+
+        # Condition: <field><op><value>
+        start = i
+        while i < n and not any(query.startswith(op, i) for op in OPERATORS):
+            if query.startswith('&&', i) or query.startswith('||', i) or query[i] in '()':
+                raise ValueError(f"Missing operator in condition '{query[start:i].strip()}'")
+            i += 1
+        field = query[start:i].strip()
+        if i >= n:
+            raise ValueError(f"Missing operator in condition '{field}'")
+        if not field:
+            raise ValueError(f"Missing field name at position {start}")
+
+        operator = next(op for op in OPERATORS if query.startswith(op, i))
+        i += len(operator)
+        while i < n and query[i].isspace():
+            i += 1
+
+        if i < n and query[i] in '"\'':
+            quote = query[i]
+            end = query.find(quote, i + 1)
+            if end == -1:
+                raise ValueError(f"Unterminated string in condition '{field}{operator}'")
+            value = ('str', query[i + 1:end])
+            i = end + 1
+        else:
+            value_start, depth = i, 0
+            while i < n:
+                if query.startswith('&&', i) or query.startswith('||', i):
+                    break
+                if query[i] == '(':
+                    depth += 1
+                elif query[i] == ')':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                i += 1
+            value = ('bare', query[value_start:i].strip())
+
+        tokens.append(('cond', field, operator, value))
+
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser: or_expr := and_expr ('||' and_expr)*"""
+
+    def __init__(self, tokens: List[Tuple]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> Tuple:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty query")
+        node = self.or_expr()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected '{self.peek()}' in query")
+        return node
+
+    def or_expr(self):
+        nodes = [self.and_expr()]
+        while self.peek() == '||':
+            self.take()
+            nodes.append(self.and_expr())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def and_expr(self):
+        nodes = [self.unary()]
+        while self.peek() == '&&':
+            self.take()
+            nodes.append(self.unary())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def unary(self):
+        kind = self.peek()
+        if kind == '!':
+            self.take()
+            return ('not', self.unary())
+        if kind == '(':
+            self.take()
+            node = self.or_expr()
+            if self.peek() != ')':
+                raise ValueError("Missing closing parenthesis")
+            self.take()
+            return node
+        if kind == 'cond':
+            _, field, operator, value = self.take()
+            return ('cmp', _parse_path(field), field, operator, _parse_literal(value))
+        raise ValueError(f"Unexpected '{kind or 'end of query'}' in query")
+
+
+def _parse_path(field: str) -> List:
+    """'a.b[*].c' -> ['a', 'b', '*', 'c'] (list indexes as int)"""
+    parts = []
+    pos = 0
+    for m in _PATH_PART.finditer(field):
+        between = field[pos:m.start()].strip('.')
+        if between:
+            raise ValueError(f"Invalid field path '{field}'")
+        key, index = m.groups()
+        if key is not None:
+            parts.append(key.strip())
+        elif index == '*':
+            parts.append('*')
+        else:
+            parts.append(int(index))
+        pos = m.end()
+    if field[pos:].strip('.') or not parts:
+        raise ValueError(f"Invalid field path '{field}'")
+    return parts
+
+
+def _parse_literal(value: Tuple[str, str]) -> Tuple[str, Any]:
+    """Type a literal: ('null',), ('bool', b), ('num', f, text), ('str', text)"""
+    kind, text = value
+    if kind == 'str':
+        return ('str', text)
+    lowered = text.lower()
+    if lowered == 'null':
+        return ('null', None)
+    if lowered in ('true', 'false'):
+        return ('bool', lowered == 'true')
+    try:
+        return ('num', float(text), text)
+    except ValueError:
+        return ('str', text)
+
+
+def _resolve(record: Any, path: List) -> List[Any]:
+    """Values reached by a path ([*] fans out); missing keys yield nothing"""
+    values = [record]
+    for part in path:
+        next_values = []
+        for value in values:
+            if part == '*':
+                if isinstance(value, list):
+                    next_values.extend(value)
+            elif isinstance(part, int):
+                if isinstance(value, list) and -len(value) <= part < len(value):
+                    next_values.append(value[part])
+            elif isinstance(value, dict) and part in value:
+                next_values.append(value[part])
+        values = next_values
+        if not values:
+            break
+    return values
+
+
+def field_getter(field: str) -> Callable[[Any], List[Any]]:
+    """
+    Return a function giving the values of a field path in a record
+    ('a.b', 'tech[*]', ...); missing fields give an empty list.
+    """
+    path = _parse_path(field)
+    if len(path) == 1 and isinstance(path[0], str) and path[0] != '*':
+        key = path[0]
+        def get_key(record):
+            value = record.get(key) if isinstance(record, dict) else None
+            return [] if value is None else [value]
+        return get_key
+
+    def get_path(record):
+        if isinstance(record, dict) and field in record:
+            return [record[field]]
+        return [v for v in _resolve(record, path) if v is not None]
+    return get_path
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compile_glob(pattern: str) -> Callable[[Any], bool]:
+    """Case-insensitive glob ('*' only); '*x*', 'x*' and '*x' avoid the regex engine"""
+    inner = pattern.strip('*')
+    if '*' not in inner:
+        needle = inner.lower()
+        starts, ends = pattern.startswith('*'), pattern.endswith('*')
+        if starts and ends:
+            return lambda v: needle in str(v).lower()
+        if ends:
+            return lambda v: str(v).lower().startswith(needle)
+        return lambda v: str(v).lower().endswith(needle)
+
+    regex = re.compile(re.escape(pattern).replace(r'\*', '.*'), re.IGNORECASE | re.DOTALL)
+    return lambda v: regex.fullmatch(str(v)) is not None
+
+
+def _compile_value_test(operator: str, literal: Tuple) -> Callable[[Any], bool]:
+    """Build the test applied to one (non-None) resolved value"""
+    kind = literal[0]
+    if kind == 'num':
+        text = literal[2]
+    elif kind == 'bool':
+        text = str(literal[1]).lower()
+    elif kind == 'null':
+        text = 'null'  # Only reached by '~=': matches the text "null"
+    else:
+        text = literal[1]
+
+    if operator in ('==', '!=') and kind == 'str' and '*' in text:
+        glob = _compile_glob(text)
+        if operator == '==':
+            return glob
+        return lambda v: not glob(v)
+
+    if operator in ('>', '<', '>=', '<='):
+        expected = literal[1] if kind == 'num' else None
+        if expected is None:
+            return lambda v: False
+        compare = {
+            '>': lambda a: a > expected,
+            '<': lambda a: a < expected,
+            '>=': lambda a: a >= expected,
+            '<=': lambda a: a <= expected,
+        }[operator]
+
+        def ordered(v):
+            number = _to_number(v)
+            return number is not None and compare(number)
+        return ordered
+
+    if operator == '~=':
+        needle = text.lower()
+        def contains(v):
+            if isinstance(v, str):
+                return needle in v.lower()
+            if isinstance(v, list):
+                return any(needle in str(i).lower() for i in v)
+            return needle in str(v).lower()
+        return contains
+
+    lowered = text.lower()
+    expected_num = literal[1] if kind == 'num' else None
+
+    def equals(v):
+        if expected_num is not None:
+            number = _to_number(v)
+            if number is not None:
+                return number == expected_num
+        if isinstance(v, bool):
+            return ('true' if v else 'false') == lowered
+        return str(v).lower() == lowered
+
+    if operator == '==':
+        return equals
+    return lambda v: not equals(v)
+
+
+def _compile_node(node) -> Predicate:
+    kind = node[0]
+    if kind in ('or', 'and'):
+        children = [_compile_node(n) for n in node[1]]
+        if len(children) == 2:
+            # Avoid generator overhead for the common binary case
+            first, second = children
+            if kind == 'or':
+                return lambda r: first(r) or second(r)
+            return lambda r: first(r) and second(r)
+        if kind == 'or':
+            return lambda r: any(c(r) for c in children)
+        return lambda r: all(c(r) for c in children)
+    if kind == 'not':
+        child = _compile_node(node[1])
+        return lambda r: not child(r)
+
+    _, path, field, operator, literal = node
+
+    if literal[0] == 'null' and operator in ('==', '!='):
+        def is_null(r):
+            values = _resolve(r, path)
+            return not values or all(v is None for v in values)
+        if operator == '==':
+            return is_null
+        return lambda r: not is_null(r)
+
+    test = _compile_value_test(operator, literal)
+
+    if len(path) == 1 and not isinstance(path[0], int) and path[0] != '*':
+        key = path[0]
+        # Fast path for top-level keys (the common case)
+        def match_key(r):
+            v = r.get(key)
+            return v is not None and test(v)
+        return match_key
+
+    def match_path(r):
+        # A literal key wins over path syntax (e.g. a field really named "a.b")
+        if field in r:
+            v = r[field]
+            return v is not None and test(v)
+        return any(v is not None and test(v) for v in _resolve(r, path))
+    return match_path
+
+
+def parse_query(query: str):
+    """Parse a query string into an AST (raises ValueError on syntax errors)"""
+    return _Parser(_tokenize(query)).parse()
+
+
+def compile_query(query: str) -> Predicate:
+    """Compile a query string into a predicate; non-dict records never match"""
+    predicate = _compile_node(parse_query(query))
+
+    def matches(record: Any) -> bool:
+        return isinstance(record, dict) and predicate(record)
+    return matches
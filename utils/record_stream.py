@@ -0,0 +1,150 @@
+"""
+Streaming record pipeline for JSON / JSON-lines outputs:
+read -> parse -> filter -> project -> render.
+Every stage is a generator so consumers can stop early (limit/first)
+without reading the rest of the file.
+"""
+import json
+import re
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from core.storage import open_output, CHUNK_SIZE
+
+_WS = re.compile(r'[\s,]*')
+
+# Give up on an array element that still does not decode after buffering this much
+MAX_ELEMENT_SIZE = 16 * CHUNK_SIZE
+
+
+def _peek_first_char(f) -> str:
+    """Return the first non-whitespace character of a text stream (without consuming records)"""
+    while True:
+        ch = f.read(1)
+        if not ch or not ch.isspace():
+            return ch
+
+
+def _iter_json_array(f) -> Iterator[Any]:
+    """Yield elements of a top-level JSON array (opening bracket already read), chunk by chunk"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    while True:
+        pos = _WS.match(buf, pos).end()
+        if pos >= len(buf):
+            if eof:
+                return
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        if buf[pos] == ']':
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof or len(buf) - pos > MAX_ELEMENT_SIZE:
+                return
+            # Element spans the chunk boundary: read more and retry
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        if end == len(buf) and not eof:
+            # A scalar (e.g. a number) may continue in the next chunk
+            chunk = f.read(CHUNK_SIZE)
+            if chunk:
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            eof = True
+
+        yield obj
+        pos = end
+
+
+def iter_records(path: str) -> Iterator[Any]:
+    """
+    Yield parsed records from a JSON array, a single JSON document or a
+    JSON-lines file (plain or compressed). Invalid JSON lines are skipped.
+    """
+    with open_output(path, 'rt') as f:
+        first = _peek_first_char(f)
+        if not first:
+            return
+
+        if first == '[':
+            yield from _iter_json_array(f)
+            return
+
+        # JSON lines (the first character was consumed by the peek)
+        produced = False
+        tried_document = False
+        for i, line in enumerate(f):
+            if i == 0:
+                line = first + line
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if not produced and not tried_document and line.startswith('{'):
+                    # Pretty-printed single document: parse it as a whole.
+                    # Otherwise a corrupt line: skip it and keep streaming
+                    tried_document = True
+                    document = _load_document(path)
+                    if document is not None:
+                        yield from document
+                        return
+                continue
+            produced = True
+            yield record
+
+
+def _load_document(path: str) -> Optional[List[Any]]:
+    """Records of a whole-file JSON document (None if the file is not one)"""
+    with open_output(path, 'rt') as f:
+        try:
+            content = json.load(f)
+        except ValueError:
+            return None
+    return content if isinstance(content, list) else [content]
+
+
+def query_records(records: Iterable[Any], predicate: Optional[Callable[[dict], bool]] = None,
+                  offset: int = 0, limit: Optional[int] = None) -> Iterator[dict]:
+    """Filter dict records with an optional predicate, then apply offset/limit lazily"""
+    matches = (r for r in records if isinstance(r, dict))
+    if predicate:
+        matches = filter(predicate, matches)
+    stop = offset + limit if limit is not None else None
+    return islice(matches, offset, stop)
+
+
+def render_batched(entries: Iterable[dict], render: Callable[[dict], str],
+                   write: Callable[[str], None], batch_size: int = 200) -> int:
+    """
+    Render entries and hand them to write() in batches instead of one call per entry.
+    Returns the number of rendered entries.
+    """
+    batch: List[str] = []
+    count = 0
+    for entry in entries:
+        batch.append(render(entry))
+        count += 1
+        if len(batch) >= batch_size:
+            write("\n".join(batch))
+            batch = []
+    if batch:
+        write("\n".join(batch))
+    return count
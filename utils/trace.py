@@ -0,0 +1,276 @@
+"""
+Run timeline traces in Chrome Trace Event format (chrome://tracing, Perfetto).
+
+A Tracer attached to a module records, for every module run (submodules
+included):
+- a process group per module run, with the run span on its scheduler lane
+  (a submodule run is nested inside the parent step span on the same lane),
+- per step: a 'queued' async span from the moment its dependencies are met
+  to the moment a worker picks it up (with the reason it was held back, e.g.
+  a 'parallel: false' step), and the step span itself on the worker lane,
+- counters of running and queued steps over time.
+summarize() turns a trace back into per-step waits and parallelism figures.
+"""
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+TRACE_DIR = "traces"  # Under <project>/.reconflow (or the working directory)
+
+
+class Tracer:
+    """Thread-safe collector of trace events (timestamps in microseconds)"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._started_at = datetime.now()
+        self._next_pid = 1
+        self._lanes: Dict[tuple, int] = {}      # (pid, thread ident) -> tid
+        self._ready: Dict[tuple, Dict[str, Any]] = {}  # (pid, step) -> queued state
+        self._started: Dict[tuple, float] = {}  # (pid, step) -> start ts
+        self._running: Dict[int, int] = {}      # pid -> running steps
+        self._names: Dict[int, str] = {}        # pid -> module id
+        self._parents: Dict[int, tuple] = {}    # submodule pid -> (parent pid, lane, module id)
+
+    def now(self) -> float:
+        return round((time.perf_counter() - self._origin) * 1e6, 1)
+
+    def _lane(self, pid: int) -> int:
+        """tid of the calling thread in a process group (named after the thread)"""
+        thread = threading.current_thread()
+        key = (pid, thread.ident)
+        tid = self._lanes.get(key)
+        if tid is None:
+            tid = self._lanes[key] = sum(1 for p, _ in self._lanes if p == pid) + 1
+            self.events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid,
+                                'args': {'name': thread.name}})
+        return tid
+
+    def _counter(self, pid: int, ts: float):
+        queued = sum(1 for p, _ in self._ready if p == pid)
+        self.events.append({'ph': 'C', 'name': 'steps', 'pid': pid, 'ts': ts,
+                            'args': {'running': self._running.get(pid, 0), 'queued': queued}})
+
+    # --- Module runs -------------------------------------------------------
+
+    def begin_run(self, module_id: str, max_workers: int, parent: Optional[tuple] = None) -> int:
+        """
+        Open a process group for a module run; returns its pid.
+        parent: (pid, step) of the step running this module as a submodule;
+        the submodule span is then also nested in that step on its lane.
+        """
+        with self._lock:
+            pid = self._next_pid
+            self._next_pid += 1
+            ts = self.now()
+            label = module_id
+            if parent:
+                parent_name = self._names.get(parent[0], parent[0])
+                label = f"{module_id} (from {parent_name}/{parent[1]})"
+                self._parents[pid] = (parent[0], self._lane(parent[0]), module_id)
+                self.events.append({'ph': 'B', 'name': f"module {module_id}", 'cat': 'submodule',
+                                    'pid': parent[0], 'tid': self._lane(parent[0]), 'ts': ts})
+            self._names[pid] = module_id
+            self.events.append({'ph': 'M', 'name': 'process_name', 'pid': pid, 'args': {'name': label}})
+            self.events.append({'ph': 'M', 'name': 'process_sort_index', 'pid': pid, 'args': {'sort_index': pid}})
+            self.events.append({'ph': 'B', 'name': f"module {module_id}", 'cat': 'module', 'pid': pid,
+                                'tid': self._lane(pid), 'ts': ts, 'args': {'max_workers': max_workers}})
+            self._running[pid] = 0
+            self._counter(pid, ts)
+        return pid
+
+    def end_run(self, pid: int, status: str):
+        with self._lock:
+            ts = self.now()
+            self.events.append({'ph': 'E', 'cat': 'module', 'pid': pid, 'tid': self._lane(pid), 'ts': ts,
+                                'args': {'status': status}})
+            parent = self._parents.pop(pid, None)
+            if parent:
+                parent_pid, tid, module_id = parent
+                self.events.append({'ph': 'E', 'name': f"module {module_id}", 'cat': 'submodule',
+                                    'pid': parent_pid, 'tid': tid, 'ts': ts})
+
+    # --- Steps -------------------------------------------------------------
+
+    def step_ready(self, pid: int, step: str, parallel: bool = True):
+        """Dependencies met: the step waits for a slot (scheduler thread)"""
+        with self._lock:
+            key = (pid, step)
+            if key in self._ready:
+                return
+            ts = self.now()
+            self._ready[key] = {'ts': ts, 'blocked_by': None}
+            self.events.append({'ph': 'b', 'name': step, 'cat': 'queued', 'id': f"{pid}:{step}",
+                                'pid': pid, 'tid': 0, 'ts': ts, 'args': {'parallel': parallel}})
+            self._counter(pid, ts)
+
+    def step_blocked(self, pid: int, step: str, reason: str):
+        """Record why a ready step was not submitted (first reason wins)"""
+        with self._lock:
+            state = self._ready.get((pid, step))
+            if state is not None and state['blocked_by'] is None:
+                state['blocked_by'] = reason
+
+    def step_started(self, pid: int, step: str):
+        """A worker picked the step up (worker thread)"""
+        with self._lock:
+            key = (pid, step)
+            ts = self.now()
+            state = self._ready.pop(key, None)
+            if state is not None:
+                args = {'wait_ms': round((ts - state['ts']) / 1000, 3)}
+                if state['blocked_by']:
+                    args['blocked_by'] = state['blocked_by']
+                self.events.append({'ph': 'e', 'name': step, 'cat': 'queued', 'id': f"{pid}:{step}",
+                                    'pid': pid, 'tid': 0, 'ts': ts, 'args': args})
+            self._started[key] = ts
+            self._running[pid] = self._running.get(pid, 0) + 1
+            self._counter(pid, ts)
+
+    def step_finished(self, pid: int, step: str, status: str, **args):
+        """Close the step span on the calling worker lane"""
+        with self._lock:
+            key = (pid, step)
+            ts = self.now()
+            start = self._started.pop(key, ts)
+            self.events.append({'ph': 'X', 'name': step, 'cat': 'step', 'pid': pid, 'tid': self._lane(pid),
+                                'ts': start, 'dur': round(ts - start, 1),
+                                'args': {'status': status, **{k: v for k, v in args.items() if v is not None}}})
+            self._running[pid] = max(0, self._running.get(pid, 0) - 1)
+            self._counter(pid, ts)
+
+    # --- Export ------------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            events = list(self.events)
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'generator': 'reconflow', 'started_at': self._started_at.isoformat()},
+        }
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+        return path
+
+    def attach(self, module, path: str):
+        """
+        Trace the next run of a module and save the trace to path when it finishes
+        (works for foreground and background runs).
+        """
+        def on_event(event, data):
+            if event == 'run_finished':
+                module.remove_listener(on_event)
+                if module.tracer is self:
+                    module.tracer = None
+                self.save(path)
+
+        module.tracer = self
+        module.add_listener(on_event)
+
+
+# --- Files -------------------------------------------------------------------
+
+def trace_dir(project_path: Optional[str] = None) -> str:
+    if project_path:
+        from core.manifest import MANIFEST_DIR
+        return os.path.join(project_path, MANIFEST_DIR, TRACE_DIR)
+    return TRACE_DIR
+
+
+def new_trace_path(module_id: str, project_path: Optional[str] = None) -> str:
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(trace_dir(project_path), f"{module_id}-{stamp}.trace.json")
+
+
+def list_traces(project_path: Optional[str] = None) -> List[str]:
+    """Trace files, newest first"""
+    directory = trace_dir(project_path)
+    if not os.path.isdir(directory):
+        return []
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.trace.json')]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def load_trace(path: str) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, list):  # JSON array format
+        data = {'traceEvents': data}
+    return data
+
+
+# --- Analysis ----------------------------------------------------------------
+
+def summarize(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Per module run: wall time, parallelism and per-step timings.
+    Returns one dict per process group (module run), in run order.
+    """
+    runs: Dict[int, Dict[str, Any]] = {}
+    waits: Dict[tuple, Dict[str, Any]] = {}
+
+    for event in trace.get('traceEvents', []):
+        pid = event.get('pid')
+        ph = event.get('ph')
+        run = runs.setdefault(pid, {'pid': pid, 'name': str(pid), 'steps': [], 'start': None, 'end': None,
+                                    'max_workers': None, 'status': None, 'peak_running': 0, 'lanes': set()})
+        if ph == 'M' and event.get('name') == 'process_name':
+            run['name'] = event['args']['name']
+        elif ph == 'B' and event.get('cat') == 'module':
+            run['start'] = event['ts']
+            run['max_workers'] = event.get('args', {}).get('max_workers')
+        elif ph == 'E' and event.get('cat') == 'module':
+            run['end'] = event['ts']
+            run['status'] = event.get('args', {}).get('status')
+        elif ph == 'e' and event.get('cat') == 'queued':
+            waits[(pid, event['name'])] = event.get('args', {})
+        elif ph == 'X' and event.get('cat') == 'step':
+            run['lanes'].add(event['tid'])
+            run['steps'].append({'name': event['name'], 'start': event['ts'], 'dur': event['dur'],
+                                 'lane': event['tid'], 'status': event.get('args', {}).get('status')})
+        elif ph == 'C' and event.get('name') == 'steps':
+            run['peak_running'] = max(run['peak_running'], event.get('args', {}).get('running', 0))
+
+    summaries = []
+    for pid in sorted(runs):
+        run = runs[pid]
+        if run['start'] is None:
+            continue
+        end = run['end'] if run['end'] is not None else max(
+            [s['start'] + s['dur'] for s in run['steps']] or [run['start']])
+        wall = max(end - run['start'], 0.0)
+        busy = sum(s['dur'] for s in run['steps'])
+        for step in run['steps']:
+            wait = waits.get((pid, step['name']), {})
+            step['wait'] = wait.get('wait_ms', 0.0) * 1000
+            step['blocked_by'] = wait.get('blocked_by')
+            step['offset'] = step['start'] - run['start']
+        run['steps'].sort(key=lambda s: s['start'])
+        workers = run['max_workers'] or len(run['lanes']) or 1
+        summaries.append({
+            'name': run['name'],
+            'status': run['status'],
+            'wall_us': wall,
+            'busy_us': busy,
+            'parallelism': busy / wall if wall else 0.0,
+            'peak_running': run['peak_running'],
+            'workers_used': len(run['lanes']),
+            'max_workers': run['max_workers'],
+            # Worker-time nobody used while the run was going on
+            'idle_us': max(workers * wall - busy, 0.0),
+            'queued_us': sum(s['wait'] for s in run['steps']),
+            'serialized': [s['name'] for s in run['steps'] if s['blocked_by']],
+            'steps': run['steps'],
+        })
+    return summaries